@@ -0,0 +1,50 @@
+"""Score a JSONL or Parquet archive offline with N worker processes.
+
+Each worker loads the model once and writes part-*.jsonl shards into the
+output directory. Progress is tracked in <output-dir>/manifest.json, so
+rerunning the same command resumes an interrupted job.
+
+Usage:
+    py scripts/batch_score.py --input data/archive.jsonl --output-dir scored/ --workers 4
+    py scripts/batch_score.py --input archive.parquet --output-dir scored/ --text-field body
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.serving.batch_scoring import score_file
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline parallel batch scoring")
+    parser.add_argument("--input", required=True, help="JSONL or .parquet input file")
+    parser.add_argument("--output-dir", required=True, help="Directory for output shards and manifest")
+    parser.add_argument("--model-dir", default=os.environ.get("MODEL_DIR", "models/latest"))
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--shard-size", type=int, default=10000, help="Rows per output shard")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per forward pass")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--precision", choices=["fp32", "int8", "bf16"], default=None)
+    parser.add_argument("--backend", choices=["pytorch", "onnx"], default=None)
+    parser.add_argument("--threads-per-worker", type=int, default=0,
+                        help="torch threads per worker (0 splits CPUs evenly)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    score_file(
+        input_path=args.input,
+        output_dir=args.output_dir,
+        model_dir=args.model_dir,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        batch_size=args.batch_size,
+        text_field=args.text_field,
+        precision=args.precision,
+        backend=args.backend,
+        threads_per_worker=args.threads_per_worker,
+    )
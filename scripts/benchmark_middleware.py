@@ -0,0 +1,103 @@
+"""Benchmark rate-limiting middleware overhead on /health and /predict.
+
+Mounts the API routes behind either the pure ASGI RateLimiterMiddleware
+or the previous BaseHTTPMiddleware implementation and drives them
+in-process with concurrent httpx requests, reporting requests/sec.
+Limits are set high enough that no request is rejected.
+
+Usage:
+    py scripts/benchmark_middleware.py --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+from fastapi import FastAPI, Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.serving import api
+from src.utils.logging_config import setup_logging
+from src.utils.rate_limiter import RateLimiter, RateLimiterMiddleware
+
+logger = setup_logging(__name__)
+
+UNLIMITED = 10 ** 9
+
+
+class BaseHTTPRateLimiterMiddleware(BaseHTTPMiddleware):
+    """The previous implementation, kept here as the benchmark baseline."""
+
+    def __init__(self, app, limiter: RateLimiter, rule: str = "global"):
+        super().__init__(app)
+        self.limiter = limiter
+        self.rule = rule
+
+    async def dispatch(self, request: Request, call_next):
+        client_ip = request.client.host if request.client else "unknown"
+        _, remaining = self.limiter.hit(self.rule, client_ip)
+        response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(UNLIMITED)
+        response.headers["X-RateLimit-Remaining"] = str(remaining)
+        return response
+
+
+def _build_app(middleware_cls) -> FastAPI:
+    limiter = RateLimiter()
+    limiter.set_limit("global", requests_per_window=UNLIMITED, window_seconds=60)
+    app = FastAPI()
+    app.include_router(api.app.router)
+    app.add_middleware(middleware_cls, limiter=limiter, rule="global")
+    return app
+
+
+async def _drive(app: FastAPI, method: str, path: str, total: int, concurrency: int, json_body=None) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(total))
+
+        async def worker():
+            for _ in remaining:
+                response = await client.request(method, path, json=json_body)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started)
+
+
+def run(args) -> dict:
+    api.rate_limiter.set_limit("predict", requests_per_window=UNLIMITED, window_seconds=60)
+    api._model_state["mode"] = "demo"
+    targets = {
+        "/health": ("GET", "/health", None),
+        "/predict": ("POST", "/predict", {"text": "NASA launches new satellite to study solar wind"}),
+    }
+
+    report = {}
+    for name, middleware_cls in (("base_http", BaseHTTPRateLimiterMiddleware), ("pure_asgi", RateLimiterMiddleware)):
+        app = _build_app(middleware_cls)
+        for path, (method, url, body) in targets.items():
+            rps = asyncio.run(_drive(app, method, url, args.requests, args.concurrency, body))
+            report.setdefault(path, {})[name] = round(rps, 1)
+            logger.info("%-10s %-9s %8.1f req/sec", name, path, rps)
+
+    for path, results in report.items():
+        logger.info("%s speedup: %.2fx", path, results["pure_asgi"] / results["base_http"])
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark rate limiting middleware")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run(parse_args())
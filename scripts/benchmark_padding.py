@@ -0,0 +1,127 @@
+"""Benchmark fixed max_length padding against length-bucketed dynamic padding.
+
+Runs predict_fn over the same texts in both padding modes and reports
+real (non-pad) tokens per second, padded tokens per second and the
+padding overhead of each mode.
+
+Usage:
+    py scripts/benchmark_padding.py --model-dir models/latest
+    py scripts/benchmark_padding.py --data data/processed/test.jsonl --samples 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.serving import inference
+from src.utils.bucketing import length_buckets
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+SAMPLE_TEXTS = [
+    "Stocks rally as tech earnings beat expectations",
+    "Lakers beat Celtics 112-108 in overtime thriller",
+    "NASA launches new satellite to study solar wind",
+    "UN summit ends without agreement on climate targets",
+    "Oil prices slide after OPEC signals higher output for the coming quarter, "
+    "raising concerns among analysts about slowing demand in Asia and Europe",
+    "Researchers unveil a chip that runs large language models on a phone",
+]
+
+
+def _load_texts(path: str, samples: int) -> list:
+    if not path:
+        return (SAMPLE_TEXTS * (samples // len(SAMPLE_TEXTS) + 1))[:samples]
+
+    texts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            texts.append(json.loads(line)["text"])
+            if len(texts) >= samples:
+                break
+    return texts
+
+
+def _padded_tokens(lengths: list, batch_size: int, mode: str) -> int:
+    """Count the tokens a mode actually feeds through the model, pads included."""
+    total = 0
+    for start in range(0, len(lengths), batch_size):
+        batch = lengths[start:start + batch_size]
+        if mode == "max_length":
+            total += len(batch) * inference.MAX_SEQ_LENGTH
+        else:
+            for indices in length_buckets(batch, inference.SEQ_LENGTH_BUCKETS):
+                total += len(indices) * max(batch[idx] for idx in indices)
+    return total
+
+
+def _run_mode(artifacts: dict, texts: list, batch_size: int, mode: str, repeats: int) -> float:
+    inference.PADDING_MODE = mode
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+    inference.predict_fn({"texts": batches[0]}, artifacts)  # warmup
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for batch in batches:
+            inference.predict_fn({"texts": batch}, artifacts)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(args) -> dict:
+    artifacts = inference.model_fn(args.model_dir)
+    texts = _load_texts(args.data, args.samples)
+    tokenizer = artifacts["tokenizer"]
+    lengths = [
+        len(ids)
+        for ids in tokenizer(texts, truncation=True, max_length=inference.MAX_SEQ_LENGTH)["input_ids"]
+    ]
+    real_tokens = sum(lengths)
+
+    report = {"texts": len(texts), "batch_size": args.batch_size, "real_tokens": real_tokens, "modes": {}}
+    for mode in ("max_length", "bucket"):
+        seconds = _run_mode(artifacts, texts, args.batch_size, mode, args.repeats)
+        padded = _padded_tokens(lengths, args.batch_size, mode)
+        report["modes"][mode] = {
+            "seconds": round(seconds, 4),
+            "tokens_per_sec": round(real_tokens / seconds, 1),
+            "padded_tokens_per_sec": round(padded / seconds, 1),
+            "padding_overhead": round(padded / real_tokens, 2),
+        }
+        logger.info(
+            "%-10s %.3fs  %.0f tokens/sec  (%.2fx padded tokens)",
+            mode,
+            seconds,
+            real_tokens / seconds,
+            padded / real_tokens,
+        )
+
+    speedup = report["modes"]["max_length"]["seconds"] / report["modes"]["bucket"]["seconds"]
+    report["speedup"] = round(speedup, 2)
+    logger.info("Bucketed padding speedup: %.2fx", speedup)
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark fixed vs bucketed padding")
+    parser.add_argument("--model-dir", default=os.environ.get("MODEL_DIR", "models/latest"))
+    parser.add_argument("--data", default=None, help="JSONL file with a 'text' field (defaults to built-in samples)")
+    parser.add_argument("--samples", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default=None, help="Optional path for a JSON report")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
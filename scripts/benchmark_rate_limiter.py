@@ -0,0 +1,130 @@
+"""Benchmark the token-bucket rate limiter at many distinct client IPs.
+
+Compares the RateLimiter engine against the previous per-IP timestamp-list
+approach: hits/sec, memory held after the run, and how many keys remain
+once every client has gone idle for a full window.
+
+Usage:
+    py scripts/benchmark_rate_limiter.py --keys 100000 --hits-per-key 5
+    py scripts/benchmark_rate_limiter.py --backend sqlite --keys 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.utils.logging_config import setup_logging
+from src.utils.rate_limiter import RateLimiter, create_store
+
+logger = setup_logging(__name__)
+
+
+class SimClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TimestampListLimiter:
+    """The previous implementation: one list of timestamps per IP, never evicted."""
+
+    def __init__(self, limit: int, window: float, clock):
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+        self.requests = defaultdict(list)
+
+    def hit(self, key: str) -> bool:
+        now = self.clock()
+        self.requests[key] = [ts for ts in self.requests[key] if ts > now - self.window]
+        if len(self.requests[key]) >= self.limit:
+            return False
+        self.requests[key].append(now)
+        return True
+
+
+def _keys(count: int) -> list:
+    return [f"10.{idx >> 16 & 255}.{idx >> 8 & 255}.{idx & 255}" for idx in range(count)]
+
+
+def _drive(hit, clock: SimClock, keys: list, hits_per_key: int) -> float:
+    started = time.perf_counter()
+    for round_idx in range(hits_per_key):
+        clock.now = round_idx * 0.5
+        for key in keys:
+            hit(key)
+    return time.perf_counter() - started
+
+
+def _run(name: str, make_limiter, keys: list, hits_per_key: int, window: float) -> dict:
+    clock = SimClock()
+    hit, _ = make_limiter(clock)
+    seconds = _drive(hit, clock, keys, hits_per_key)
+
+    clock = SimClock()
+    tracemalloc.start()
+    hit, size = make_limiter(clock)
+    _drive(hit, clock, keys, hits_per_key)
+    held, _ = tracemalloc.get_traced_memory()
+    clock.now += window + 1
+    hit("203.0.113.1")
+    tracemalloc.stop()
+
+    result = {
+        "hits_per_sec": round(len(keys) * hits_per_key / seconds),
+        "memory_mb": round(held / 1e6, 1),
+        "keys_after_idle_window": size(),
+    }
+    logger.info(
+        "%-16s %10d hits/sec  %7.1f MB held  %8d keys after idle window",
+        name,
+        result["hits_per_sec"],
+        result["memory_mb"],
+        result["keys_after_idle_window"],
+    )
+    return result
+
+
+def run(args) -> dict:
+    keys = _keys(args.keys)
+    window = 60.0
+
+    def token_bucket(clock):
+        store = create_store(args.backend, sqlite_path=args.sqlite_path, redis_url=args.redis_url)
+        store.reset("global")
+        limiter = RateLimiter(store=store, clock=clock, sweep_interval=window)
+        limiter.set_limit("global", requests_per_window=args.limit, window_seconds=window)
+        return (lambda key: limiter.hit("global", key)), limiter.size
+
+    def timestamp_list(clock):
+        limiter = TimestampListLimiter(args.limit, window, clock)
+        return limiter.hit, lambda: len(limiter.requests)
+
+    return {
+        f"token_bucket_{args.backend}": _run(
+            f"{args.backend}_bucket", token_bucket, keys, args.hits_per_key, window
+        ),
+        "timestamp_list": _run("timestamp_list", timestamp_list, keys, args.hits_per_key, window),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark rate limiter at many distinct IPs")
+    parser.add_argument("--keys", type=int, default=100000, help="Distinct client IPs")
+    parser.add_argument("--hits-per-key", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=100, help="Requests per minute per IP")
+    parser.add_argument("--backend", choices=["memory", "sqlite", "redis"], default="memory")
+    parser.add_argument("--sqlite-path", default=None)
+    parser.add_argument("--redis-url", default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run(parse_args())
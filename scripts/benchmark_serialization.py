@@ -0,0 +1,111 @@
+"""Benchmark /predict response serialization and SageMaker output_fn encoding.
+
+Compares, per response of --items predictions:
+  * the previous /predict path: validate against PredictResponse, run
+    jsonable_encoder and encode with the standard json module (what FastAPI
+    does for a dict returned under response_model)
+  * the current path: FastJSONResponse over the dict we built ourselves
+  * output_fn before (json.dumps indent=2) and after (compact fast encoder)
+
+Usage:
+    py scripts/benchmark_serialization.py --items 32 --iterations 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.encoders import jsonable_encoder
+
+from src.serving.api import PredictResponse
+from src.serving.inference import output_fn
+from src.utils.logging_config import setup_logging
+from src.utils.serialization import FastJSONResponse, orjson
+
+logger = setup_logging(__name__)
+
+LABELS = ("World", "Sports", "Business", "Sci/Tech")
+
+
+def _make_payload(items: int) -> dict:
+    rng = random.Random(0)
+    predictions = []
+    for idx in range(items):
+        probs = [rng.random() for _ in LABELS]
+        total = sum(probs)
+        probs = [round(p / total, 4) for p in probs]
+        best = max(range(len(LABELS)), key=probs.__getitem__)
+        predictions.append(
+            {
+                "text": f"Headline number {idx} about markets, sports and science"[:100],
+                "label": LABELS[best],
+                "confidence": probs[best],
+                "probabilities": dict(zip(LABELS, probs)),
+                "model": "distilbert-agnews",
+                "latency_ms": round(rng.uniform(1, 20), 2),
+            }
+        )
+    return {"predictions": predictions, "mode": "real", "model_dir": "models/latest"}
+
+
+def _validated_response(payload: dict) -> bytes:
+    content = jsonable_encoder(PredictResponse.model_validate(payload))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _fast_response(payload: dict) -> bytes:
+    return FastJSONResponse(content=payload).body
+
+
+def _legacy_output_fn(payload: dict) -> str:
+    return json.dumps(payload, indent=2)
+
+
+def _time(fn, payload, iterations: int) -> float:
+    fn(payload)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn(payload)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run(args) -> dict:
+    payload = _make_payload(args.items)
+    predictions = payload["predictions"]
+    logger.info("Encoder: %s, %d items per response", "orjson" if orjson else "json (stdlib)", args.items)
+
+    cases = {
+        "predict_validated": (_validated_response, payload),
+        "predict_fast": (_fast_response, payload),
+        "output_fn_indent2": (_legacy_output_fn, predictions),
+        "output_fn_compact": (output_fn, predictions),
+    }
+    report = {}
+    for name, (fn, data) in cases.items():
+        micros = _time(fn, data, args.iterations)
+        size = len(fn(data))
+        report[name] = {"us_per_response": round(micros, 2), "bytes": size}
+        logger.info("%-18s %9.2f us/response %7d bytes", name, micros, size)
+
+    logger.info(
+        "/predict speedup: %.2fx, output_fn speedup: %.2fx",
+        report["predict_validated"]["us_per_response"] / report["predict_fast"]["us_per_response"],
+        report["output_fn_indent2"]["us_per_response"] / report["output_fn_compact"]["us_per_response"],
+    )
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark prediction response serialization")
+    parser.add_argument("--items", type=int, default=32)
+    parser.add_argument("--iterations", type=int, default=20000)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run(parse_args())
@@ -0,0 +1,85 @@
+"""Measure cold-start import time per entry point and check it against the budget.
+
+Each profile in src/utils/startup_profile.STARTUP_BUDGETS is run --runs
+times in a fresh interpreter under `python -X importtime`. Reports the
+median process wall time and entry-point import time, the slowest
+top-level packages, and whether any forbidden heavy module (torch in demo
+mode, for example) was loaded. With --check the script exits non-zero on
+any budget violation, for use in CI.
+
+Usage:
+    py scripts/benchmark_startup.py --runs 5
+    py scripts/benchmark_startup.py --profile api --check
+"""
+
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.utils.logging_config import setup_logging
+from src.utils.startup_profile import (
+    STARTUP_BUDGETS,
+    check_budget,
+    module_cumulative_ms,
+    package_breakdown,
+    profile_statement,
+)
+
+logger = setup_logging(__name__)
+
+
+def run(args) -> dict:
+    names = args.profile or list(STARTUP_BUDGETS)
+    report = {}
+    violations = []
+
+    for name in names:
+        spec = STARTUP_BUDGETS[name]
+        results = [profile_statement(spec["statement"]) for _ in range(args.runs)]
+        wall = statistics.median(r["wall_ms"] for r in results)
+        imports = [module_cumulative_ms(r["records"], spec["module"]) for r in results]
+        median_result = sorted(zip(imports, range(len(results))))[len(results) // 2]
+        typical = results[median_result[1]]
+
+        report[name] = {
+            "wall_ms": round(wall, 1),
+            "import_ms": round(statistics.median(imports), 1),
+            "budget_ms": spec["budget_ms"],
+            "heavy_modules": sorted(m for m in spec["forbidden"] if m in typical["modules"]),
+        }
+        logger.info(
+            "%-11s wall %7.1f ms | %s import %7.1f ms (budget %d ms)",
+            name,
+            wall,
+            spec["module"],
+            report[name]["import_ms"],
+            spec["budget_ms"],
+        )
+        for package, ms in package_breakdown(typical["records"], top=args.top):
+            logger.info("    %-28s %8.1f ms", package, ms)
+
+        problems = check_budget(name, typical)
+        violations.extend(problems)
+        for problem in problems:
+            logger.error("Budget exceeded: %s", problem)
+
+    if args.check and violations:
+        sys.exit(1)
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark cold-start import time")
+    parser.add_argument("--profile", action="append", choices=sorted(STARTUP_BUDGETS),
+                        help="Profile to run (repeatable; default: all)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Packages to list per profile")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any budget is exceeded")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run(parse_args())
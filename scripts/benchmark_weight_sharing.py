@@ -0,0 +1,179 @@
+"""Measure per-worker RSS and PSS with private vs memory-mapped model weights.
+
+For each loader mode and each worker count, starts that many fresh
+processes that load the model, run a forward pass (so every layer's
+weights are paged in) and wait. The script then reads each worker's
+/proc/<pid>/smaps_rollup:
+  * RSS counts every resident page, including pages shared with other
+    processes, so it barely moves with mmap.
+  * PSS divides each shared page by the number of processes mapping it,
+    which is what the host actually pays per worker.
+  * "weights" is the PSS of the model.safetensors mapping alone.
+
+Modes:
+  from_pretrained  transformers' loader. transformers 4.x copies the weights
+                   into private memory in every worker; 5.x maps safetensors
+                   itself, so this mode shows what the installed version does.
+  mmap             src.serving.mmap_weights.load_mmap_model (one shared copy
+                   per host on any transformers version)
+
+Each worker also reports how long the model load took.
+
+Linux only. Stops adding workers when MemAvailable would drop below
+--min-free-mb and marks that step as skipped.
+
+Usage:
+    py scripts/benchmark_weight_sharing.py --model-dir models/latest --workers 1 4 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.serving.mmap_weights import SAFETENSORS_FILENAME
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+_MAPPING_HEADER = re.compile(r"^[0-9a-f]+-[0-9a-f]+ ")
+
+
+def _worker(model_dir: str, mode: str, conn) -> None:
+    import time
+
+    import torch
+    from transformers import AutoModelForSequenceClassification
+
+    torch.set_num_threads(1)
+    started = time.perf_counter()
+    if mode == "mmap":
+        from src.serving.mmap_weights import load_mmap_model
+
+        model = load_mmap_model(model_dir)
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(model_dir).eval()
+    load_s = time.perf_counter() - started
+
+    input_ids = torch.full((8, 64), 5, dtype=torch.long)
+    with torch.inference_mode():
+        model(input_ids=input_ids, attention_mask=torch.ones_like(input_ids))
+    conn.send(load_s)
+    conn.recv()
+
+
+def _smaps_rollup_mb(pid: int) -> dict:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower()] = int(rest.split()[0]) / 1024
+    return values
+
+
+def _mapping_pss_mb(pid: int, filename: str) -> float:
+    total_kb = 0
+    inside = False
+    with open(f"/proc/{pid}/smaps") as f:
+        for line in f:
+            if _MAPPING_HEADER.match(line):
+                inside = line.rstrip().endswith(filename)
+            elif inside and line.startswith("Pss:"):
+                total_kb += int(line.split()[1])
+    return total_kb / 1024
+
+
+def _available_mb() -> float:
+    with open("/proc/meminfo") as f:
+        for line in f:
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) / 1024
+    return float("inf")
+
+
+def _measure(model_dir: str, mode: str, workers: int, min_free_mb: float, per_worker_mb: float) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    started = []
+    load_times = []
+    try:
+        for _ in range(workers):
+            if _available_mb() - per_worker_mb < min_free_mb:
+                return {"skipped": f"not enough memory for {workers} worker(s)"}
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(target=_worker, args=(model_dir, mode, child_conn), daemon=True)
+            process.start()
+            started.append((process, parent_conn))
+            # Load one at a time so the free-memory check sees the previous worker.
+            load_times.append(parent_conn.recv())
+
+        samples = []
+        for process, _ in started:
+            usage = _smaps_rollup_mb(process.pid)
+            usage["weights"] = _mapping_pss_mb(process.pid, SAFETENSORS_FILENAME)
+            samples.append(usage)
+    finally:
+        for process, conn in started:
+            try:
+                conn.send("exit")
+            except OSError:
+                pass
+            process.join(10)
+            if process.is_alive():
+                process.terminate()
+
+    result = {key: round(statistics.median(sample[key] for sample in samples), 1) for key in ("rss", "pss", "weights")}
+    result["load_s"] = round(statistics.median(load_times), 3)
+    return result
+
+
+def run(args) -> dict:
+    weights_mb = os.path.getsize(os.path.join(args.model_dir, SAFETENSORS_FILENAME)) / (1024 * 1024)
+    logger.info("Weights: %.1f MB (%s)", weights_mb, args.model_dir)
+
+    report = {}
+    for mode in args.modes:
+        report[mode] = {}
+        for workers in args.workers:
+            # Assume the worst case: a private copy costs the full weights per worker on top of the runtime.
+            per_worker_mb = args.runtime_mb + (weights_mb if mode == "from_pretrained" else 0)
+            result = _measure(args.model_dir, mode, workers, args.min_free_mb, per_worker_mb)
+            report[mode][workers] = result
+            if "skipped" in result:
+                logger.warning("%-15s x%d: skipped (%s)", mode, workers, result["skipped"])
+                continue
+            logger.info(
+                "%-15s x%d: per worker RSS %7.1f MB | PSS %7.1f MB | weights PSS %6.1f MB | load %.2fs",
+                mode,
+                workers,
+                result["rss"],
+                result["pss"],
+                result["weights"],
+                result["load_s"],
+            )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark weight memory sharing across worker processes")
+    parser.add_argument("--model-dir", default=os.environ.get("MODEL_DIR", "models/latest"))
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--modes", nargs="+", choices=["from_pretrained", "mmap"], default=["from_pretrained", "mmap"])
+    parser.add_argument("--runtime-mb", type=float, default=600,
+                        help="Estimated private memory of one worker without weights (for the free-memory check)")
+    parser.add_argument("--min-free-mb", type=float, default=512)
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run(parse_args())
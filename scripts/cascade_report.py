@@ -0,0 +1,105 @@
+"""Report the accuracy cost of the /predict cascade at each confidence threshold.
+
+Runs the test split through the first stage and the model once, then for
+every threshold reports the fraction of texts that would skip the model, the
+first stage's accuracy on those texts, the cascade's accuracy and its loss
+against the model alone. The estimated speedup assumes model time scales with
+the number of texts it sees. Use it to choose CASCADE_THRESHOLD.
+
+Usage:
+    py scripts/cascade_report.py --model-dir models/latest
+    py scripts/cascade_report.py --thresholds 0.8 0.9 0.95 --max-samples 2000 --output cascade_report.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.serving.cascade import FIRST_STAGE_FILENAME, LinearTextClassifier, cascade_tradeoff
+from src.serving.inference import model_fn, predict_columnar
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+DEFAULT_THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.97, 0.99)
+
+
+def _load_split(path: str, max_samples: int) -> tuple:
+    texts, labels = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            texts.append(record["text"])
+            labels.append(int(record["label"]))
+            if max_samples and len(texts) >= max_samples:
+                break
+    return texts, labels
+
+
+def _timed(fn, texts: list, batch_size: int) -> tuple:
+    import numpy as np
+
+    started = time.perf_counter()
+    probs = np.concatenate([fn(texts[start:start + batch_size]) for start in range(0, len(texts), batch_size)])
+    return probs, time.perf_counter() - started
+
+
+def run(args) -> dict:
+    texts, labels = _load_split(args.test_data, args.max_samples)
+    logger.info("Loaded %d test samples from %s", len(texts), args.test_data)
+
+    classifier = LinearTextClassifier.load(args.first_stage or Path(args.model_dir) / FIRST_STAGE_FILENAME)
+    artifacts = model_fn(args.model_dir)
+    first_probs, first_s = _timed(classifier.predict_proba, texts, args.batch_size)
+    model_probs, model_s = _timed(
+        lambda batch: predict_columnar({"texts": batch}, artifacts)["probabilities"], texts, args.batch_size
+    )
+
+    rows = cascade_tradeoff(first_probs, model_probs, labels, args.thresholds)
+    logger.info("first stage %.3f ms/text, model %.3f ms/text", first_s * 1000 / len(texts), model_s * 1000 / len(texts))
+    logger.info("threshold  skip   first_acc  cascade_acc  model_acc  loss     est_speedup")
+    for row in rows:
+        row["est_speedup"] = round(model_s / (first_s + (1 - row["skip_fraction"]) * model_s), 2)
+        first_acc = row["first_stage_accuracy"]
+        logger.info(
+            "%9.2f  %5.1f%%  %9s  %11.4f  %9.4f  %+.4f  %6.2fx",
+            row["threshold"],
+            row["skip_fraction"] * 100,
+            "-" if first_acc is None else f"{first_acc:.4f}",
+            row["cascade_accuracy"],
+            row["model_accuracy"],
+            row["accuracy_loss"],
+            row["est_speedup"],
+        )
+
+    report = {
+        "samples": len(texts),
+        "first_stage_ms_per_text": round(first_s * 1000 / len(texts), 4),
+        "model_ms_per_text": round(model_s * 1000 / len(texts), 4),
+        "thresholds": rows,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        logger.info("Wrote %s", args.output)
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cascade accuracy vs skipped-model tradeoff")
+    parser.add_argument("--model-dir", default=os.environ.get("MODEL_DIR", "models/latest"))
+    parser.add_argument("--first-stage", default=None, help=f"Default: <model-dir>/{FIRST_STAGE_FILENAME}")
+    parser.add_argument("--test-data", default="data/processed/test.jsonl")
+    parser.add_argument("--max-samples", type=int, default=0, help="0 = all")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=list(DEFAULT_THRESHOLDS))
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run(parse_args())
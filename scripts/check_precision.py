@@ -0,0 +1,109 @@
+"""Check the accuracy delta of a reduced-precision model against fp32.
+
+Runs the saved test split through the fp32 model and a candidate precision
+(int8 or bf16) and fails when the candidate's accuracy drops by more than
+--tolerance. Run this before setting INFERENCE_PRECISION in production.
+
+Usage:
+    py scripts/check_precision.py --precision int8
+    py scripts/check_precision.py --precision bf16 --tolerance 0.002 --max-samples 0
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.serving.inference import model_fn, predict_fn
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+
+def _load_split(path: str, max_samples: int) -> tuple:
+    texts, labels = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            texts.append(record["text"])
+            labels.append(int(record["label"]))
+            if max_samples and len(texts) >= max_samples:
+                break
+    return texts, labels
+
+
+def score(artifacts: dict, texts: list, labels: list, batch_size: int) -> dict:
+    """Predict the split in batches and return predictions, accuracy and wall time."""
+    predictions = []
+    started = time.perf_counter()
+    for start in range(0, len(texts), batch_size):
+        batch = predict_fn({"texts": texts[start:start + batch_size]}, artifacts)
+        predictions.extend(item["predicted_label"] for item in batch)
+    seconds = time.perf_counter() - started
+
+    correct = sum(pred == label for pred, label in zip(predictions, labels))
+    return {
+        "predictions": predictions,
+        "accuracy": correct / len(labels) if labels else 0.0,
+        "seconds": seconds,
+    }
+
+
+def run(args) -> dict:
+    texts, labels = _load_split(args.test_data, args.max_samples)
+    logger.info("Loaded %d test samples from %s", len(texts), args.test_data)
+
+    baseline = score(model_fn(args.model_dir, precision="fp32"), texts, labels, args.batch_size)
+    candidate_artifacts = model_fn(args.model_dir, precision=args.precision)
+    candidate = score(candidate_artifacts, texts, labels, args.batch_size)
+
+    agreement = sum(a == b for a, b in zip(baseline["predictions"], candidate["predictions"]))
+    delta = baseline["accuracy"] - candidate["accuracy"]
+    report = {
+        "samples": len(texts),
+        "precision": candidate_artifacts["precision"],
+        "fp32_accuracy": round(baseline["accuracy"], 4),
+        "candidate_accuracy": round(candidate["accuracy"], 4),
+        "accuracy_delta": round(delta, 4),
+        "agreement": round(agreement / len(texts), 4) if texts else 0.0,
+        "speedup": round(baseline["seconds"] / candidate["seconds"], 2) if candidate["seconds"] else 0.0,
+        "tolerance": args.tolerance,
+        "passed": delta <= args.tolerance,
+    }
+    logger.info(
+        "fp32 acc=%.4f  %s acc=%.4f  delta=%.4f  agreement=%.4f  speedup=%.2fx",
+        report["fp32_accuracy"],
+        report["precision"],
+        report["candidate_accuracy"],
+        report["accuracy_delta"],
+        report["agreement"],
+        report["speedup"],
+    )
+    return report
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare reduced-precision accuracy against fp32")
+    parser.add_argument("--model-dir", default=os.environ.get("MODEL_DIR", "models/latest"))
+    parser.add_argument("--test-data", default="data/processed/test.jsonl")
+    parser.add_argument("--precision", choices=["int8", "bf16"], default="int8")
+    parser.add_argument("--tolerance", type=float, default=0.005,
+                        help="Maximum allowed drop in accuracy versus fp32")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-samples", type=int, default=2000, help="Cap test samples (0 for full)")
+    parser.add_argument("--output", default=None, help="Optional path for a JSON report")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if not report["passed"]:
+        logger.error("Accuracy delta %.4f exceeds tolerance %.4f", report["accuracy_delta"], args.tolerance)
+        sys.exit(1)
@@ -0,0 +1,72 @@
+"""Convert a trained checkpoint into a single memory-mappable model.safetensors.
+
+Run once on the training output. The API then maps the file copy-on-write
+(MMAP_WEIGHTS=true), so every worker process on a host shares one copy of
+the weights. Pass --dtype bf16 to store reduced-precision weights for
+INFERENCE_PRECISION=bf16; casting at load time would give each worker a
+private copy again. A parity check against the original checkpoint runs
+unless --skip-check is given.
+
+Usage:
+    py scripts/convert_safetensors.py --model-dir models/latest
+    py scripts/convert_safetensors.py --model-dir models/latest --output models/latest-bf16 --dtype bf16
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.serving.inference import model_fn, predict_fn
+from src.serving.mmap_weights import convert_to_safetensors
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+CHECK_TEXTS = [
+    "Stocks rally as tech earnings beat expectations",
+    "Lakers beat Celtics 112-108 in overtime thriller",
+    "NASA launches new satellite to study solar wind",
+    "UN summit ends without agreement on climate targets",
+]
+
+
+def run(args) -> float:
+    reference = None
+    if not args.skip_check:
+        reference = predict_fn({"texts": CHECK_TEXTS}, model_fn(args.model_dir, precision="fp32", backend="pytorch"))
+
+    path = convert_to_safetensors(args.model_dir, args.output, dtype=args.dtype)
+    logger.info("Converted %s -> %s (%.1f MB)", args.model_dir, path, path.stat().st_size / (1024 * 1024))
+    if reference is None:
+        return 0.0
+
+    precision = "bf16" if args.dtype == "bf16" else "fp32"
+    converted = predict_fn({"texts": CHECK_TEXTS}, model_fn(str(path.parent), precision=precision, backend="pytorch"))
+    max_diff = max(
+        abs(ref["probabilities"][label] - new["probabilities"][label])
+        for ref, new in zip(reference, converted)
+        for label in ref["probabilities"]
+    )
+    logger.info("Max probability difference original vs converted: %.5f", max_diff)
+    return max_diff
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Convert a checkpoint to memory-mappable safetensors")
+    parser.add_argument("--model-dir", default=os.environ.get("MODEL_DIR", "models/latest"))
+    parser.add_argument("--output", default=None, help="Output directory (defaults to --model-dir)")
+    parser.add_argument("--dtype", choices=["fp32", "bf16", "fp16"], default=None,
+                        help="Store weights in this dtype (default: keep the checkpoint's)")
+    parser.add_argument("--tolerance", type=float, default=1e-3, help="Raise to ~2e-2 for --dtype bf16/fp16")
+    parser.add_argument("--skip-check", action="store_true", help="Skip the parity check")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    max_diff = run(args)
+    if max_diff > args.tolerance:
+        logger.error("Converted model differs by %.5f (tolerance %.5f)", max_diff, args.tolerance)
+        sys.exit(1)
@@ -0,0 +1,62 @@
+"""Export the fine-tuned model to ONNX for the ONNX Runtime serving backend.
+
+Writes <model-dir>/model.onnx with dynamic batch and sequence axes, then
+checks that ONNX Runtime and PyTorch agree on a few sample headlines.
+Serve it with INFERENCE_BACKEND=onnx.
+
+Usage:
+    py scripts/export_onnx.py --model-dir models/latest
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.serving.inference import model_fn, predict_fn
+from src.serving.onnx_backend import ONNX_OPSET, export_onnx
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+CHECK_TEXTS = [
+    "Stocks rally as tech earnings beat expectations",
+    "Lakers beat Celtics 112-108 in overtime thriller",
+    "NASA launches new satellite to study solar wind",
+    "UN summit ends without agreement on climate targets",
+]
+
+
+def run(args) -> float:
+    export_onnx(args.model_dir, args.output, opset=args.opset)
+    if args.skip_check:
+        return 0.0
+
+    reference = predict_fn({"texts": CHECK_TEXTS}, model_fn(args.model_dir, precision="fp32", backend="pytorch"))
+    exported = predict_fn({"texts": CHECK_TEXTS}, model_fn(args.model_dir, backend="onnx"))
+    max_diff = max(
+        abs(ref["probabilities"][label] - onnx["probabilities"][label])
+        for ref, onnx in zip(reference, exported)
+        for label in ref["probabilities"]
+    )
+    logger.info("Max probability difference PyTorch vs ONNX Runtime: %.5f", max_diff)
+    return max_diff
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Export model to ONNX")
+    parser.add_argument("--model-dir", default=os.environ.get("MODEL_DIR", "models/latest"))
+    parser.add_argument("--output", default=None, help="Output path (defaults to <model-dir>/model.onnx)")
+    parser.add_argument("--opset", type=int, default=ONNX_OPSET)
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    parser.add_argument("--skip-check", action="store_true", help="Skip the PyTorch parity check")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    max_diff = run(args)
+    if max_diff > args.tolerance:
+        logger.error("ONNX output differs from PyTorch by %.5f (tolerance %.5f)", max_diff, args.tolerance)
+        sys.exit(1)
@@ -0,0 +1,79 @@
+"""Train the cascade first stage and save it next to the model.
+
+Fits a logistic regression over word unigrams and bigrams on the training
+split and calibrates its confidence with temperature scaling on the
+validation split. The result is written to <model-dir>/first_stage.npz,
+which the API loads when CASCADE_THRESHOLD is set. Pick the threshold with
+scripts/cascade_report.py.
+
+Usage:
+    py scripts/train_cascade.py --data-dir data/processed --model-dir models/latest
+    py scripts/train_cascade.py --max-features 50000 --c 2
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.serving.cascade import FIRST_STAGE_FILENAME, train_first_stage
+from src.serving.inference import LABEL_MAP
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+
+def _load_split(path: Path, max_samples: int = 0) -> tuple:
+    texts, labels = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            texts.append(record["text"])
+            labels.append(int(record["label"]))
+            if max_samples and len(texts) >= max_samples:
+                break
+    return texts, labels
+
+
+def run(args) -> dict:
+    data_dir = Path(args.data_dir)
+    texts, labels = _load_split(data_dir / "train.jsonl", args.max_samples)
+    val_texts, val_labels = _load_split(data_dir / "val.jsonl")
+    logger.info("Training first stage on %d texts, calibrating on %d", len(texts), len(val_texts))
+
+    classifier, metrics = train_first_stage(
+        texts,
+        labels,
+        val_texts,
+        val_labels,
+        label_names=[LABEL_MAP[idx] for idx in range(len(LABEL_MAP))],
+        max_features=args.max_features,
+        min_df=args.min_df,
+        c=args.c,
+    )
+    logger.info("Validation metrics: %s", json.dumps(metrics))
+
+    output = Path(args.output or Path(args.model_dir) / FIRST_STAGE_FILENAME)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    classifier.save(output)
+    logger.info("Wrote %s (%.1f MB)", output, output.stat().st_size / (1024 * 1024))
+    return metrics
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the cascade first-stage classifier")
+    parser.add_argument("--data-dir", default="data/processed", help="Directory with train.jsonl and val.jsonl")
+    parser.add_argument("--model-dir", default=os.environ.get("MODEL_DIR", "models/latest"))
+    parser.add_argument("--output", default=None, help=f"Output file (default: <model-dir>/{FIRST_STAGE_FILENAME})")
+    parser.add_argument("--max-samples", type=int, default=0, help="Cap on training texts (0 = all)")
+    parser.add_argument("--max-features", type=int, default=200_000)
+    parser.add_argument("--min-df", type=int, default=2)
+    parser.add_argument("--c", type=float, default=4.0, help="Inverse regularization strength")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run(parse_args())
@@ -0,0 +1,94 @@
+"""Tune serving settings for this machine and write a serving profile.
+
+Sweeps torch threads x max batch size, then sequence-length buckets, then
+the micro-batching wait, against a realistic text-length distribution.
+Throughput and p50/p99 are logged for every configuration. The winners are
+stored under this machine's key in <model-dir>.serving_profile.json next
+to the model directory (or --output), and the API applies them at startup
+(SERVING_PROFILE=auto) when its backend and precision match. Env vars that
+are explicitly set still override the profile.
+
+Run it on each instance type you deploy to; entries for other machines in
+the same file are kept.
+
+Usage:
+    py scripts/tune_serving.py --model-dir models/latest --data data/processed/test.jsonl
+    py scripts/tune_serving.py --threads 1 2 4 --batch-sizes 8 16 32 --duration 1 --dry-run
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.serving import inference
+from src.serving.autotune import DEFAULT_BATCH_SIZES, DEFAULT_WAIT_OPTIONS_MS, load_texts, tune
+from src.serving.serving_profile import default_profile_path, save_profile
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+DEFAULT_DATA = os.path.join("data", "processed", "test.jsonl")
+
+
+def run(args) -> dict:
+    data = args.data or (DEFAULT_DATA if os.path.exists(DEFAULT_DATA) else None)
+    texts = load_texts(data, args.samples, seed=args.seed)
+    logger.info("Tuning on %d %s texts", len(texts), "sampled" if data else "synthetic")
+
+    precision = (args.precision or inference.INFERENCE_PRECISION).lower()
+    artifacts = inference.model_fn(args.model_dir, precision=precision, backend=args.backend)
+    profile = tune(
+        artifacts,
+        texts,
+        thread_options=args.threads,
+        batch_sizes=args.batch_sizes,
+        wait_options_ms=args.waits,
+        p99_budget_ms=args.p99_budget_ms,
+        load_factor=args.load_factor,
+        duration_s=args.duration,
+        min_requests=args.min_requests,
+        precision=precision,
+        seed=args.seed,
+    )
+    summary = {key: value for key, value in profile.to_dict().items() if key != "measured"}
+    summary["measured"] = {key: value for key, value in profile.measured.items() if key != "trials"}
+    logger.info("Best profile for %s:\n%s", profile.machine["key"], json.dumps(summary, indent=2))
+
+    if not args.dry_run:
+        path = save_profile(args.output or default_profile_path(args.model_dir), profile)
+        logger.info("Wrote serving profile to %s", path)
+    return profile.to_dict()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Tune serving settings for this machine")
+    parser.add_argument("--model-dir", default=os.environ.get("MODEL_DIR", "models/latest"))
+    parser.add_argument("--backend", default=None, choices=["pytorch", "onnx"],
+                        help="Backend to tune (default: INFERENCE_BACKEND)")
+    parser.add_argument("--precision", default=None, choices=["fp32", "int8", "bf16"],
+                        help="Precision to tune (default: INFERENCE_PRECISION)")
+    parser.add_argument("--data", default=None,
+                        help=f"JSONL file with a 'text' field (default: {DEFAULT_DATA} if present, else synthetic)")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--threads", type=int, nargs="+", default=None,
+                        help="torch thread counts to try (default: powers of two up to the core count)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=list(DEFAULT_BATCH_SIZES))
+    parser.add_argument("--waits", type=float, nargs="+", default=list(DEFAULT_WAIT_OPTIONS_MS),
+                        help="Batching waits to try, in ms")
+    parser.add_argument("--p99-budget-ms", type=float, default=100.0,
+                        help="Rule out batch sizes whose p99 batch latency exceeds this")
+    parser.add_argument("--load-factor", type=float, default=0.7,
+                        help="Offered load for the batching-wait sweep, as a fraction of peak throughput")
+    parser.add_argument("--duration", type=float, default=2.0, help="Seconds per configuration")
+    parser.add_argument("--min-requests", type=int, default=100, help="Minimum requests per batching-wait trial")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Profile file (default: <model-dir>.serving_profile.json)")
+    parser.add_argument("--dry-run", action="store_true", help="Report the best profile without writing it")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run(parse_args())
@@ -10,6 +10,7 @@ from transformers import AutoTokenizer
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 import config
+from src.utils.bucketing import length_buckets, normalize_boundaries, pad_bucket
 from src.utils.logging_config import setup_logging
 
 logger = setup_logging(__name__)
@@ -62,6 +63,52 @@ def tokenize_dataset(texts: list, tokenizer, max_length: int = None) -> dict:
     }
 
 
+def tokenize_dataset_bucketed(
+    texts: list,
+    tokenizer,
+    max_length: int = None,
+    boundaries: list = None,
+) -> list:
+    """
+    Tokenize texts with length-bucketed dynamic padding.
+
+    Texts are tokenized once without padding, sorted by token length and split
+    into buckets. Each bucket is padded only to its own longest sequence, so
+    short headlines no longer pay for a full max_length forward pass.
+
+    Args:
+        texts: List of text strings
+        tokenizer: HuggingFace tokenizer
+        max_length: Max sequence length (defaults to config)
+        boundaries: Ascending bucket upper bounds (defaults to 32/64/max_length)
+
+    Returns:
+        List of dicts with indices, input_ids, attention_mask. ``indices``
+        holds each row's position in ``texts`` so callers can restore the
+        original order.
+    """
+    import torch
+
+    max_length = max_length or config.MAX_SEQ_LENGTH
+    boundaries = normalize_boundaries(boundaries, max_length)
+
+    encodings = tokenizer(texts, truncation=True, max_length=max_length)
+    lengths = [len(ids) for ids in encodings["input_ids"]]
+    pad_token_id = tokenizer.pad_token_id or 0
+
+    buckets = []
+    for indices in length_buckets(lengths, boundaries):
+        padded = pad_bucket(encodings, indices, pad_token_id)
+        buckets.append(
+            {
+                "indices": torch.tensor(indices),
+                "input_ids": torch.tensor(padded["input_ids"]),
+                "attention_mask": torch.tensor(padded["attention_mask"]),
+            }
+        )
+    return buckets
+
+
 def create_splits(
     df: pd.DataFrame,
     val_size: float = 0.1,
@@ -1,23 +1,42 @@
 """FastAPI inference service for AG News text classification."""
 
+import asyncio
+import functools
+import hmac
 import json
 import os
 import random
 import re
+import threading
 import time
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import Response
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
+from src.serving.batching import MicroBatcher
+from src.serving.cache import JSONFileCache, PredictionCache, etag_matches
+from src.serving.executor import InferenceExecutor, QueueFullError
+from src.serving.model_registry import CANDIDATE, PRIMARY, SLOTS, ModelRegistry, ModelVersion, directory_signature
+from src.serving.serving_profile import ServingProfile, default_profile_path, load_profile
+from src.serving.static_files import DashboardBundle
+from src.serving.streaming import NDJSONStreamingResponse, iter_ndjson_items, stream_predictions
+from src.serving.telemetry import (
+    CACHE_LOOKUPS_TOTAL,
+    CASCADE_PREDICTIONS_TOTAL,
+    MODEL_MODE,
+    PREDICTIONS_TOTAL,
+    REQUEST_SECONDS,
+    STAGE_SECONDS,
+)
+from src.utils.instrumentation import PROMETHEUS_CONTENT_TYPE, REGISTRY
 from src.utils.logging_config import setup_logging
-from src.utils.rate_limiter import EndpointRateLimiter, RateLimiterMiddleware
+from src.utils.rate_limiter import RateLimiter, RateLimiterMiddleware, create_store
+from src.utils.serialization import FastJSONResponse
 from src.utils.validation import ValidationError, validate_text
 
 logger = setup_logging(__name__)
@@ -25,12 +44,50 @@ logger = setup_logging(__name__)
 LABEL_MAP = {0: "World", 1: "Sports", 2: "Business", 3: "Sci/Tech"}
 MODEL_DIR = os.environ.get("MODEL_DIR", "models/latest")
 MAX_TEXTS_PER_REQUEST = 32
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", "32"))
+MAX_BATCH_WAIT_MS = float(os.environ.get("MAX_BATCH_WAIT_MS", "5"))
+INFERENCE_QUEUE_SIZE = int(os.environ.get("INFERENCE_QUEUE_SIZE", "64"))
+INFERENCE_RETRY_AFTER_S = float(os.environ.get("INFERENCE_RETRY_AFTER_S", "1"))
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_TTL_S = float(os.environ.get("PREDICTION_CACHE_TTL_S", "600"))
+# "memory" (per worker), "sqlite" (shared by workers on one host) or "redis" (shared across hosts).
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+# Batch sizes exercised by the startup warmup before /ready reports ready.
+WARMUP_BATCH_SIZES = sorted(
+    {int(size) for size in os.environ.get("WARMUP_BATCH_SIZES", f"1,{MAX_BATCH_SIZE}").split(",") if size.strip()}
+)
+# Inference worker processes: 0 runs the model in the API process; otherwise the pool
+# scales between INFERENCE_WORKERS_MIN and INFERENCE_WORKERS_MAX with queue depth.
+INFERENCE_WORKERS_MIN = int(os.environ.get("INFERENCE_WORKERS_MIN", "1"))
+INFERENCE_WORKERS_MAX = int(os.environ.get("INFERENCE_WORKERS_MAX", "0"))
+# Cores (and torch threads) per worker; 0 splits the available cores evenly.
+INFERENCE_WORKER_THREADS = int(os.environ.get("INFERENCE_WORKER_THREADS", "0"))
+INFERENCE_WORKER_IDLE_S = float(os.environ.get("INFERENCE_WORKER_IDLE_S", "60"))
+# Tuned settings from scripts/tune_serving.py: "auto" reads <MODEL_DIR>.serving_profile.json,
+# "off" disables it, anything else is a path. Explicitly set env vars win over the profile.
+SERVING_PROFILE = os.environ.get("SERVING_PROFILE", "auto")
+# Cascade: texts whose calibrated first-stage confidence (first_stage.npz in the model
+# directory, from scripts/train_cascade.py) reaches this skip the model. 0 disables it.
+CASCADE_THRESHOLD = float(os.environ.get("CASCADE_THRESHOLD", "0"))
+# Content-addressed cache of downloaded model files, reused across restarts and reloads.
+MODEL_CACHE_DIR = os.environ.get("MODEL_CACHE_DIR") or str(Path.home() / ".cache" / "newssnap" / "models")
+MODEL_DOWNLOAD_WORKERS = int(os.environ.get("MODEL_DOWNLOAD_WORKERS", "8"))
+# Seconds between checks of MODEL_DIR for new model files (0 disables the watcher).
+MODEL_WATCH_INTERVAL_S = float(os.environ.get("MODEL_WATCH_INTERVAL_S", "0"))
+# Token for the /admin endpoints; they are disabled when unset.
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+# "candidate" routes a request to the candidate model when one is loaded.
+MODEL_VERSION_HEADER = "x-model-version"
+# Retry-After (seconds) on 503s sent while the model is still loading or warming up.
+MODEL_NOT_READY_RETRY_AFTER_S = 5
 MAX_TEXT_LENGTH = 5000
+MAX_STREAM_LINE_BYTES = 64 * 1024
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DASHBOARD_DIST_DIR = PROJECT_ROOT / "dashboard" / "dist"
 METRICS_DIR = PROJECT_ROOT / "models" / "latest"
 
-_model_state = {"mode": None, "artifacts": None, "loaded_at": None}
+# status: loading -> warming -> ready, or failed if warmup raised.
+_model_state = {"mode": None, "loaded_at": None, "status": "loading"}
 _start_time = time.time()
 
 
@@ -83,6 +140,7 @@ class PredictionResult(BaseModel):
     probabilities: dict
     model: str
     latency_ms: float
+    stage: Optional[str] = None
 
 
 class PredictResponse(BaseModel):
@@ -100,29 +158,89 @@ class HealthResponse(BaseModel):
 
 _KEYWORD_RULES = {
     0: [
-        r"\b(war|peace|government|president|minister|election|vote|country|nation|treaty|UN|united nations|summit|diplomat|refugee|military|army|conflict|politics|foreign|border|sanction|humanitarian)\b",
+        "war", "peace", "government", "president", "minister", "election", "vote", "country", "nation",
+        "treaty", "UN", "united nations", "summit", "diplomat", "refugee", "military", "army", "conflict",
+        "politics", "foreign", "border", "sanction", "humanitarian",
     ],
     1: [
-        r"\b(goal|score|win|won|defeat|champion|league|team|player|coach|game|match|tournament|cup|olympic|medal|NFL|NBA|FIFA|cricket|football|soccer|tennis|baseball|basketball|race|athlete)\b",
+        "goal", "score", "win", "won", "defeat", "champion", "league", "team", "player", "coach", "game",
+        "match", "tournament", "cup", "olympic", "medal", "NFL", "NBA", "FIFA", "cricket", "football", "soccer",
+        "tennis", "baseball", "basketball", "race", "athlete",
     ],
     2: [
-        r"\b(stock|market|shares|revenue|profit|company|CEO|billion|million|IPO|invest|acquisition|merger|earnings|growth|trade|economy|financial|bank|startup|venture|sales|quarterly|fiscal)\b",
+        "stock", "market", "shares", "revenue", "profit", "company", "CEO", "billion", "million", "IPO",
+        "invest", "acquisition", "merger", "earnings", "growth", "trade", "economy", "financial", "bank",
+        "startup", "venture", "sales", "quarterly", "fiscal",
     ],
     3: [
-        r"\b(AI|algorithm|software|hardware|chip|processor|satellite|NASA|space|research|scientist|technology|digital|internet|cyber|data|quantum|robot|biotech|genome|innovation|compute|launch|discover)\b",
+        "AI", "algorithm", "software", "hardware", "chip", "processor", "satellite", "NASA", "space",
+        "research", "scientist", "technology", "digital", "internet", "cyber", "data", "quantum", "robot",
+        "biotech", "genome", "innovation", "compute", "launch", "discover",
     ],
 }
 
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def _build_keyword_trie(rules: dict) -> dict:
+    """
+    Compile keyword rules into a word-level trie.
+
+    Each node maps a lowercase word to its child node; the ``None`` key marks
+    the end of a keyword and holds its label id. Multi-word keywords such as
+    "united nations" become a path of several words.
+    """
+    trie: dict = {}
+    for label_id, keywords in rules.items():
+        for keyword in keywords:
+            node = trie
+            for word in keyword.lower().split():
+                node = node.setdefault(word, {})
+            node[None] = label_id
+    return trie
+
+
+_KEYWORD_TRIE = _build_keyword_trie(_KEYWORD_RULES)
+
+
+def _keyword_counts(texts: List[str]) -> List[List[int]]:
+    """
+    Count whole-word keyword hits per label in a single pass over each text.
+
+    At every word the trie is walked as far as the following words allow and
+    the longest keyword wins, so "united nations" counts once and its words
+    are not rescanned.
+    """
+    results = []
+    for text in texts:
+        counts = [0] * len(_KEYWORD_RULES)
+        words = _WORD_PATTERN.findall(text.lower())
+        pos = 0
+        while pos < len(words):
+            node = _KEYWORD_TRIE.get(words[pos])
+            match_label, match_end = None, pos + 1
+            end = pos + 1
+            while node is not None:
+                if None in node:
+                    match_label, match_end = node[None], end
+                if end >= len(words):
+                    break
+                node = node.get(words[end])
+                end += 1
+            if match_label is not None:
+                counts[match_label] += 1
+                pos = match_end
+            else:
+                pos += 1
+        results.append(counts)
+    return results
+
 
 def _demo_predict(texts: List[str]) -> List[dict]:
     """Keyword-based heuristic classifier for demo mode."""
     results = []
-    for text in texts:
-        scores = {}
-        text_lower = text.lower()
-        for label_id, patterns in _KEYWORD_RULES.items():
-            count = sum(len(re.findall(pattern, text_lower, re.IGNORECASE)) for pattern in patterns)
-            scores[label_id] = count + random.uniform(0.01, 0.3)
+    for text, counts in zip(texts, _keyword_counts(texts)):
+        scores = {label_id: count + random.uniform(0.01, 0.3) for label_id, count in enumerate(counts)}
 
         total = sum(scores.values())
         if total < 1.0:
@@ -149,13 +267,13 @@ def _demo_predict(texts: List[str]) -> List[dict]:
     return results
 
 
-def _real_predict(texts: List[str]) -> List[dict]:
+def _real_predict(texts: List[str], artifacts: dict) -> List[dict]:
     """Real DistilBERT inference using loaded model artifacts."""
     from src.serving.inference import input_fn, predict_fn
 
     started = time.time()
     input_data = input_fn(json.dumps({"text": texts}))
-    raw_results = predict_fn(input_data, _model_state["artifacts"])
+    raw_results = predict_fn(input_data, artifacts)
     elapsed_ms = (time.time() - started) * 1000
 
     per_item_ms = elapsed_ms / len(texts) if texts else 0
@@ -179,76 +297,442 @@ def _maybe_download_model_from_s3(model_path: Path) -> None:
     Enabled when:
     - S3_BUCKET_MODELS is set
     - and MODEL_DIR does not already contain config.json
+
+    Files already in MODEL_CACHE_DIR (matched by ETag and size) are not fetched again.
     """
     if model_path.exists() and (model_path / "config.json").exists():
         return
 
     bucket = os.environ.get("S3_BUCKET_MODELS")
     prefix = os.environ.get("MODEL_S3_PREFIX", "public/models/latest").strip("/")
-    region = os.environ.get("AWS_DEFAULT_REGION", "us-east-1")
     if not bucket:
         return
 
     try:
-        import boto3
+        from src.serving.model_download import sync_model_from_s3
 
         logger.info("Model not found locally. Attempting S3 download from s3://%s/%s", bucket, prefix)
-        s3 = boto3.client("s3", region_name=region)
-        paginator = s3.get_paginator("list_objects_v2")
-
-        downloaded = 0
-        total_bytes = 0
-        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
-            for obj in page.get("Contents", []):
-                key = obj["Key"]
-                rel = key[len(prefix):].lstrip("/")
-                if not rel:
-                    continue
-
-                destination = model_path / rel
-                destination.parent.mkdir(parents=True, exist_ok=True)
-                s3.download_file(bucket, key, str(destination))
-                downloaded += 1
-                total_bytes += int(obj.get("Size", 0))
-
-        logger.info(
-            "Downloaded %d model artifact(s) from S3 (%d bytes) into %s",
-            downloaded,
-            total_bytes,
-            model_path,
+        sync_model_from_s3(
+            bucket,
+            prefix,
+            str(model_path),
+            cache_dir=MODEL_CACHE_DIR,
+            max_workers=MODEL_DOWNLOAD_WORKERS,
         )
     except Exception as exc:
         logger.warning("S3 model download failed: %s", exc)
 
 
-def _load_model() -> None:
-    """Load model on startup with fallback to demo mode."""
+def _load_with_backend(model_dir: str, backend: str) -> dict:
+    if INFERENCE_WORKERS_MAX > 0:
+        from src.serving.worker_pool import load_pooled_model
+
+        return load_pooled_model(
+            model_dir,
+            min_workers=min(INFERENCE_WORKERS_MIN, INFERENCE_WORKERS_MAX),
+            max_workers=INFERENCE_WORKERS_MAX,
+            threads_per_worker=INFERENCE_WORKER_THREADS,
+            backend=backend,
+            max_batch_size=MAX_BATCH_SIZE,
+            warmup_batch_sizes=WARMUP_BATCH_SIZES,
+            idle_timeout_s=INFERENCE_WORKER_IDLE_S,
+        )
+
+    from src.serving.inference import model_fn
+
+    return model_fn(model_dir, backend=backend)
+
+
+def _load_artifacts(model_dir: str) -> dict:
+    """Load a model with the configured backend, falling back to PyTorch, plus its cascade first stage."""
+    from src.serving.inference import INFERENCE_BACKEND
+
+    try:
+        artifacts = _load_with_backend(model_dir, INFERENCE_BACKEND)
+    except Exception as exc:
+        if INFERENCE_BACKEND == "pytorch":
+            raise
+        logger.warning("%s backend unavailable: %s. Falling back to PyTorch.", INFERENCE_BACKEND, exc)
+        artifacts = _load_with_backend(model_dir, "pytorch")
+
+    if CASCADE_THRESHOLD > 0:
+        from src.serving.cascade import load_first_stage
+
+        artifacts["first_stage"] = load_first_stage(model_dir)
+        if artifacts["first_stage"] is None:
+            logger.warning("CASCADE_THRESHOLD is set but %s has no usable first-stage model; cascade disabled", model_dir)
+    return artifacts
+
+
+def _release_artifacts(artifacts: dict) -> None:
+    """Free resources a retired model holds outside this process (its worker pool)."""
+    if artifacts.get("backend") == "workers":
+        artifacts["model"].close()
+
+
+def _warm_artifacts(artifacts: dict) -> None:
+    from src.serving.inference import warmup
+
+    warmup(artifacts, WARMUP_BATCH_SIZES)
+
+
+def _apply_serving_profile() -> Optional[ServingProfile]:
+    """Use this machine's tuned batch size, batching wait, buckets and threads where no env var sets them."""
+    global MAX_BATCH_SIZE, MAX_BATCH_WAIT_MS, WARMUP_BATCH_SIZES, INFERENCE_WORKER_THREADS
+
+    if SERVING_PROFILE == "off":
+        return None
+    path = default_profile_path(MODEL_DIR) if SERVING_PROFILE == "auto" else Path(SERVING_PROFILE)
+    profile = load_profile(path)
+    if profile is None:
+        return None
+
+    from src.serving import inference
+    from src.utils.bucketing import normalize_boundaries
+
+    tuned = (profile.backend, profile.precision)
+    serving = (inference.INFERENCE_BACKEND, inference.INFERENCE_PRECISION)
+    if tuned != serving:
+        logger.warning(
+            "Serving profile %s was tuned for backend=%s precision=%s, not backend=%s precision=%s; ignoring it",
+            path,
+            *tuned,
+            *serving,
+        )
+        return None
+
+    applied = {}
+    if "MAX_BATCH_SIZE" not in os.environ:
+        MAX_BATCH_SIZE = applied["max_batch_size"] = profile.max_batch_size
+        if "WARMUP_BATCH_SIZES" not in os.environ:
+            WARMUP_BATCH_SIZES = sorted({1, MAX_BATCH_SIZE})
+    if "MAX_BATCH_WAIT_MS" not in os.environ:
+        MAX_BATCH_WAIT_MS = applied["max_batch_wait_ms"] = profile.max_batch_wait_ms
+    if "SEQ_LENGTH_BUCKETS" not in os.environ:
+        inference.SEQ_LENGTH_BUCKETS = applied["seq_length_buckets"] = normalize_boundaries(
+            profile.seq_length_buckets, inference.MAX_SEQ_LENGTH
+        )
+    if profile.num_threads:
+        if INFERENCE_WORKERS_MAX > 0:
+            if "INFERENCE_WORKER_THREADS" not in os.environ:
+                INFERENCE_WORKER_THREADS = applied["worker_threads"] = profile.num_threads
+        elif inference.INFERENCE_BACKEND == "pytorch":
+            import torch
+
+            torch.set_num_threads(profile.num_threads)
+            applied["num_threads"] = profile.num_threads
+
+    logger.info("Applied serving profile %s (%s): %s", path, profile.machine.get("key"), applied)
+    return profile
+
+
+def _load_model() -> Optional[dict]:
+    """
+    Load model on startup with fallback to demo mode.
+
+    Returns:
+        The artifacts, or None after switching to demo mode. Real mode is only
+        entered once the artifacts are warmed and installed as primary.
+    """
     model_path = Path(MODEL_DIR)
     logger.info("Attempting to load model from %s", MODEL_DIR)
     _maybe_download_model_from_s3(model_path)
 
     if model_path.exists() and (model_path / "config.json").exists():
         try:
-            from src.serving.inference import model_fn
-
-            _model_state["artifacts"] = model_fn(str(model_path))
-            _model_state["mode"] = "real"
-            _model_state["loaded_at"] = time.time()
-            logger.info("Successfully loaded model from %s", MODEL_DIR)
-            return
+            _apply_serving_profile()
+            artifacts = _load_artifacts(str(model_path))
+            logger.info("Successfully loaded model from %s (backend=%s)", MODEL_DIR, artifacts["backend"])
+            return artifacts
         except Exception as exc:
             logger.warning("Failed to load model: %s. Falling back to demo mode.", exc)
 
-    _model_state["mode"] = "demo"
-    _model_state["artifacts"] = None
-    _model_state["loaded_at"] = time.time()
+    _set_mode("demo")
     logger.warning("Running in demo mode")
+    return None
+
+
+def _set_mode(mode: str, loaded_at: Optional[float] = None) -> None:
+    _model_state["mode"] = mode
+    _model_state["loaded_at"] = loaded_at or time.time()
+    _set_mode_gauge(mode)
+
+
+def _set_mode_gauge(mode: str) -> None:
+    for name in ("real", "demo"):
+        MODEL_MODE.labels(name).set(1 if name == mode else 0)
+
+
+# One batch per inference worker process can be in flight; a single in-process model takes one at a time.
+_BATCH_CONCURRENCY = max(1, INFERENCE_WORKERS_MAX)
+_executor = InferenceExecutor(
+    max_workers=_BATCH_CONCURRENCY,
+    max_queue_size=INFERENCE_QUEUE_SIZE,
+    retry_after_s=INFERENCE_RETRY_AFTER_S,
+)
+
+
+def _make_batcher(artifacts: dict) -> MicroBatcher:
+    return MicroBatcher(
+        functools.partial(_real_predict, artifacts=artifacts),
+        max_batch_size=MAX_BATCH_SIZE,
+        max_wait_ms=MAX_BATCH_WAIT_MS,
+        executor=_executor,
+        max_queue_size=INFERENCE_QUEUE_SIZE,
+        concurrency=_BATCH_CONCURRENCY,
+    )
+
+
+_registry = ModelRegistry(_load_artifacts, _warm_artifacts, _make_batcher, release_artifacts=_release_artifacts)
+_prediction_cache = PredictionCache(max_size=PREDICTION_CACHE_SIZE, ttl_seconds=PREDICTION_CACHE_TTL_S)
+_json_file_cache = JSONFileCache()
+_dashboard_state = {"bundle": None}
+_dashboard_lock = threading.Lock()
+
+
+def _dashboard() -> DashboardBundle:
+    """
+    The dashboard build, indexed into memory on first use.
+
+    Indexing compresses every asset, so it is blocking work: startup runs it in
+    a background thread, and the (sync) dashboard routes wait on the lock
+    rather than indexing a second time.
+    """
+    if _dashboard_state["bundle"] is None:
+        with _dashboard_lock:
+            if _dashboard_state["bundle"] is None:
+                _dashboard_state["bundle"] = DashboardBundle(DASHBOARD_DIST_DIR)
+    return _dashboard_state["bundle"]
+
+
+async def _index_dashboard() -> None:
+    try:
+        await asyncio.to_thread(_dashboard)
+    except Exception as exc:
+        logger.exception("Indexing the dashboard failed: %s", exc)
+
+_VALIDATION = STAGE_SECONDS.labels("validation")
+_SERIALIZATION = STAGE_SECONDS.labels("serialization")
+
+
+def _model_id(mode: str, version: Optional[ModelVersion] = None) -> str:
+    """Identity of the model serving predictions, so cache entries never cross models."""
+    if mode == "real":
+        return version.version_id if version else f"{MODEL_DIR}@{_model_state['loaded_at']}"
+    return "demo-heuristic"
+
+
+def _first_stage_predict(texts: List[str], classifier) -> Tuple[List[Optional[dict]], List[int]]:
+    """
+    Answer the texts the cascade first stage is confident about.
+
+    Returns:
+        A result per text (None where the model must decide) and the indices of those texts
+    """
+    from src.serving.cascade import split_by_confidence
+
+    started = time.perf_counter()
+    probs = classifier.predict_proba(texts)
+    confident, unsure = split_by_confidence(probs, CASCADE_THRESHOLD)
+    per_item_ms = (time.perf_counter() - started) * 1000 / len(texts)
+
+    results: List[Optional[dict]] = [None] * len(texts)
+    for idx in confident.tolist():
+        label = int(probs[idx].argmax())
+        row = [round(value, 4) for value in probs[idx].tolist()]
+        text = texts[idx]
+        results[idx] = {
+            "text": text[:200] + "..." if len(text) > 200 else text,
+            "label": classifier.labels[label],
+            "confidence": row[label],
+            "probabilities": dict(zip(classifier.labels, row)),
+            "model": "cascade-linear",
+            "latency_ms": round(per_item_ms, 2),
+            "stage": "first",
+        }
+    return results, unsure.tolist()
+
+
+async def _model_predictions(texts: List[str], version: Optional[ModelVersion] = None) -> List[dict]:
+    if version is None:
+        raise _model_not_ready()
+    if version.batcher.running:
+        return await version.batcher.submit(texts)
+    return await _executor.submit(_real_predict, texts, version.artifacts)
+
+
+async def _cascade_predictions(texts: List[str], classifier, version: Optional[ModelVersion]) -> List[dict]:
+    """Let the first stage answer confident texts and send only the rest through the model."""
+    results, unsure = _first_stage_predict(texts, classifier)
+    CASCADE_PREDICTIONS_TOTAL.labels("first").inc(len(texts) - len(unsure))
+    CASCADE_PREDICTIONS_TOTAL.labels("second").inc(len(unsure))
+    if unsure:
+        second = await _model_predictions([texts[idx] for idx in unsure], version)
+        for idx, result in zip(unsure, second):
+            results[idx] = {**result, "stage": "second"}
+    return results
+
+
+async def _run_predictions(texts: List[str], mode: str, version: Optional[ModelVersion] = None) -> List[dict]:
+    if mode == "real":
+        classifier = version.artifacts.get("first_stage") if version is not None else None
+        if classifier is not None and CASCADE_THRESHOLD > 0:
+            return await _cascade_predictions(texts, classifier, version)
+        return await _model_predictions(texts, version)
+    return _demo_predict(texts)
+
+
+async def _cached_predict(texts: List[str], mode: str, version: Optional[ModelVersion] = None) -> List[dict]:
+    """Serve cache hits directly and run the model only on unique misses."""
+    model_id = _model_id(mode, version)
+    cached, missing = _prediction_cache.split(model_id, texts)
+    predictions = [{**result, "latency_ms": 0.0} if result else None for result in cached]
+    CACHE_LOOKUPS_TOTAL.labels("hit").inc(len(texts) - len(missing))
+    CACHE_LOOKUPS_TOTAL.labels("miss").inc(len(missing))
+    PREDICTIONS_TOTAL.labels(mode).inc(len(texts))
+    if not missing:
+        return predictions
+
+    miss_texts = list(dict.fromkeys(texts[idx] for idx in missing))
+    fresh = dict(zip(miss_texts, await _run_predictions(miss_texts, mode, version)))
+    for text, result in fresh.items():
+        _prediction_cache.put(model_id, text, result)
+    for idx in missing:
+        predictions[idx] = fresh[texts[idx]]
+    return predictions
+
+
+def _model_expected() -> bool:
+    """True when startup will load a real model (local files or an S3 source), not the demo heuristic."""
+    return (Path(MODEL_DIR) / "config.json").exists() or bool(os.environ.get("S3_BUCKET_MODELS"))
+
+
+def _model_not_ready() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Model is loading, retry shortly",
+        headers={"Retry-After": str(MODEL_NOT_READY_RETRY_AFTER_S)},
+    )
+
+
+def _route(request: Request) -> Tuple[str, Optional[ModelVersion]]:
+    """
+    Serving mode and model version for a request, honouring the X-Model-Version header.
+
+    Raises:
+        HTTPException: 503 while a real model is still loading or warming up (no primary
+            installed yet), so demo predictions never stand in for it
+    """
+    mode = _model_state.get("mode")
+    if mode is None:
+        if _model_expected():
+            raise _model_not_ready()
+        mode = "demo"
+    if mode != "real":
+        return mode, None
+    version = _registry.resolve(request.headers.get(MODEL_VERSION_HEADER))
+    if version is None:
+        raise _model_not_ready()
+    return mode, version
+
+
+@contextmanager
+def _routed(request: Request) -> Iterator[Tuple[str, Optional[ModelVersion]]]:
+    """
+    ``_route`` the request and hold the version until the block exits.
+
+    Resolving and holding happen without yielding to the event loop, so a
+    hot reload either sees the hold and waits for it before releasing the old
+    version, or has already installed the new one and the request gets that.
+    """
+    mode, version = _route(request)
+    if version is None:
+        yield mode, version
+        return
+    with version.hold():
+        yield mode, version
+
+
+def _preload_backend() -> None:
+    """Import the inference backend's heavy modules; never called on demo-only instances."""
+    try:
+        from src.serving.inference import INFERENCE_BACKEND, preload
+
+        preload(INFERENCE_BACKEND)
+    except Exception as exc:
+        logger.debug("Backend preload failed: %s", exc)
+
+
+async def _load_and_warm() -> None:
+    """Load the model off the event loop, warm it up and install it as primary, then mark ready."""
+    _model_state["status"] = "loading"
+    if _model_expected():
+        # Overlap torch/transformers imports with the S3 download instead of paying for them after it.
+        _, artifacts = await asyncio.gather(asyncio.to_thread(_preload_backend), asyncio.to_thread(_load_model))
+    else:
+        artifacts = await asyncio.to_thread(_load_model)
+    if artifacts is None:
+        _model_state["status"] = "ready"
+        return
+
+    _model_state["status"] = "warming"
+    try:
+        version = await _registry.load(PRIMARY, MODEL_DIR, artifacts=artifacts)
+    except Exception as exc:
+        logger.exception("Model warmup failed: %s. Falling back to demo mode.", exc)
+        _set_mode("demo")
+        _model_state["status"] = "failed"
+        return
+    _set_mode("real", version.loaded_at)
+    _model_state["status"] = "ready"
+
+
+async def _reload_primary(model_dir: str) -> ModelVersion:
+    """Hot-swap the primary model; a demo instance switches to real mode."""
+    version = await _registry.load(PRIMARY, model_dir)
+    _set_mode("real", version.loaded_at)
+    _model_state["status"] = "ready"
+    return version
+
+
+async def _watch_model_dir() -> None:
+    """Reload the primary model when MODEL_DIR changes on disk and has stopped changing."""
+    model_path = Path(MODEL_DIR)
+    current = await asyncio.to_thread(directory_signature, model_path)
+    pending = None
+    while True:
+        await asyncio.sleep(MODEL_WATCH_INTERVAL_S)
+        signature = await asyncio.to_thread(directory_signature, model_path)
+        if signature == current or not any(name == "config.json" for name, _, _ in signature):
+            pending = None
+            continue
+        if signature != pending:
+            # Wait one more interval so a copy in progress is not loaded half written.
+            pending = signature
+            continue
+
+        logger.info("Model files in %s changed; reloading", MODEL_DIR)
+        current, pending = signature, None
+        try:
+            await _reload_primary(MODEL_DIR)
+        except Exception as exc:
+            logger.exception("Model reload from %s failed; keeping the current model: %s", MODEL_DIR, exc)
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    _load_model()
+    tasks = [asyncio.create_task(_index_dashboard()), asyncio.create_task(_load_and_warm())]
+    if MODEL_WATCH_INTERVAL_S > 0:
+        tasks.append(asyncio.create_task(_watch_model_dir()))
     yield
+    for task in tasks:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await _registry.close()
+    _executor.shutdown()
 
 
 app = FastAPI(
@@ -264,10 +748,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.add_middleware(RateLimiterMiddleware, requests_per_minute=100)
+rate_limiter = RateLimiter(
+    store=create_store(
+        RATE_LIMIT_BACKEND,
+        sqlite_path=os.environ.get("RATE_LIMIT_SQLITE_PATH"),
+        redis_url=os.environ.get("RATE_LIMIT_REDIS_URL"),
+    )
+)
+rate_limiter.set_limit("global", requests_per_window=100, window_seconds=60)
+rate_limiter.set_limit("predict", requests_per_window=50, window_seconds=60)
 
-endpoint_limiter = EndpointRateLimiter()
-endpoint_limiter.set_limit("predict", requests_per_window=50, window_seconds=60)
+app.add_middleware(RateLimiterMiddleware, limiter=rate_limiter, rule="global")
 
 
 @app.get("/health", response_model=HealthResponse)
@@ -280,37 +771,125 @@ def health():
     }
 
 
-def _load_json_file(path: Path):
-    if not path.exists():
-        raise HTTPException(status_code=404, detail=f"Metrics file not found: {path.name}")
+@app.get("/ready")
+def ready():
+    """Readiness probe: 200 only once the model is loaded and warmed up."""
+    status = _model_state["status"]
+    payload = {"status": status, "mode": _model_state["mode"] or "initializing"}
+    if status != "ready":
+        return FastJSONResponse(
+            content=payload, status_code=503, headers={"Retry-After": str(MODEL_NOT_READY_RETRY_AFTER_S)}
+        )
+    return payload
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return _prediction_cache.stats()
+
+
+def _json_file_response(request: Request, path: Path, transform=None) -> Response:
     try:
-        with path.open("r", encoding="utf-8") as f:
-            return json.load(f)
+        body, etag = _json_file_cache.get(path, transform)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Metrics file not found: {path.name}")
     except Exception as exc:
         logger.warning("Failed reading JSON file %s: %s", path, exc)
         raise HTTPException(status_code=500, detail=f"Failed to read {path.name}")
 
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _wrap_history(history):
+    return {"metrics": history} if isinstance(history, list) else history
+
 
 @app.get("/metrics/latest_evaluation.json")
-def latest_evaluation():
-    return JSONResponse(content=_load_json_file(METRICS_DIR / "evaluation_results.json"))
+def latest_evaluation(request: Request):
+    return _json_file_response(request, METRICS_DIR / "evaluation_results.json")
 
 
 @app.get("/metrics/latest_metrics.json")
-def latest_metrics():
-    history = _load_json_file(METRICS_DIR / "training_history.json")
-    if isinstance(history, list):
-        return JSONResponse(content={"metrics": history})
-    return JSONResponse(content=history)
+def latest_metrics(request: Request):
+    return _json_file_response(request, METRICS_DIR / "training_history.json", _wrap_history)
+
+
+class ModelLoadRequest(BaseModel):
+    model_dir: Optional[str] = Field(default=None, description="Model directory; defaults to MODEL_DIR")
+
+
+def _require_admin(request: Request) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API disabled (set ADMIN_TOKEN)")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@app.get("/admin/models")
+def admin_models(request: Request):
+    _require_admin(request)
+    return {"mode": _model_state["mode"], "status": _model_state["status"], "versions": _registry.describe()}
+
+
+@app.post("/admin/models/{slot}/load")
+async def admin_load_model(slot: str, request: Request, body: Optional[ModelLoadRequest] = None):
+    """Load and warm a model next to the serving one, then swap it into ``slot``."""
+    _require_admin(request)
+    if slot not in SLOTS:
+        raise HTTPException(status_code=404, detail=f"Unknown model slot: {slot}")
+    model_dir = (body.model_dir if body else None) or MODEL_DIR
+    if not (Path(model_dir) / "config.json").exists():
+        raise HTTPException(status_code=400, detail=f"No model found in {model_dir}")
+
+    try:
+        if slot == PRIMARY:
+            version = await _reload_primary(model_dir)
+        else:
+            version = await _registry.load(CANDIDATE, model_dir)
+    except Exception as exc:
+        logger.exception("Loading %s model from %s failed: %s", slot, model_dir, exc)
+        raise HTTPException(status_code=500, detail=f"Failed to load model from {model_dir}")
+    return version.describe()
+
+
+@app.post("/admin/models/promote")
+async def admin_promote_model(request: Request):
+    """Make the candidate the primary model."""
+    _require_admin(request)
+    try:
+        version = await _registry.promote()
+    except LookupError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    _model_state["loaded_at"] = version.loaded_at
+    return version.describe()
+
+
+@app.delete("/admin/models/candidate")
+async def admin_unload_candidate(request: Request):
+    _require_admin(request)
+    await _registry.unload(CANDIDATE)
+    return {"versions": _registry.describe()}
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
 
 
 @app.post("/predict", response_model=PredictResponse)
 async def predict(req: PredictRequest, request: Request):
     """Run inference on provided text(s)."""
+    started = time.perf_counter()
+    mode, version = _route(request)
     try:
         client_ip = request.client.host if request.client else "unknown"
-        await endpoint_limiter.rate_limit_check("predict", client_ip)
+        await rate_limiter.rate_limit_check("predict", client_ip)
 
+        validation_started = time.perf_counter()
         if req.text is not None:
             texts = [validate_text(req.text, min_length=1, max_length=MAX_TEXT_LENGTH, name="text")]
         elif req.texts is not None:
@@ -328,21 +907,36 @@ async def predict(req: PredictRequest, request: Request):
         if not texts:
             logger.warning("Prediction request with empty texts")
             raise HTTPException(status_code=400, detail="Texts cannot be empty")
+        _VALIDATION.observe(time.perf_counter() - validation_started)
 
         logger.info("Prediction request from %s: %d text(s)", client_ip, len(texts))
 
-        mode = _model_state.get("mode") or "demo"
-        predictions = _real_predict(texts) if mode == "real" else _demo_predict(texts)
+        # Route again: the model may have been swapped while the request was validated.
+        with _routed(request) as (mode, version):
+            predictions = await _cached_predict(texts, mode, version)
 
         logger.debug("Prediction completed: %d results", len(predictions))
-        return {
-            "predictions": predictions,
-            "mode": mode,
-            "model_dir": MODEL_DIR if mode == "real" else None,
-        }
+        slot = version.slot if version else mode
+        with _SERIALIZATION.time():
+            response = FastJSONResponse(
+                content={
+                    "predictions": predictions,
+                    "mode": mode,
+                    "model_dir": (version.model_dir if version else MODEL_DIR) if mode == "real" else None,
+                },
+                headers={"X-Model-Version": slot},
+            )
+        REQUEST_SECONDS.labels("predict", mode, slot).observe(time.perf_counter() - started)
+        return response
     except ValidationError as exc:
         logger.error("Validation error: %s", exc)
         raise HTTPException(status_code=422, detail=str(exc))
+    except QueueFullError as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="Inference queue is full, retry shortly",
+            headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+        )
     except HTTPException:
         raise
     except Exception as exc:
@@ -350,11 +944,44 @@ async def predict(req: PredictRequest, request: Request):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@app.post("/predict/stream")
+async def predict_stream(request: Request):
+    """
+    Bulk prediction over an NDJSON body.
+
+    Each line is a JSON string or {"text": ...}. Items are predicted in
+    batches as they arrive and results stream back as NDJSON in input order,
+    one {"index": i, ...prediction} or {"index": i, "error": ...} per line.
+    """
+    client_ip = request.client.host if request.client else "unknown"
+    await rate_limiter.rate_limit_check("predict", client_ip)
+
+    mode, version = _route(request)
+    slot = version.slot if version else mode
+    logger.info("Streaming prediction request from %s", client_ip)
+
+    async def predict_batch(texts: List[str]) -> List[dict]:
+        # Each batch uses the version serving now, so a stream outlives hot reloads.
+        with _routed(request) as (batch_mode, batch_version):
+            return await _cached_predict(texts, batch_mode, batch_version)
+
+    async def timed_body():
+        started = time.perf_counter()
+        try:
+            async for line in stream_predictions(items, predict_batch, batch_size=MAX_TEXTS_PER_REQUEST):
+                yield line
+        finally:
+            REQUEST_SECONDS.labels("predict_stream", mode, slot).observe(time.perf_counter() - started)
+
+    items = iter_ndjson_items(request.stream(), max_length=MAX_TEXT_LENGTH, max_line_bytes=MAX_STREAM_LINE_BYTES)
+    return NDJSONStreamingResponse(timed_body(), headers={"X-Model-Version": slot})
+
+
 @app.get("/")
-def root():
-    index_file = DASHBOARD_DIST_DIR / "index.html"
-    if index_file.exists():
-        return FileResponse(index_file)
+def root(request: Request):
+    bundle = _dashboard()
+    if bundle.index is not None:
+        return bundle.respond(bundle.index, request.headers)
 
     return {
         "service": "LLMOps Inference API",
@@ -362,24 +989,13 @@ def root():
         "docs": "/docs",
         "health": "/health",
         "predict": "POST /predict",
+        "predict_stream": "POST /predict/stream",
     }
 
 
-if (DASHBOARD_DIST_DIR / "assets").exists():
-    app.mount("/assets", StaticFiles(directory=str(DASHBOARD_DIST_DIR / "assets")), name="dashboard-assets")
-
-
 @app.get("/{full_path:path}", include_in_schema=False)
-def dashboard_spa_fallback(full_path: str):
-    if not DASHBOARD_DIST_DIR.exists():
+def dashboard_spa_fallback(full_path: str, request: Request):
+    asset = _dashboard().lookup(full_path)
+    if asset is None:
         raise HTTPException(status_code=404, detail="Not found")
-
-    requested = DASHBOARD_DIST_DIR / full_path
-    if requested.is_file():
-        return FileResponse(requested)
-
-    index_file = DASHBOARD_DIST_DIR / "index.html"
-    if index_file.exists():
-        return FileResponse(index_file)
-
-    raise HTTPException(status_code=404, detail="Not found")
+    return _dashboard().respond(asset, request.headers)
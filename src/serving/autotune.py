@@ -0,0 +1,326 @@
+"""
+Sweep serving knobs on the current machine and produce a ServingProfile.
+
+The sweep runs in three stages, each keeping the winners of the one before:
+
+1. torch threads x batch size: offline throughput of back-to-back batches
+   drawn from the text sample. Batch sizes whose p99 batch latency exceeds
+   the budget are ruled out.
+2. Sequence-length buckets: candidates come from quantiles of the sample's
+   token lengths and are measured at the chosen threads and batch size.
+3. Batching wait: a real MicroBatcher is driven with Poisson arrivals at a
+   fraction of the measured peak throughput. The wait with the lowest
+   request p99 that still keeps up with the offered load wins.
+"""
+
+import asyncio
+import json
+import math
+import random
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.serving import inference
+from src.serving.batching import MicroBatcher
+from src.serving.executor import InferenceExecutor
+from src.serving.serving_profile import ServingProfile, machine_fingerprint
+from src.utils.bucketing import normalize_boundaries
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+DEFAULT_BATCH_SIZES = (1, 4, 8, 16, 32, 64)
+DEFAULT_WAIT_OPTIONS_MS = (0, 1, 2, 5, 10, 20)
+
+# Headline-plus-lede vocabulary for synthetic AG News-like texts.
+_WORDS = (
+    "the a of to in and for on with as by at from its after over new said will has more than "
+    "stocks shares market profit quarter earnings oil prices bank rates inflation deal company "
+    "team season game win coach league match players final title record cup "
+    "government president minister election talks officials police court troops war peace "
+    "software internet computer research scientists space nasa launch study data chip network"
+).split()
+
+
+def synthetic_texts(count: int, seed: int = 0, mean_words: float = 38.0, sigma: float = 0.35) -> List[str]:
+    """AG News-like texts: word counts are log-normal around ``mean_words`` (title plus description)."""
+    rng = random.Random(seed)
+    mu = math.log(mean_words) - sigma ** 2 / 2
+    texts = []
+    for _ in range(count):
+        words = max(4, int(rng.lognormvariate(mu, sigma)))
+        texts.append(" ".join(rng.choice(_WORDS) for _ in range(words)))
+    return texts
+
+
+def load_texts(path: Optional[str], samples: int, seed: int = 0) -> List[str]:
+    """Sample texts from a JSONL file with a ``text`` field, or generate synthetic ones without a path."""
+    if not path:
+        return synthetic_texts(samples, seed)
+    with open(path, "r", encoding="utf-8") as f:
+        texts = [json.loads(line)["text"] for line in f if line.strip()]
+    rng = random.Random(seed)
+    return rng.sample(texts, samples) if len(texts) > samples else texts
+
+
+def bucket_candidates(lengths: Sequence[int], max_length: int) -> List[List[int]]:
+    """
+    Bucket boundary sets to try, derived from token length quantiles.
+
+    Boundaries are rounded up to a multiple of 8. The configured default
+    and a single bucket (pad to the batch's longest) are always included.
+    """
+    quantile_sets = ((), (50,), (50, 90), (25, 50, 75, 90), (10, 25, 50, 75, 90, 99))
+    candidates = [normalize_boundaries(inference.SEQ_LENGTH_BUCKETS, max_length)]
+    for quantiles in quantile_sets:
+        bounds = [int(math.ceil(np.percentile(lengths, q) / 8) * 8) for q in quantiles]
+        candidate = normalize_boundaries(bounds, max_length) if bounds else [max_length]
+        if candidate not in candidates:
+            candidates.append(candidate)
+    return candidates
+
+
+def _percentile_ms(seconds: Sequence[float], q: float) -> float:
+    return round(float(np.percentile(seconds, q)) * 1000, 2) if len(seconds) else 0.0
+
+
+def measure_offline(
+    artifacts: dict,
+    texts: Sequence[str],
+    batch_size: int,
+    buckets: Sequence[int],
+    duration_s: float = 2.0,
+    min_batches: int = 5,
+    seed: int = 0,
+) -> dict:
+    """
+    Run back-to-back ``predict_fn`` batches for ``duration_s``.
+
+    Returns:
+        Dict with texts_per_s and p50_ms/p99_ms per batch
+    """
+    rng = random.Random(seed)
+    previous = inference.SEQ_LENGTH_BUCKETS
+    inference.SEQ_LENGTH_BUCKETS = list(buckets)
+    try:
+        inference.predict_fn({"texts": rng.sample(list(texts), min(batch_size, len(texts)))}, artifacts)
+        latencies = []
+        processed = 0
+        deadline = time.perf_counter() + duration_s
+        while len(latencies) < min_batches or time.perf_counter() < deadline:
+            batch = [rng.choice(texts) for _ in range(batch_size)]
+            started = time.perf_counter()
+            inference.predict_fn({"texts": batch}, artifacts)
+            latencies.append(time.perf_counter() - started)
+            processed += len(batch)
+    finally:
+        inference.SEQ_LENGTH_BUCKETS = previous
+
+    return {
+        "texts_per_s": round(processed / sum(latencies), 1),
+        "p50_ms": _percentile_ms(latencies, 50),
+        "p99_ms": _percentile_ms(latencies, 99),
+    }
+
+
+async def _drive(
+    predict: Callable[[List[str]], List[dict]],
+    texts: Sequence[str],
+    max_batch_size: int,
+    max_wait_ms: float,
+    rate: float,
+    duration_s: float,
+    min_requests: int,
+    seed: int,
+) -> dict:
+    rng = random.Random(seed)
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1_000_000)
+    batcher = MicroBatcher(predict, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, executor=executor)
+    await batcher.start()
+    latencies: List[float] = []
+
+    async def request(text: str, scheduled: float) -> None:
+        await batcher.submit([text])
+        # Measured from the scheduled send time so a backed-up loop still counts as latency.
+        latencies.append(time.perf_counter() - scheduled)
+
+    pending = []
+    started = time.perf_counter()
+    scheduled = started
+    try:
+        while scheduled - started < duration_s or len(pending) < min_requests:
+            scheduled += rng.expovariate(rate)
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            pending.append(asyncio.ensure_future(request(rng.choice(texts), scheduled)))
+        sent_over = scheduled - started
+        await asyncio.gather(*pending)
+        elapsed = time.perf_counter() - started
+    finally:
+        await batcher.stop()
+        executor.shutdown()
+
+    return {
+        "offered_per_s": round(len(pending) / sent_over, 1),
+        "texts_per_s": round(len(latencies) / elapsed, 1),
+        "p50_ms": _percentile_ms(latencies, 50),
+        "p99_ms": _percentile_ms(latencies, 99),
+    }
+
+
+def measure_serving(
+    artifacts: dict,
+    texts: Sequence[str],
+    max_batch_size: int,
+    max_wait_ms: float,
+    buckets: Sequence[int],
+    rate: float,
+    duration_s: float = 3.0,
+    min_requests: int = 100,
+    seed: int = 0,
+) -> dict:
+    """
+    Serve single-text requests arriving as a Poisson process at ``rate`` per second through a MicroBatcher.
+
+    Requests keep arriving for ``duration_s`` and until ``min_requests`` have been sent.
+
+    Returns:
+        Dict with offered_per_s (arrivals actually generated), achieved
+        texts_per_s (including the time to drain) and request p50_ms/p99_ms
+    """
+    previous = inference.SEQ_LENGTH_BUCKETS
+    inference.SEQ_LENGTH_BUCKETS = list(buckets)
+    try:
+        predict = lambda batch: inference.predict_fn({"texts": batch}, artifacts)  # noqa: E731
+        return asyncio.run(_drive(predict, texts, max_batch_size, max_wait_ms, rate, duration_s, min_requests, seed))
+    finally:
+        inference.SEQ_LENGTH_BUCKETS = previous
+
+
+def default_thread_options(cpus: int) -> List[int]:
+    """Powers of two up to the core count, plus the core count itself."""
+    options = {cpus}
+    threads = 1
+    while threads < cpus:
+        options.add(threads)
+        threads *= 2
+    return sorted(options)
+
+
+def tune(
+    artifacts: dict,
+    texts: Sequence[str],
+    thread_options: Optional[Sequence[int]] = None,
+    batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+    wait_options_ms: Sequence[float] = DEFAULT_WAIT_OPTIONS_MS,
+    p99_budget_ms: float = 100.0,
+    load_factor: float = 0.7,
+    duration_s: float = 2.0,
+    min_requests: int = 100,
+    precision: Optional[str] = None,
+    seed: int = 0,
+) -> ServingProfile:
+    """
+    Sweep threads, batch size, buckets and batching wait on this machine.
+
+    Args:
+        artifacts: Loaded model artifacts (model_fn output)
+        texts: Representative request texts
+        thread_options: torch thread counts to try (PyTorch backend only; default from the core count)
+        batch_sizes: Maximum micro-batch sizes to try
+        wait_options_ms: Batching waits to try
+        p99_budget_ms: Batch sizes whose p99 batch latency exceeds this are ruled out
+        load_factor: Offered load for the wait sweep, as a fraction of peak throughput
+        duration_s: Measurement time per configuration
+        min_requests: Minimum requests per batching-wait trial
+        precision: Configured INFERENCE_PRECISION the profile is for (default: the artifacts' applied precision)
+
+    Returns:
+        The winning ServingProfile, with every trial in ``measured["trials"]``
+    """
+    tokenizer = artifacts["tokenizer"]
+    lengths = [len(ids) for ids in tokenizer(list(texts), truncation=True, max_length=inference.MAX_SEQ_LENGTH)["input_ids"]]
+    default_buckets = list(inference.SEQ_LENGTH_BUCKETS)
+    trials: List[Dict[str, object]] = []
+
+    torch = None
+    previous_threads = None
+    if artifacts.get("backend") == "pytorch":
+        import torch
+
+        previous_threads = torch.get_num_threads()
+        thread_options = list(thread_options or default_thread_options(machine_fingerprint()["cpus"]))
+    else:
+        thread_options = [None]
+
+    try:
+        best = None
+        for threads in thread_options:
+            if threads is not None:
+                torch.set_num_threads(threads)
+            for batch_size in batch_sizes:
+                result = measure_offline(artifacts, texts, batch_size, default_buckets, duration_s, seed=seed)
+                trial = {"stage": "threads_batch", "num_threads": threads, "max_batch_size": batch_size, **result}
+                trials.append(trial)
+                logger.info(
+                    "threads=%s batch=%-3d %8.1f texts/s  p50 %7.2f ms  p99 %7.2f ms",
+                    threads, batch_size, result["texts_per_s"], result["p50_ms"], result["p99_ms"],
+                )
+                within_budget = result["p99_ms"] <= p99_budget_ms or batch_size == min(batch_sizes)
+                if within_budget and (best is None or result["texts_per_s"] > best["texts_per_s"]):
+                    best = trial
+        if best["num_threads"] is not None:
+            torch.set_num_threads(best["num_threads"])
+
+        if inference.PADDING_MODE == "max_length":
+            candidates = [default_buckets]
+        else:
+            candidates = bucket_candidates(lengths, inference.MAX_SEQ_LENGTH)
+        best_buckets = None
+        for buckets in candidates:
+            result = measure_offline(artifacts, texts, best["max_batch_size"], buckets, duration_s, seed=seed)
+            trials.append({"stage": "buckets", "seq_length_buckets": buckets, **result})
+            logger.info("buckets=%-28s %8.1f texts/s", buckets, result["texts_per_s"])
+            if best_buckets is None or result["texts_per_s"] > best_buckets[1]["texts_per_s"]:
+                best_buckets = (buckets, result)
+
+        peak = best_buckets[1]["texts_per_s"]
+        rate = max(1.0, peak * load_factor)
+        best_wait = None
+        for wait_ms in wait_options_ms:
+            result = measure_serving(
+                artifacts, texts, best["max_batch_size"], wait_ms, best_buckets[0], rate, duration_s,
+                min_requests=min_requests, seed=seed,
+            )
+            trials.append({"stage": "batch_wait", "max_batch_wait_ms": wait_ms, **result})
+            logger.info(
+                "wait=%-5s offered %7.1f/s served %7.1f/s  p50 %7.2f ms  p99 %7.2f ms",
+                wait_ms, result["offered_per_s"], result["texts_per_s"], result["p50_ms"], result["p99_ms"],
+            )
+            keeps_up = result["texts_per_s"] >= 0.9 * result["offered_per_s"]
+            if best_wait is None or (keeps_up, -result["p99_ms"]) > best_wait[2]:
+                best_wait = (wait_ms, result, (keeps_up, -result["p99_ms"]))
+    finally:
+        if previous_threads is not None:
+            torch.set_num_threads(previous_threads)
+
+    return ServingProfile(
+        max_batch_size=best["max_batch_size"],
+        max_batch_wait_ms=best_wait[0],
+        seq_length_buckets=best_buckets[0],
+        num_threads=best["num_threads"],
+        backend=artifacts.get("backend", "pytorch"),
+        precision=precision or artifacts.get("precision", "fp32"),
+        measured={
+            "peak_texts_per_s": peak,
+            "offered_per_s": round(rate, 1),
+            "served_texts_per_s": best_wait[1]["texts_per_s"],
+            "p50_ms": best_wait[1]["p50_ms"],
+            "p99_ms": best_wait[1]["p99_ms"],
+            "texts": len(texts),
+            "trials": trials,
+        },
+    )
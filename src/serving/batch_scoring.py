@@ -0,0 +1,250 @@
+"""Offline, resumable, multi-process batch scoring built on the inference handlers."""
+
+import json
+import multiprocessing as mp
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+_worker_state = {"artifacts": None, "text_field": "text", "batch_size": 32}
+
+
+def _iter_jsonl(path: str) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _iter_parquet(path: str, chunk_rows: int) -> Iterator[dict]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        import pandas as pd
+
+        yield from pd.read_parquet(path).to_dict(orient="records")
+        return
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+        yield from batch.to_pylist()
+
+
+def iter_shards(path: str, shard_size: int) -> Iterator[Tuple[int, List[dict]]]:
+    """
+    Stream an input file as ``(shard_id, records)`` chunks of ``shard_size`` rows.
+
+    JSONL and Parquet are supported; shard ids are stable for a given file
+    and shard size, which is what makes runs resumable.
+    """
+    if str(path).endswith(".parquet"):
+        records = _iter_parquet(path, shard_size)
+    else:
+        records = _iter_jsonl(path)
+
+    shard: List[dict] = []
+    shard_id = 0
+    for record in records:
+        shard.append(record)
+        if len(shard) == shard_size:
+            yield shard_id, shard
+            shard_id += 1
+            shard = []
+    if shard:
+        yield shard_id, shard
+
+
+def load_manifest(output_dir: Path, input_path: str, shard_size: int) -> dict:
+    """Load the progress manifest, or start a new one. Refuses to resume a different job."""
+    manifest_path = output_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {"input": str(input_path), "shard_size": shard_size, "completed": {}}
+
+    with manifest_path.open("r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("input") != str(input_path) or manifest.get("shard_size") != shard_size:
+        raise ValueError(
+            f"{manifest_path} belongs to a different job "
+            f"(input={manifest.get('input')}, shard_size={manifest.get('shard_size')})"
+        )
+    return manifest
+
+
+def save_manifest(output_dir: Path, manifest: dict) -> None:
+    """Write the manifest atomically so an interrupted run never leaves it half written."""
+    manifest_path = output_dir / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix(".json.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def _init_worker(model_dir: str, precision: Optional[str], backend: Optional[str],
+                 text_field: str, batch_size: int, num_threads: int) -> None:
+    """Load the model once per worker process."""
+    from src.serving.inference import INFERENCE_BACKEND, model_fn
+
+    # torch is only needed (and possibly only installed) for the pytorch backend.
+    if num_threads > 0 and (backend or INFERENCE_BACKEND).lower() == "pytorch":
+        import torch
+
+        torch.set_num_threads(num_threads)
+    _worker_state["artifacts"] = model_fn(model_dir, precision=precision, backend=backend)
+    _worker_state["text_field"] = text_field
+    _worker_state["batch_size"] = batch_size
+
+
+def _score_shard(task: Tuple[int, List[dict], str]) -> dict:
+    """Score one shard and write it to ``part-<shard_id>.jsonl``."""
+    from src.serving.inference import predict_columnar, rows_from_columns
+
+    shard_id, records, output_dir = task
+    artifacts = _worker_state["artifacts"]
+    text_field = _worker_state["text_field"]
+    batch_size = _worker_state["batch_size"]
+
+    started = time.perf_counter()
+    texts = [str(record.get(text_field) or "") for record in records]
+    tokens = 0
+
+    shard_path = Path(output_dir) / f"part-{shard_id:05d}.jsonl"
+    tmp_path = shard_path.with_suffix(".jsonl.tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            columns = predict_columnar({"texts": batch}, artifacts)
+            tokens += columns["tokens"]
+            predictions = rows_from_columns(batch, columns)
+            for record, prediction in zip(records[start:start + batch_size], predictions):
+                row = {key: value for key, value in record.items() if key != text_field}
+                row.update(
+                    predicted_label=prediction["predicted_label"],
+                    predicted_class=prediction["predicted_class"],
+                    confidence=prediction["confidence"],
+                    probabilities=prediction["probabilities"],
+                )
+                f.write(json.dumps(row, default=str) + "\n")
+    os.replace(tmp_path, shard_path)
+
+    return {
+        "shard_id": shard_id,
+        "path": shard_path.name,
+        "rows": len(records),
+        "tokens": tokens,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def score_file(
+    input_path: str,
+    output_dir: str,
+    model_dir: str,
+    workers: int = 1,
+    shard_size: int = 10000,
+    batch_size: int = 32,
+    text_field: str = "text",
+    precision: Optional[str] = None,
+    backend: Optional[str] = None,
+    threads_per_worker: int = 0,
+) -> dict:
+    """
+    Score a JSONL or Parquet file into JSONL output shards.
+
+    The input is streamed in shards of ``shard_size`` rows. With
+    ``workers > 1`` shards are scored by a pool of processes that each load
+    the model once; ``workers <= 1`` scores in this process. Completed
+    shards are recorded in ``manifest.json`` and skipped on the next run,
+    so an interrupted job resumes where it stopped.
+
+    Args:
+        input_path: JSONL or .parquet file with a text column
+        output_dir: Directory for part-*.jsonl shards and the manifest
+        model_dir: Directory passed to model_fn
+        workers: Number of worker processes
+        shard_size: Rows per output shard
+        batch_size: Texts per predict_fn call
+        text_field: Name of the text column
+        precision: Optional precision override for model_fn
+        backend: Optional backend override for model_fn
+        threads_per_worker: torch intra-op threads per worker (0 splits the CPUs evenly)
+
+    Returns:
+        Dict with rows, tokens, seconds, items_per_sec and tokens_per_sec for this run
+    """
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(out, input_path, shard_size)
+    completed = manifest["completed"]
+    if completed:
+        logger.info("Resuming: %d shard(s) already complete", len(completed))
+
+    if threads_per_worker <= 0 and workers > 1:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    init_args = (model_dir, precision, backend, text_field, batch_size, threads_per_worker)
+
+    tasks = (
+        (shard_id, records, str(out))
+        for shard_id, records in iter_shards(input_path, shard_size)
+        if str(shard_id) not in completed
+    )
+
+    rows = tokens = 0
+    started = time.perf_counter()
+
+    def record(result: dict) -> None:
+        nonlocal rows, tokens
+        completed[str(result["shard_id"])] = result
+        save_manifest(out, manifest)
+        rows += result["rows"]
+        tokens += result["tokens"]
+        elapsed = time.perf_counter() - started
+        logger.info(
+            "Shard %d done: %d rows (%.1f items/sec, %.1f tokens/sec overall)",
+            result["shard_id"],
+            result["rows"],
+            rows / elapsed,
+            tokens / elapsed,
+        )
+
+    if workers <= 1:
+        _init_worker(*init_args)
+        for task in tasks:
+            record(_score_shard(task))
+    else:
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(processes=workers, initializer=_init_worker, initargs=init_args) as pool:
+            # Keep at most two shards per worker in flight so memory stays bounded.
+            in_flight: deque = deque()
+            for task in tasks:
+                in_flight.append(pool.apply_async(_score_shard, (task,)))
+                if len(in_flight) >= workers * 2:
+                    record(in_flight.popleft().get())
+            while in_flight:
+                record(in_flight.popleft().get())
+
+    seconds = time.perf_counter() - started
+    summary = {
+        "rows": rows,
+        "tokens": tokens,
+        "seconds": round(seconds, 3),
+        "items_per_sec": round(rows / seconds, 1) if seconds else 0.0,
+        "tokens_per_sec": round(tokens / seconds, 1) if seconds else 0.0,
+        "shards_completed": len(completed),
+    }
+    manifest["last_run"] = summary
+    save_manifest(out, manifest)
+    logger.info(
+        "Scored %d rows in %.1fs: %.1f items/sec, %.1f tokens/sec",
+        rows,
+        seconds,
+        summary["items_per_sec"],
+        summary["tokens_per_sec"],
+    )
+    return summary
@@ -0,0 +1,207 @@
+"""Dynamic micro-batching for concurrent prediction requests."""
+
+import asyncio
+import time
+from typing import Callable, List, Optional, Set, Tuple
+
+from src.serving.executor import InferenceExecutor, QueueFullError
+from src.serving.telemetry import STAGE_SECONDS
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+_Pending = Tuple[List[str], asyncio.Future, float]
+
+_QUEUE_WAIT = STAGE_SECONDS.labels("queue_wait")
+
+
+class MicroBatcher:
+    """
+    Collect concurrent prediction requests into a single model batch.
+
+    Requests are queued with their own future. A background task drains the
+    queue and flushes a batch as soon as it holds ``max_batch_size`` texts or
+    the oldest request has waited ``max_wait_ms``. Each caller gets back the
+    slice of results that belongs to its own texts, in order.
+
+    Requests are never split across batches, so a single request larger than
+    ``max_batch_size`` is flushed on its own.
+
+    When an ``executor`` is given, batches run on its worker thread instead
+    of the event loop. ``max_queue_size`` bounds the number of requests
+    waiting for a batch (0 means unbounded); ``submit`` raises
+    ``QueueFullError`` once it is reached.
+
+    ``concurrency`` is how many batches may run at once. Keep the default of
+    1 for a single in-process model. With a pool of worker processes, set it
+    to the pool's maximum size so every worker can have a batch.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[str]], List[dict]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        executor: Optional[InferenceExecutor] = None,
+        max_queue_size: int = 0,
+        concurrency: int = 1,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_wait_ms < 0:
+            raise ValueError("max_wait_ms must be >= 0")
+        if max_queue_size < 0:
+            raise ValueError("max_queue_size must be >= 0")
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor
+        self.max_queue_size = max_queue_size
+        self.concurrency = concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._carry: Optional[_Pending] = None
+        self._inflight: List[_Pending] = []
+        self._running: Set[asyncio.Task] = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the background flush loop on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._carry = None
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and fail any request still waiting."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        running = list(self._running)
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+        pending = list(self._inflight) + ([self._carry] if self._carry else [])
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+        self._carry = None
+        self._inflight = []
+
+    async def drain(self, poll_interval: float = 0.01) -> None:
+        """Wait until every queued and in-flight request has been answered, then stop."""
+        while self.running and (self._inflight or self._running or self._carry or not self._queue.empty()):
+            await asyncio.sleep(poll_interval)
+        await self.stop()
+
+    async def submit(self, texts: List[str]) -> List[dict]:
+        """Queue texts for the next batch and wait for their predictions."""
+        if not self.running:
+            raise RuntimeError("Batcher is not running")
+        if not texts:
+            return []
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((texts, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            retry_after = self.executor.retry_after_s if self.executor else 1.0
+            raise QueueFullError(
+                f"Batch queue full: {self.max_queue_size} pending", retry_after=retry_after
+            ) from None
+        return await future
+
+    async def _next_batch(self) -> List[_Pending]:
+        """Block for the first request, then gather more until full or timed out."""
+        first = self._carry or await self._queue.get()
+        self._carry = None
+
+        batch = [first]
+        # Track the batch while it is still being collected so stop() and drain() can see it.
+        self._inflight = batch
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout <= 0:
+                    item = self._queue.get_nowait()
+                else:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+
+            if size + len(item[0]) > self.max_batch_size:
+                self._carry = item
+                break
+            batch.append(item)
+            size += len(item[0])
+
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            # Collect only once a batch can be dispatched, so requests keep accumulating meanwhile.
+            await self._slots.acquire()
+            batch = await self._next_batch()
+            self._inflight = []
+            batch = [item for item in batch if not item[1].cancelled()]
+            if not batch:
+                self._slots.release()
+                continue
+
+            task = asyncio.create_task(self._execute(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _execute(self, batch: List[_Pending]) -> None:
+        try:
+            dispatched = time.perf_counter()
+            for _, _, enqueued in batch:
+                _QUEUE_WAIT.observe(dispatched - enqueued)
+
+            texts = [text for item_texts, _, _ in batch for text in item_texts]
+            try:
+                if self.executor is not None:
+                    results = await self.executor.submit(self.predict_batch, texts)
+                else:
+                    results = self.predict_batch(texts)
+            except asyncio.CancelledError:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(RuntimeError("Batcher stopped"))
+                raise
+            except Exception as exc:
+                logger.exception("Batch prediction failed for %d text(s): %s", len(texts), exc)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+
+            logger.debug("Flushed batch: %d request(s), %d text(s)", len(batch), len(texts))
+            offset = 0
+            for item_texts, future, _ in batch:
+                if not future.done():
+                    future.set_result(results[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+        finally:
+            self._slots.release()
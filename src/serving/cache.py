@@ -0,0 +1,165 @@
+"""Bounded LRU + TTL cache for prediction results, and an mtime-keyed JSON file cache."""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class PredictionCache:
+    """
+    In-process LRU cache with per-entry time-to-live.
+
+    Keys are a SHA-256 of the model identity and the normalized text, so the
+    same headline scored by a different model never shares an entry. The
+    cache holds at most ``max_size`` entries; the least recently used entry
+    is evicted first and entries older than ``ttl_seconds`` are treated as
+    misses. A ``max_size`` of 0 disables caching.
+    """
+
+    def __init__(self, max_size: int = 4096, ttl_seconds: float = 600.0, clock: Callable[[], float] = time.monotonic):
+        if max_size < 0:
+            raise ValueError("max_size must be >= 0")
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be > 0")
+
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @staticmethod
+    def make_key(model_id: str, text: str) -> str:
+        return hashlib.sha256(f"{model_id}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, model_id: str, text: str) -> Optional[dict]:
+        """Return a cached result, or None on a miss or expired entry."""
+        if not self.enabled:
+            return None
+
+        key = self.make_key(model_id, text)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        stored_at, result = entry
+        if self._clock() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, model_id: str, text: str, result: dict) -> None:
+        if not self.enabled:
+            return
+
+        key = self.make_key(model_id, text)
+        self._entries[key] = (self._clock(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def split(self, model_id: str, texts: List[str]) -> Tuple[List[Optional[dict]], List[int]]:
+        """
+        Look up a batch of texts.
+
+        Returns one slot per text (cached result or None) and the indices of
+        the misses, so callers only run the model on those.
+        """
+        results = [self.get(model_id, text) for text in texts]
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        return results, missing
+
+
+class JSONFileCache:
+    """
+    Serve JSON files from memory until they change on disk.
+
+    Each entry holds the file's ``(mtime_ns, size)`` signature, the
+    serialized response body and a strong ETag over that body. A lookup
+    costs one ``stat``; the file is only re-read and re-parsed when the
+    signature differs from the cached one.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Path, Tuple[Tuple[int, int], bytes, str]] = {}
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def get(self, path: Path, transform: Optional[Callable[[Any], Any]] = None) -> Tuple[bytes, str]:
+        """
+        Return ``(body, etag)`` for a JSON file.
+
+        Args:
+            path: JSON file to serve
+            transform: Optional function applied to the parsed document before serialization
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            ValueError: If the file is not valid JSON
+        """
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == signature:
+            return entry[1], entry[2]
+
+        with path.open("r", encoding="utf-8") as f:
+            document = json.load(f)
+        if transform is not None:
+            document = transform(document)
+        # Same encoding as JSONResponse so cached and uncached bodies are identical.
+        body = json.dumps(document, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+        with self._lock:
+            self._entries[path] = (signature, body, etag)
+            self.reloads += 1
+        return body, etag
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an ``If-None-Match`` header against an ETag, as RFC 9110 requires."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
@@ -0,0 +1,298 @@
+"""
+Confidence-gated first stage for the /predict cascade.
+
+A linear model over lowercase word unigrams and bigrams answers the texts it
+is sure about; only the rest go through the transformer. Its scores are
+temperature-scaled on held-out data so that ``confidence`` is calibrated and
+a single threshold trades accuracy for skipped forward passes.
+
+Scoring needs only numpy. Fitting uses scikit-learn, a training-time
+dependency that is imported lazily.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+FIRST_STAGE_FILENAME = "first_stage.npz"
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def _terms(text: str) -> List[str]:
+    """Unigrams and space-joined bigrams of the lowercase words in ``text``."""
+    words = _WORD_PATTERN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+
+class LinearTextClassifier:
+    """Binary bag-of-terms logistic regression with a calibration temperature."""
+
+    def __init__(
+        self,
+        terms: Sequence[str],
+        weights: np.ndarray,
+        bias: np.ndarray,
+        labels: Sequence[str],
+        temperature: float = 1.0,
+    ):
+        self.vocabulary: Dict[str, int] = {term: idx for idx, term in enumerate(terms)}
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.labels = list(labels)
+        self.temperature = float(temperature)
+        if self.weights.shape != (len(self.vocabulary), len(self.labels)):
+            raise ValueError(
+                f"weights shape {self.weights.shape} does not match "
+                f"{len(self.vocabulary)} terms x {len(self.labels)} labels"
+            )
+
+    def logits(self, texts: Sequence[str]) -> np.ndarray:
+        """Uncalibrated (n_texts, n_labels) scores, summed over each text's distinct known terms."""
+        vocabulary = self.vocabulary
+        rows = [sorted({vocabulary[t] for t in _terms(text) if t in vocabulary}) for text in texts]
+        counts = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+        flat = np.fromiter((idx for row in rows for idx in row), dtype=np.int64, count=int(counts.sum()))
+
+        logits = np.zeros((len(rows), len(self.labels)), dtype=np.float32)
+        filled = counts > 0
+        if filled.any():
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            logits[filled] = np.add.reduceat(self.weights[flat], starts[filled], axis=0)
+        return logits + self.bias
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Calibrated (n_texts, n_labels) probabilities."""
+        return _softmax(self.logits(texts) / self.temperature)
+
+    def save(self, path: Path) -> Path:
+        path = Path(path)
+        terms = [""] * len(self.vocabulary)
+        for term, idx in self.vocabulary.items():
+            terms[idx] = term
+        tmp = path.with_name(f".{path.stem}.tmp.npz")
+        np.savez_compressed(
+            tmp,
+            terms=np.array(terms, dtype=str),
+            weights=self.weights,
+            bias=self.bias,
+            labels=np.array(self.labels, dtype=str),
+            temperature=np.float32(self.temperature),
+        )
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "LinearTextClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                terms=data["terms"].tolist(),
+                weights=data["weights"],
+                bias=data["bias"],
+                labels=data["labels"].tolist(),
+                temperature=float(data["temperature"]),
+            )
+
+
+def _model_labels(model_dir: str) -> Optional[List[str]]:
+    """
+    Class names from the model's config.json, in label-id order.
+
+    Returns:
+        The names, ``LABEL_<i>`` placeholders when the model was saved without
+        names, or None when config.json is missing
+    """
+    path = Path(model_dir) / "config.json"
+    if not path.exists():
+        return None
+    config = json.loads(path.read_text(encoding="utf-8"))
+    id2label = {int(idx): name for idx, name in config.get("id2label", {}).items()}
+    count = config.get("num_labels", len(id2label))
+    return [id2label.get(idx, f"LABEL_{idx}") for idx in range(count)]
+
+
+def load_first_stage(model_dir: str) -> Optional[LinearTextClassifier]:
+    """
+    Load ``first_stage.npz`` from a model directory.
+
+    Its labels must match the model's config.json, so both cascade stages
+    name the same classes in the same order. Placeholder ``LABEL_<i>`` names
+    only fix the number of classes.
+
+    Returns:
+        The classifier, or None when the directory has none or its labels do not match
+    """
+    path = Path(model_dir) / FIRST_STAGE_FILENAME
+    if not path.exists():
+        return None
+    classifier = LinearTextClassifier.load(path)
+
+    expected = _model_labels(model_dir)
+    if expected is not None:
+        unnamed = expected == [f"LABEL_{idx}" for idx in range(len(expected))]
+        if len(classifier.labels) != len(expected) or (not unnamed and classifier.labels != expected):
+            logger.warning(
+                "Cascade first stage %s labels %s do not match the model's %s; ignoring it",
+                path,
+                classifier.labels,
+                expected,
+            )
+            return None
+
+    logger.info("Loaded cascade first stage from %s (%d terms)", path, len(classifier.vocabulary))
+    return classifier
+
+
+def split_by_confidence(probs: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices of rows whose top probability reaches ``threshold``, and of the rest."""
+    confident = probs.max(axis=-1) >= threshold
+    return np.flatnonzero(confident), np.flatnonzero(~confident)
+
+
+def negative_log_likelihood(logits: np.ndarray, labels: np.ndarray, temperature: float = 1.0) -> float:
+    probs = _softmax(logits / temperature)
+    return float(-np.log(np.clip(probs[np.arange(len(labels)), labels], 1e-12, None)).mean())
+
+
+def fit_temperature(logits: np.ndarray, labels: Sequence[int]) -> float:
+    """Temperature minimizing held-out negative log-likelihood (coarse log grid, then a finer one)."""
+    labels = np.asarray(labels)
+    grid = np.geomspace(0.05, 20.0, 61)
+    for _ in range(2):
+        losses = [negative_log_likelihood(logits, labels, t) for t in grid]
+        best = int(np.argmin(losses))
+        low, high = grid[max(best - 1, 0)], grid[min(best + 1, len(grid) - 1)]
+        grid = np.geomspace(low, high, 41)
+    return float(grid[int(np.argmin([negative_log_likelihood(logits, labels, t) for t in grid]))])
+
+
+def expected_calibration_error(probs: np.ndarray, labels: Sequence[int], bins: int = 15) -> float:
+    """Gap between confidence and accuracy, averaged over equal-width confidence bins."""
+    labels = np.asarray(labels)
+    confidence = probs.max(axis=-1)
+    correct = probs.argmax(axis=-1) == labels
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    error = 0.0
+    for low, high in zip(edges[:-1], edges[1:]):
+        in_bin = (confidence > low) & (confidence <= high)
+        if in_bin.any():
+            error += in_bin.mean() * abs(confidence[in_bin].mean() - correct[in_bin].mean())
+    return float(error)
+
+
+def train_first_stage(
+    texts: Sequence[str],
+    labels: Sequence[int],
+    val_texts: Sequence[str],
+    val_labels: Sequence[int],
+    label_names: Sequence[str],
+    max_features: int = 200_000,
+    min_df: int = 2,
+    c: float = 4.0,
+) -> Tuple[LinearTextClassifier, dict]:
+    """
+    Fit the first stage on a training split and calibrate it on a validation split.
+
+    Args:
+        texts, labels: Training texts and integer label ids
+        val_texts, val_labels: Held-out split used to fit the temperature
+        label_names: Class name for each label id
+        max_features: Vocabulary size cap (most frequent terms are kept)
+        min_df: Minimum number of training texts a term must appear in
+        c: Inverse L2 regularization strength of the logistic regression
+
+    Returns:
+        The classifier and a dict of validation metrics
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    vectorizer = CountVectorizer(
+        tokenizer=_terms, lowercase=False, token_pattern=None, binary=True,
+        min_df=min_df, max_features=max_features,
+    )
+    features = vectorizer.fit_transform(texts)
+    model = LogisticRegression(C=c, max_iter=1000)
+    model.fit(features, labels)
+    if list(model.classes_) != list(range(len(label_names))):
+        raise ValueError(f"Training labels {list(model.classes_)} do not cover all {len(label_names)} classes")
+
+    classifier = LinearTextClassifier(
+        terms=vectorizer.get_feature_names_out().tolist(),
+        weights=model.coef_.T,
+        bias=model.intercept_,
+        labels=label_names,
+    )
+    val_labels = np.asarray(val_labels)
+    val_logits = classifier.logits(val_texts)
+    classifier.temperature = fit_temperature(val_logits, val_labels)
+
+    raw_probs = _softmax(val_logits)
+    probs = classifier.predict_proba(val_texts)
+    metrics = {
+        "terms": len(classifier.vocabulary),
+        "val_accuracy": round(float((probs.argmax(axis=-1) == val_labels).mean()), 4),
+        "temperature": round(classifier.temperature, 4),
+        "val_nll": round(negative_log_likelihood(val_logits, val_labels, classifier.temperature), 4),
+        "val_ece_uncalibrated": round(expected_calibration_error(raw_probs, val_labels), 4),
+        "val_ece": round(expected_calibration_error(probs, val_labels), 4),
+    }
+    return classifier, metrics
+
+
+def cascade_tradeoff(
+    first_probs: np.ndarray,
+    model_probs: np.ndarray,
+    labels: Sequence[int],
+    thresholds: Sequence[float],
+) -> List[dict]:
+    """
+    Accuracy and skipped-model fraction of the cascade at each threshold.
+
+    Args:
+        first_probs: First-stage probabilities for every text
+        model_probs: Transformer probabilities for the same texts
+        labels: True label ids
+        thresholds: Confidence thresholds to evaluate
+
+    Returns:
+        One dict per threshold with skip_fraction, first_stage_accuracy (on
+        the items it answers), cascade_accuracy, model_accuracy and
+        accuracy_loss (model minus cascade)
+    """
+    labels = np.asarray(labels)
+    first_pred = first_probs.argmax(axis=-1)
+    model_pred = model_probs.argmax(axis=-1)
+    model_accuracy = float((model_pred == labels).mean())
+    confidence = first_probs.max(axis=-1)
+
+    rows = []
+    for threshold in thresholds:
+        skipped = confidence >= threshold
+        cascade_pred = np.where(skipped, first_pred, model_pred)
+        cascade_accuracy = float((cascade_pred == labels).mean())
+        rows.append(
+            {
+                "threshold": float(threshold),
+                "skip_fraction": round(float(skipped.mean()), 4),
+                "first_stage_accuracy": (
+                    round(float((first_pred[skipped] == labels[skipped]).mean()), 4) if skipped.any() else None
+                ),
+                "cascade_accuracy": round(cascade_accuracy, 4),
+                "model_accuracy": round(model_accuracy, 4),
+                "accuracy_loss": round(model_accuracy - cascade_accuracy, 4),
+            }
+        )
+    return rows
@@ -0,0 +1,81 @@
+"""Bounded executor that keeps model execution off the asyncio event loop."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from src.serving.telemetry import STAGE_SECONDS
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+_EXECUTOR_WAIT = STAGE_SECONDS.labels("executor_wait")
+
+
+def _timed_call(submitted: float, fn: Callable[..., Any], args: tuple) -> Any:
+    _EXECUTOR_WAIT.observe(time.perf_counter() - submitted)
+    return fn(*args)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the inference queue cannot accept more work."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """
+    Run blocking inference calls on dedicated worker threads.
+
+    Callers await ``submit`` while the forward pass runs on a worker thread,
+    so the event loop keeps serving ``/health``, dashboard routes and rate
+    limiting. At most ``max_queue_size`` calls may be queued or running at
+    once; further calls fail fast with ``QueueFullError`` instead of piling
+    up behind the model.
+    """
+
+    def __init__(self, max_workers: int = 1, max_queue_size: int = 64, retry_after_s: float = 1.0):
+        if max_workers < 1:
+            raise ValueError("max_workers must be >= 1")
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be >= 1")
+
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.retry_after_s = retry_after_s
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of calls currently queued or running."""
+        return self._pending
+
+    def _ensure_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        return self._pool
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on a worker thread and await its result."""
+        if self._pending >= self.max_queue_size:
+            logger.warning("Inference queue full (%d pending)", self._pending)
+            raise QueueFullError(
+                f"Inference queue full: {self.max_queue_size} pending", retry_after=self.retry_after_s
+            )
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._ensure_pool(), _timed_call, time.perf_counter(), fn, args)
+        finally:
+            self._pending -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads. The executor restarts lazily on the next submit."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
@@ -1,28 +1,175 @@
-"""SageMaker-compatible inference handlers for text classification."""
+"""
+SageMaker-compatible inference handlers for text classification.
+
+torch and the transformers model classes are imported on first use, so
+importing this module (and serving the ONNX backend) never loads them.
+"""
 
 import json
 import os
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Tuple
 
-import torch
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
+import numpy as np
 
+from src.serving.mmap_weights import safetensors_files
+from src.serving.onnx_backend import load_onnx_model, softmax
+from src.serving.telemetry import BATCH_SIZE, BATCH_TOKENS, STAGE_SECONDS, TOKENS_TOTAL
+from src.utils.bucketing import boundaries_from_env, length_buckets, pad_bucket
 from src.utils.logging_config import setup_logging
+from src.utils.serialization import dumps
 
 logger = setup_logging(__name__)
 
 LABEL_MAP = {0: "World", 1: "Sports", 2: "Business", 3: "Sci/Tech"}
 MAX_SEQ_LENGTH = int(os.environ.get("MAX_SEQ_LENGTH", "128"))
+# "bucket" pads each length bucket to its own longest sequence; "max_length" pads everything to MAX_SEQ_LENGTH.
+PADDING_MODE = os.environ.get("PADDING_MODE", "bucket")
+SEQ_LENGTH_BUCKETS = boundaries_from_env(MAX_SEQ_LENGTH)
+# "fp32" (default), "int8" (dynamic quantization of Linear layers, CPU only) or "bf16".
+INFERENCE_PRECISION = os.environ.get("INFERENCE_PRECISION", "fp32").lower()
+SUPPORTED_PRECISIONS = ("fp32", "int8", "bf16")
+# "pytorch" (default) or "onnx" (ONNX Runtime over <model_dir>/model.onnx).
+INFERENCE_BACKEND = os.environ.get("INFERENCE_BACKEND", "pytorch").lower()
+SUPPORTED_BACKENDS = ("pytorch", "onnx")
+# Backends whose model is called with NumPy input_ids/attention_mask and returns logits.
+ARRAY_BACKENDS = ("onnx", "workers")
+# Map model.safetensors copy-on-write instead of copying weights, so processes on a host share one copy (CPU only).
+MMAP_WEIGHTS = os.environ.get("MMAP_WEIGHTS", "true").lower() in ("1", "true", "yes")
+# Pretty-print output_fn responses; compact by default.
+OUTPUT_JSON_INDENT = os.environ.get("OUTPUT_JSON_INDENT", "false").lower() in ("1", "true", "yes")
+
+_TOKENIZATION = STAGE_SECONDS.labels("tokenization")
+_FORWARD = STAGE_SECONDS.labels("forward")
+_POSTPROCESS = STAGE_SECONDS.labels("postprocess")
+
+
+@lru_cache(maxsize=None)
+def get_device():
+    """The torch device models run on (CUDA when available)."""
+    import torch
+
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+
+def _bf16_supported() -> bool:
+    """Whether the current device has native bf16 matmul support."""
+    import torch
+
+    try:
+        if get_device().type == "cuda":
+            return torch.cuda.is_bf16_supported()
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except Exception:
+        return False
+
+
+def apply_precision(model, precision: str):
+    """
+    Convert a loaded fp32 model to the requested precision.
+
+    Returns the converted model and the precision actually applied, which
+    falls back to fp32 when the device cannot run the requested mode.
+    Weights already stored in the target dtype are used as they are.
+    """
+    if precision not in SUPPORTED_PRECISIONS:
+        raise ValueError(f"Unsupported precision: {precision} (expected one of {SUPPORTED_PRECISIONS})")
+
+    import torch
+
+    device = get_device()
+    if precision == "int8":
+        if device.type != "cpu":
+            logger.warning("int8 dynamic quantization is CPU only; using fp32 on %s", device)
+            return model.float(), "fp32"
+        quantized = torch.ao.quantization.quantize_dynamic(model.float(), {torch.nn.Linear}, dtype=torch.qint8)
+        return quantized, "int8"
+
+    if precision == "bf16":
+        if not _bf16_supported():
+            logger.warning("bf16 not supported on this %s; using fp32", device.type)
+            return model.float(), "fp32"
+        return model.to(torch.bfloat16), "bf16"
+
+    return model.float(), "fp32"
+
+
+def preload(backend: str = None) -> None:
+    """
+    Import the heavy modules a backend needs without loading a model.
+
+    Lets startup overlap these imports with other work (such as the S3
+    download) instead of paying for them inside model_fn.
+    """
+    backend = (backend or INFERENCE_BACKEND).lower()
+    if backend == "onnx":
+        import onnxruntime  # noqa: F401
+        from transformers import PreTrainedTokenizerFast  # noqa: F401
+        return
+
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer  # noqa: F401
 
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    get_device()
 
 
-def model_fn(model_dir: str):
+def load_tokenizer(model_dir: str, backend: str = None):
+    """
+    Load the tokenizer for a backend.
+
+    The ONNX backend loads ``tokenizer.json`` through PreTrainedTokenizerFast
+    directly; AutoTokenizer would resolve the model class and pull in torch.
+    """
+    if (backend or INFERENCE_BACKEND).lower() == "onnx" and (Path(model_dir) / "tokenizer.json").exists():
+        from transformers import PreTrainedTokenizerFast
+
+        return PreTrainedTokenizerFast.from_pretrained(model_dir)
+
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(model_dir)
+
+
+def load_classifier(model_dir: str, precision: str = None, backend: str = None):
+    """
+    Load just the classifier for a backend, without its tokenizer.
+
+    Returns:
+        Tuple of (model, applied precision). The model is a torch module for
+        ``pytorch`` and an OnnxSequenceClassifier for ``onnx``.
+    """
+    backend = (backend or INFERENCE_BACKEND).lower()
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"Unsupported backend: {backend} (expected one of {SUPPORTED_BACKENDS})")
+
+    if backend == "onnx":
+        logger.info("Loading ONNX model from %s", model_dir)
+        return load_onnx_model(model_dir), "fp32"
+
+    precision = (precision or INFERENCE_PRECISION).lower()
+    logger.info("Loading model from %s (precision=%s)", model_dir, precision)
+    if MMAP_WEIGHTS and get_device().type == "cpu" and safetensors_files(model_dir):
+        from src.serving.mmap_weights import load_mmap_model
+
+        model = load_mmap_model(model_dir)
+    else:
+        from transformers import AutoModelForSequenceClassification
+
+        model = AutoModelForSequenceClassification.from_pretrained(model_dir).to(get_device())
+        model.eval()
+    return apply_precision(model, precision)
+
+
+def model_fn(model_dir: str, precision: str = None, backend: str = None):
     """Load model and tokenizer from the model directory."""
-    logger.info("Loading model from %s", model_dir)
-    tokenizer = AutoTokenizer.from_pretrained(model_dir)
-    model = AutoModelForSequenceClassification.from_pretrained(model_dir).to(device)
-    model.eval()
-    return {"model": model, "tokenizer": tokenizer}
+    backend = (backend or INFERENCE_BACKEND).lower()
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"Unsupported backend: {backend} (expected one of {SUPPORTED_BACKENDS})")
+
+    tokenizer = load_tokenizer(model_dir, backend)
+    model, applied = load_classifier(model_dir, precision, backend)
+    return {"model": model, "tokenizer": tokenizer, "precision": applied, "backend": backend}
 
 
 def input_fn(request_body: str, request_content_type: str = "application/json"):
@@ -41,48 +188,217 @@ def input_fn(request_body: str, request_content_type: str = "application/json"):
     raise ValueError(f"Unsupported input format: {type(data)}")
 
 
-def predict_fn(input_data: dict, model_artifacts: dict):
-    """Run inference on the input data."""
+def warmup(model_artifacts: dict, batch_sizes=(1,), seq_lengths=None) -> float:
+    """
+    Run throwaway forward passes covering every batch size and padded length.
+
+    Each (batch size, sequence length bucket) pair is executed once so lazy
+    initialization, kernel selection and allocator growth happen before the
+    first real request instead of during it.
+
+    Args:
+        model_artifacts: Dict returned by model_fn
+        batch_sizes: Batch sizes to exercise
+        seq_lengths: Padded lengths to exercise; defaults to the configured buckets
+
+    Returns:
+        Seconds spent warming up
+    """
+    if PADDING_MODE == "max_length":
+        seq_lengths = (MAX_SEQ_LENGTH,)
+    elif seq_lengths is None:
+        seq_lengths = SEQ_LENGTH_BUCKETS
+
+    # The unknown token encodes to exactly one id in any vocabulary.
+    filler = model_artifacts["tokenizer"].unk_token or "news"
+    started = time.perf_counter()
+    for length in seq_lengths:
+        # Leave room for the two special tokens the tokenizer adds.
+        text = " ".join([filler] * max(1, min(length, MAX_SEQ_LENGTH) - 2))
+        for batch_size in batch_sizes:
+            _forward_probs([text] * batch_size, model_artifacts)
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "Warmup done in %.2fs (batch sizes %s, sequence lengths %s)",
+        elapsed,
+        list(batch_sizes),
+        list(seq_lengths),
+    )
+    return elapsed
+
+
+def _record_tokens(count: int) -> int:
+    BATCH_TOKENS.observe(count)
+    TOKENS_TOTAL.inc(count)
+    return count
+
+
+def _bucketed_forward(model, tokenizer, texts, boundaries=None):
+    """
+    Forward pass with length-bucketed dynamic padding.
+
+    Texts are tokenized once without padding, grouped into length buckets,
+    and each bucket is padded only to its own longest sequence. Probabilities
+    are scattered back so rows match the input order.
+
+    Returns:
+        Tuple of (probabilities, real token count)
+    """
+    import torch
+
+    device = get_device()
+    with _TOKENIZATION.time():
+        encodings = tokenizer(texts, truncation=True, max_length=MAX_SEQ_LENGTH)
+        lengths = [len(ids) for ids in encodings["input_ids"]]
+    tokens = _record_tokens(sum(lengths))
+    pad_token_id = tokenizer.pad_token_id or 0
+
+    with _FORWARD.time():
+        probs = torch.empty((len(texts), model.config.num_labels), dtype=torch.float32, device=device)
+        with torch.no_grad():
+            for indices in length_buckets(lengths, boundaries or SEQ_LENGTH_BUCKETS):
+                padded = pad_bucket(encodings, indices, pad_token_id)
+                outputs = model(
+                    input_ids=torch.tensor(padded["input_ids"], device=device),
+                    attention_mask=torch.tensor(padded["attention_mask"], device=device),
+                )
+                probs[torch.tensor(indices, device=device)] = torch.softmax(outputs.logits.float(), dim=-1)
+        return probs.cpu().numpy(), tokens
+
+
+def _array_forward(session, tokenizer, texts, boundaries=None):
+    """
+    Forward pass through a NumPy-in, logits-out model honouring PADDING_MODE.
+
+    Serves the ONNX Runtime session and the inference worker pool, which both
+    take ``(input_ids, attention_mask)`` arrays. Returns probabilities in input
+    order and the real token count.
+    """
+    if PADDING_MODE == "max_length":
+        with _TOKENIZATION.time():
+            encodings = tokenizer(
+                texts,
+                padding="max_length",
+                truncation=True,
+                max_length=MAX_SEQ_LENGTH,
+                return_tensors="np",
+            )
+        tokens = _record_tokens(int(encodings["attention_mask"].sum()))
+        with _FORWARD.time():
+            return softmax(session(encodings["input_ids"], encodings["attention_mask"])), tokens
+
+    with _TOKENIZATION.time():
+        encodings = tokenizer(texts, truncation=True, max_length=MAX_SEQ_LENGTH)
+        lengths = [len(ids) for ids in encodings["input_ids"]]
+    tokens = _record_tokens(sum(lengths))
+    pad_token_id = tokenizer.pad_token_id or 0
+
+    with _FORWARD.time():
+        probs = np.empty((len(texts), session.num_labels), dtype=np.float32)
+        for indices in length_buckets(lengths, boundaries or SEQ_LENGTH_BUCKETS):
+            padded = pad_bucket(encodings, indices, pad_token_id)
+            probs[indices] = softmax(session(padded["input_ids"], padded["attention_mask"]))
+        return probs, tokens
+
+
+def _forward_probs(texts, model_artifacts) -> Tuple[np.ndarray, int]:
+    """
+    Run the configured backend.
+
+    Returns:
+        Tuple of a float32 (n_texts, n_labels) probability matrix and the number
+        of real (unpadded) tokens it was computed from
+    """
     model = model_artifacts["model"]
     tokenizer = model_artifacts["tokenizer"]
-    texts = input_data["texts"]
+    BATCH_SIZE.observe(len(texts))
+
+    if model_artifacts.get("backend") in ARRAY_BACKENDS:
+        return _array_forward(model, tokenizer, texts)
 
-    encodings = tokenizer(
-        texts,
-        padding="max_length",
-        truncation=True,
-        max_length=MAX_SEQ_LENGTH,
-        return_tensors="pt",
-    ).to(device)
+    if PADDING_MODE != "max_length":
+        return _bucketed_forward(model, tokenizer, texts)
 
-    with torch.no_grad():
+    import torch
+
+    with _TOKENIZATION.time():
+        encodings = tokenizer(
+            texts,
+            padding="max_length",
+            truncation=True,
+            max_length=MAX_SEQ_LENGTH,
+            return_tensors="pt",
+        ).to(get_device())
+    tokens = _record_tokens(int(encodings["attention_mask"].sum()))
+
+    with _FORWARD.time(), torch.no_grad():
         outputs = model(**encodings)
-        probs = torch.softmax(outputs.logits, dim=-1)
-        predictions = torch.argmax(probs, dim=-1)
-
-    results = []
-    for i, text in enumerate(texts):
-        pred_label = predictions[i].item()
-        results.append(
-            {
-                "text": text[:100] + "..." if len(text) > 100 else text,
-                "predicted_label": pred_label,
-                "predicted_class": LABEL_MAP[pred_label],
-                "confidence": round(probs[i][pred_label].item(), 4),
-                "probabilities": {
-                    LABEL_MAP[j]: round(probs[i][j].item(), 4)
-                    for j in range(len(LABEL_MAP))
-                },
-            }
-        )
+        return torch.softmax(outputs.logits.float(), dim=-1).cpu().numpy(), tokens
+
+
+def predict_columnar(input_data: dict, model_artifacts: dict) -> dict:
+    """
+    Run inference and return column arrays instead of per-text dicts.
+
+    The probability matrix leaves the device once; labels and confidences are
+    computed on it in bulk. For internal callers that consume arrays directly.
+
+    Returns:
+        Dict with ``labels`` (int array), ``classes`` (list of names),
+        ``confidences`` (float array), ``probabilities`` (n x num_labels array)
+        and ``tokens`` (real tokens in the batch)
+    """
+    probs, tokens = _forward_probs(input_data["texts"], model_artifacts)
+    with _POSTPROCESS.time():
+        return {**_columns_from_probs(probs), "tokens": tokens}
+
+
+def _columns_from_probs(probs: np.ndarray) -> dict:
+    labels = probs.argmax(axis=-1)
+    return {
+        "labels": labels,
+        "classes": [LABEL_MAP[label] for label in labels.tolist()],
+        "confidences": probs[np.arange(len(probs)), labels],
+        "probabilities": probs,
+    }
+
 
-    return results
+def predict_fn(input_data: dict, model_artifacts: dict):
+    """Run inference on the input data."""
+    texts = input_data["texts"]
+    probs, _ = _forward_probs(texts, model_artifacts)
+
+    # One postprocess observation per batch, covering both the columns and the rows.
+    with _POSTPROCESS.time():
+        return rows_from_columns(texts, _columns_from_probs(probs))
+
+
+def rows_from_columns(texts, columns) -> list:
+    """Turn ``predict_columnar`` output into ``predict_fn``'s per-text dicts."""
+    label_names = [LABEL_MAP[j] for j in range(len(LABEL_MAP))]
+    labels = columns["labels"].tolist()
+    # Round in float64: rounding float32 and widening afterwards gives 0.2517000138759613, not 0.2517.
+    confidences = np.round(columns["confidences"].astype(np.float64), 4).tolist()
+    probabilities = np.round(columns["probabilities"].astype(np.float64), 4).tolist()
+
+    return [
+        {
+            "text": text[:100] + "..." if len(text) > 100 else text,
+            "predicted_label": label,
+            "predicted_class": class_name,
+            "confidence": confidence,
+            "probabilities": dict(zip(label_names, row)),
+        }
+        for text, label, class_name, confidence, row in zip(
+            texts, labels, columns["classes"], confidences, probabilities
+        )
+    ]
 
 
 def output_fn(prediction, response_content_type: str = "application/json"):
-    """Format the prediction output."""
+    """Format the prediction output as compact JSON (indented when OUTPUT_JSON_INDENT is set)."""
     if response_content_type == "application/json":
-        return json.dumps(prediction, indent=2)
+        return dumps(prediction, indent=OUTPUT_JSON_INDENT).decode("utf-8")
     raise ValueError(f"Unsupported response content type: {response_content_type}")
 
 
@@ -0,0 +1,223 @@
+"""
+Memory-mapped safetensors loading.
+
+``from_pretrained`` copies every weight into memory private to the
+process, so each worker on a host holds its own ~260MB copy of DistilBERT.
+Here the parameters are instead built as views over a copy-on-write
+``mmap`` of ``model.safetensors``. The bytes come from the page cache,
+loading does no copying, and every process that maps the same file shares
+the same physical pages (visible as PSS dropping with each extra worker).
+
+Pages stay shared as long as nothing writes to the weights, which holds
+for ``eval()`` inference. Conversions that rewrite tensors (int8
+quantization, or casting fp32 weights to bf16 at load time) produce
+private copies again. Store the weights in the serving dtype with
+scripts/convert_safetensors.py instead.
+
+Replace model files by renaming a new file over them, never by rewriting
+them in place: a process that maps a file which is then truncated gets
+SIGBUS.
+"""
+
+import contextlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+SAFETENSORS_FILENAME = "model.safetensors"
+SAFETENSORS_INDEX_FILENAME = "model.safetensors.index.json"
+
+_DTYPES = {
+    "F64": "float64",
+    "F32": "float32",
+    "F16": "float16",
+    "BF16": "bfloat16",
+    "I64": "int64",
+    "I32": "int32",
+    "I16": "int16",
+    "I8": "int8",
+    "U8": "uint8",
+    "BOOL": "bool",
+}
+
+
+def safetensors_files(model_dir: str) -> List[Path]:
+    """The safetensors file(s) holding a model's weights; empty when there are none."""
+    root = Path(model_dir)
+    index = root / SAFETENSORS_INDEX_FILENAME
+    if index.exists():
+        weight_map = json.loads(index.read_text(encoding="utf-8"))["weight_map"]
+        return [root / name for name in sorted(set(weight_map.values()))]
+    single = root / SAFETENSORS_FILENAME
+    return [single] if single.exists() else []
+
+
+def read_header(path: Path) -> Tuple[dict, int]:
+    """
+    Read a safetensors header.
+
+    Returns:
+        Tuple of (tensor name -> {dtype, shape, data_offsets}, byte offset of the data section)
+    """
+    with open(path, "rb") as f:
+        (header_size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_size))
+    header.pop("__metadata__", None)
+    return header, 8 + header_size
+
+
+def mmap_state_dict(model_dir: str) -> Dict[str, "torch.Tensor"]:  # noqa: F821
+    """
+    Map a model's safetensors weights into memory and view them as tensors.
+
+    The file is mapped copy-on-write, so the tensors are writable but a
+    write only copies the page it touches. The mapping stays open for as
+    long as any of the tensors are alive.
+
+    Raises:
+        FileNotFoundError: If the model directory has no safetensors weights
+    """
+    import torch
+
+    files = safetensors_files(model_dir)
+    if not files:
+        raise FileNotFoundError(f"No {SAFETENSORS_FILENAME} in {model_dir} (run scripts/convert_safetensors.py)")
+
+    state_dict = {}
+    for path in files:
+        header, data_start = read_header(path)
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        for name, info in header.items():
+            dtype = getattr(torch, _DTYPES[info["dtype"]])
+            start, end = info["data_offsets"]
+            count = (end - start) // dtype.itemsize
+            if count == 0:
+                state_dict[name] = torch.empty(info["shape"], dtype=dtype)
+                continue
+            tensor = torch.frombuffer(mapped, dtype=dtype, count=count, offset=data_start + start)
+            state_dict[name] = tensor.view(info["shape"])
+    return state_dict
+
+
+# Threads currently building modules inside _parameters_on_meta, and the patch they share.
+_meta_init = threading.local()
+_meta_patch = {"lock": threading.Lock(), "users": 0, "original": None}
+
+
+@contextlib.contextmanager
+def _parameters_on_meta():
+    """
+    Create module parameters on the meta device (no storage); buffers are created normally.
+
+    ``Module.register_parameter`` is patched while any thread is inside this
+    block, but only parameters registered by those threads go to meta, so
+    modules built concurrently elsewhere (the request path while a candidate
+    loads in the background) keep real weights.
+    """
+    import torch
+
+    with _meta_patch["lock"]:
+        if _meta_patch["users"] == 0:
+            register_parameter = torch.nn.Module.register_parameter
+
+            def register_on_meta(module, name, param):
+                register_parameter(module, name, param)
+                if param is not None and getattr(_meta_init, "depth", 0):
+                    param = module._parameters[name]
+                    module._parameters[name] = torch.nn.Parameter(param.to("meta"), requires_grad=param.requires_grad)
+
+            _meta_patch["original"] = register_parameter
+            torch.nn.Module.register_parameter = register_on_meta
+        _meta_patch["users"] += 1
+
+    _meta_init.depth = getattr(_meta_init, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _meta_init.depth -= 1
+        with _meta_patch["lock"]:
+            _meta_patch["users"] -= 1
+            if _meta_patch["users"] == 0:
+                torch.nn.Module.register_parameter = _meta_patch["original"]
+                _meta_patch["original"] = None
+
+
+def load_mmap_model(model_dir: str):
+    """
+    Build a sequence classifier whose parameters live in the mmap'd safetensors file.
+
+    The module is created with its parameters on the meta device, so no
+    weights are allocated or randomly initialized, and the mapped tensors
+    are then assigned in place of them.
+
+    Raises:
+        FileNotFoundError: If the model directory has no safetensors weights
+        ValueError: If the file does not provide every parameter of the model
+    """
+    from transformers import AutoConfig, AutoModelForSequenceClassification
+
+    state_dict = mmap_state_dict(model_dir)
+    config = AutoConfig.from_pretrained(model_dir)
+    with _parameters_on_meta():
+        model = AutoModelForSequenceClassification.from_config(config)
+    model.load_state_dict(state_dict, strict=False, assign=True)
+    model.tie_weights()
+
+    missing = [name for name, param in model.named_parameters() if param.is_meta]
+    if missing:
+        raise ValueError(f"{model_dir} is missing weights for {', '.join(missing[:5])}")
+    model.eval()
+    logger.info("Memory-mapped %d tensor(s) from %s", len(state_dict), model_dir)
+    return model
+
+
+def convert_to_safetensors(model_dir: str, output_dir: str = None, dtype: str = None) -> Path:
+    """
+    Rewrite a trained checkpoint as a single ``model.safetensors`` ready to be mapped.
+
+    Accepts any checkpoint ``from_pretrained`` reads (``pytorch_model.bin``,
+    sharded files). Casting to ``dtype`` (``bf16``, ``fp16``) here, once,
+    keeps the weights shareable when serving at reduced precision. The new
+    files are written next to the output and renamed into place, so a
+    server mapping the old file keeps its pages.
+
+    Returns:
+        Path of the written safetensors file
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification
+
+    output = Path(output_dir or model_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+    if dtype:
+        model = model.to({"bf16": torch.bfloat16, "fp16": torch.float16, "fp32": torch.float32}[dtype])
+
+    if output.resolve() != Path(model_dir).resolve():
+        # Tokenizer and other side files travel with the weights; the old weight files do not.
+        for path in Path(model_dir).iterdir():
+            if path.is_file() and path.suffix not in (".bin", ".safetensors", ".pt") and not path.name.endswith(".index.json"):
+                shutil.copy2(path, output / path.name)
+
+    old_shards = safetensors_files(str(output)) if (output / SAFETENSORS_INDEX_FILENAME).exists() else []
+    with tempfile.TemporaryDirectory(dir=output, prefix=".convert-") as staging:
+        # One shard, so the loader maps a single file.
+        model.save_pretrained(staging, max_shard_size="100GB")
+        for name in (SAFETENSORS_FILENAME, "config.json"):
+            os.replace(Path(staging) / name, output / name)
+    for path in old_shards + [output / SAFETENSORS_INDEX_FILENAME]:
+        path.unlink(missing_ok=True)
+
+    logger.info("Wrote %s", output / SAFETENSORS_FILENAME)
+    return output / SAFETENSORS_FILENAME
@@ -0,0 +1,304 @@
+"""Parallel, verified, cached download of model artifacts from S3."""
+
+import hashlib
+import json
+import math
+import os
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+MB = 1024 * 1024
+DEFAULT_MULTIPART_CHUNKSIZE = 8 * MB
+_HASH_BLOCK = 1 * MB
+# Files of a synced model directory that came from S3; everything else is local and carried over
+SYNC_MANIFEST = ".s3_artifacts.json"
+
+
+@dataclass
+class RemoteArtifact:
+    """One object under the model prefix."""
+
+    key: str
+    rel_path: str
+    size: int
+    etag: str
+
+    @property
+    def cache_name(self) -> str:
+        """Content address: the object's ETag and size identify its bytes."""
+        return f"{self.etag.replace('-', '_')}-{self.size}"
+
+    @property
+    def parts(self) -> int:
+        """Number of multipart upload parts encoded in the ETag (0 for single-part)."""
+        _, _, count = self.etag.partition("-")
+        return int(count) if count else 0
+
+
+def list_artifacts(s3, bucket: str, prefix: str) -> List[RemoteArtifact]:
+    """List every object under ``prefix`` with its size and ETag."""
+    artifacts = []
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            rel = obj["Key"][len(prefix):].lstrip("/")
+            if not rel or rel.endswith("/"):
+                continue
+            artifacts.append(RemoteArtifact(obj["Key"], rel, int(obj["Size"]), obj["ETag"].strip('"')))
+    return artifacts
+
+
+def _md5_file(path: Path) -> str:
+    md5 = hashlib.md5()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            md5.update(block)
+    return md5.hexdigest()
+
+
+def _md5_parts(path: Path, part_size: int) -> List[bytes]:
+    digests = []
+    with path.open("rb") as f:
+        while True:
+            md5 = hashlib.md5()
+            read = 0
+            while read < part_size:
+                block = f.read(min(_HASH_BLOCK, part_size - read))
+                if not block:
+                    break
+                md5.update(block)
+                read += len(block)
+            if not read:
+                return digests
+            digests.append(md5.digest())
+            if read < part_size:
+                return digests
+
+
+def etag_matches_file(path: Path, artifact: RemoteArtifact, part_sizes: List[int]) -> bool:
+    """
+    Check a local file against an S3 object's size and ETag.
+
+    Single-part ETags are the MD5 of the content. Multipart ETags are the MD5
+    of the concatenated part MD5s plus ``-<parts>``, so they can only be
+    reproduced with the upload's part size; each candidate in ``part_sizes``
+    is tried.
+    """
+    if path.stat().st_size != artifact.size:
+        return False
+    if not artifact.parts:
+        return _md5_file(path) == artifact.etag
+
+    for part_size in part_sizes:
+        if math.ceil(artifact.size / part_size) != artifact.parts:
+            continue
+        digests = _md5_parts(path, part_size)
+        if f"{hashlib.md5(b''.join(digests)).hexdigest()}-{artifact.parts}" == artifact.etag:
+            return True
+    return False
+
+
+def _part_size_candidates(s3, bucket: str, artifact: RemoteArtifact, chunksize: int) -> List[int]:
+    candidates = []
+    try:
+        # HEAD with PartNumber returns the exact size of the first upload part.
+        candidates.append(int(s3.head_object(Bucket=bucket, Key=artifact.key, PartNumber=1)["ContentLength"]))
+    except Exception as exc:
+        logger.debug("Part size lookup failed for %s: %s", artifact.key, exc)
+    for size in (chunksize, DEFAULT_MULTIPART_CHUNKSIZE, math.ceil(artifact.size / artifact.parts / MB) * MB):
+        if size > 0 and size not in candidates:
+            candidates.append(size)
+    return candidates
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+
+
+def _carry_over_local_files(model_dir: Path, staging: Path, synced: List[str]) -> List[str]:
+    """
+    Copy files the sync does not manage from the current ``model_dir`` into ``staging``.
+
+    Files listed in the current directory's manifest came from an earlier
+    sync; everything else (e.g. the evaluation results baked into the image)
+    was put there locally and must survive the swap. A file S3 now provides
+    always wins. The new manifest is written into ``staging``.
+
+    Returns:
+        Relative paths of the carried-over files
+    """
+    synced = set(synced)
+    carried = []
+    if model_dir.is_dir():
+        manifest = model_dir / SYNC_MANIFEST
+        managed = set(json.loads(manifest.read_text(encoding="utf-8"))) if manifest.exists() else set()
+        for file in sorted(model_dir.rglob("*")):
+            rel = file.relative_to(model_dir).as_posix()
+            if file.is_file() and rel != SYNC_MANIFEST and rel not in managed and rel not in synced:
+                _link_or_copy(file, staging / rel)
+                carried.append(rel)
+    staging.mkdir(parents=True, exist_ok=True)
+    (staging / SYNC_MANIFEST).write_text(json.dumps(sorted(synced)), encoding="utf-8")
+    return carried
+
+
+def _swap_into_place(staging: Path, model_dir: Path) -> None:
+    """
+    Point ``model_dir`` at a fully assembled staging directory.
+
+    ``model_dir`` is a symlink to a versioned sibling directory. A new link is
+    created under a temporary name and renamed over it with ``os.replace``, so
+    the path always resolves to one complete model. Local files are carried
+    into ``staging`` beforehand (see ``_carry_over_local_files``), so removing
+    a retired directory loses nothing. The version it pointed to
+    before is kept until the next swap, so a reader that resolved the link just
+    before the swap can finish loading; older versions are removed. A plain
+    directory left by an earlier release is converted once, with two renames.
+    """
+    version = model_dir.with_name(f".{model_dir.name}.v-{uuid.uuid4().hex[:8]}")
+    os.rename(staging, version)
+
+    keep = {version.name}
+    retired = None
+    if model_dir.is_symlink():
+        keep.add(Path(os.readlink(model_dir)).name)
+    elif model_dir.exists():
+        retired = model_dir.with_name(f".{model_dir.name}.old-{uuid.uuid4().hex[:8]}")
+        os.rename(model_dir, retired)
+
+    link = model_dir.with_name(f".{model_dir.name}.link-{uuid.uuid4().hex[:8]}")
+    os.symlink(version.name, link, target_is_directory=True)
+    os.replace(link, model_dir)
+
+    if retired is not None:
+        shutil.rmtree(retired, ignore_errors=True)
+    for old in model_dir.parent.glob(f".{model_dir.name}.v-*"):
+        if old.name not in keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def sync_model_from_s3(
+    bucket: str,
+    prefix: str,
+    model_dir: str,
+    cache_dir: str,
+    s3=None,
+    max_workers: int = 8,
+    multipart_threshold: int = 16 * MB,
+    multipart_chunksize: int = DEFAULT_MULTIPART_CHUNKSIZE,
+) -> dict:
+    """
+    Download the model under ``s3://bucket/prefix`` into ``model_dir``.
+
+    Objects are fetched concurrently (``max_workers`` at a time); objects
+    above ``multipart_threshold`` are additionally split into ranged GETs of
+    ``multipart_chunksize`` bytes. Every file is checked against its S3 size
+    and ETag, then stored in ``cache_dir`` under its content address, so an
+    unchanged object is never fetched twice. The model directory is
+    assembled from the cache in a staging directory next to ``model_dir``;
+    ``model_dir`` is then an atomically swapped symlink to it, so readers
+    never see a partial or missing model.
+
+    Args:
+        bucket: S3 bucket name
+        prefix: Key prefix holding the model files
+        model_dir: Destination model directory
+        cache_dir: Content-addressed artifact cache directory
+        s3: Optional boto3 S3 client (created from the environment otherwise)
+        max_workers: Objects downloaded in parallel
+        multipart_threshold: Object size above which ranged multipart GETs are used
+        multipart_chunksize: Bytes per ranged GET
+
+    Returns:
+        Dict with files, downloaded, cached, bytes_downloaded and seconds
+
+    Raises:
+        ValueError: If a downloaded file does not match its size and ETag
+    """
+    from boto3.s3.transfer import TransferConfig
+
+    if s3 is None:
+        import boto3
+
+        s3 = boto3.client(
+            "s3",
+            region_name=os.environ.get("AWS_DEFAULT_REGION", "us-east-1"),
+            endpoint_url=os.environ.get("S3_ENDPOINT_URL") or None,
+        )
+
+    started = time.perf_counter()
+    prefix = prefix.strip("/")
+    model_path = Path(model_dir)
+    objects_dir = Path(cache_dir) / "objects"
+    tmp_dir = Path(cache_dir) / "tmp"
+    objects_dir.mkdir(parents=True, exist_ok=True)
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    artifacts = list_artifacts(s3, bucket, f"{prefix}/")
+    if not artifacts:
+        raise FileNotFoundError(f"No model artifacts under s3://{bucket}/{prefix}")
+    missing = [artifact for artifact in artifacts if not (objects_dir / artifact.cache_name).exists()]
+    transfer = TransferConfig(
+        multipart_threshold=multipart_threshold,
+        multipart_chunksize=multipart_chunksize,
+        max_concurrency=max(1, max_workers),
+    )
+
+    def fetch(artifact: RemoteArtifact) -> int:
+        partial = tmp_dir / f"{artifact.cache_name}.{uuid.uuid4().hex}"
+        try:
+            s3.download_file(bucket, artifact.key, str(partial), Config=transfer)
+            part_sizes = _part_size_candidates(s3, bucket, artifact, multipart_chunksize) if artifact.parts else []
+            if not etag_matches_file(partial, artifact, part_sizes):
+                raise ValueError(f"Checksum mismatch for s3://{bucket}/{artifact.key}")
+            os.replace(partial, objects_dir / artifact.cache_name)
+        finally:
+            partial.unlink(missing_ok=True)
+        return artifact.size
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="s3-download") as pool:
+        bytes_downloaded = sum(pool.map(fetch, missing))
+
+    staging = model_path.with_name(f".{model_path.name}.staging-{uuid.uuid4().hex[:8]}")
+    model_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        for artifact in artifacts:
+            _link_or_copy(objects_dir / artifact.cache_name, staging / artifact.rel_path)
+        carried = _carry_over_local_files(model_path, staging, [artifact.rel_path for artifact in artifacts])
+        if carried:
+            logger.info("Kept %d local file(s) in %s: %s", len(carried), model_path, ", ".join(carried))
+        _swap_into_place(staging, model_path)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    summary = {
+        "files": len(artifacts),
+        "downloaded": len(missing),
+        "cached": len(artifacts) - len(missing),
+        "bytes_downloaded": bytes_downloaded,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info(
+        "Synced %d model artifact(s) from s3://%s/%s into %s (%d downloaded, %d from cache, %d bytes) in %.2fs",
+        summary["files"],
+        bucket,
+        prefix,
+        model_path,
+        summary["downloaded"],
+        summary["cached"],
+        bytes_downloaded,
+        summary["seconds"],
+    )
+    return summary
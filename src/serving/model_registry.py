@@ -0,0 +1,199 @@
+"""Resident model versions with warm hot-swap and header-based routing."""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from src.serving.batching import MicroBatcher
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+PRIMARY = "primary"
+CANDIDATE = "candidate"
+SLOTS = (PRIMARY, CANDIDATE)
+
+
+@dataclass
+class ModelVersion:
+    """One loaded, warmed model with its own micro-batcher."""
+
+    slot: str
+    model_dir: str
+    artifacts: dict
+    batcher: MicroBatcher
+    loaded_at: float = field(default_factory=time.time)
+    _users: int = field(default=0, repr=False)
+    _idle: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @contextmanager
+    def hold(self) -> Iterator["ModelVersion"]:
+        """Keep this version from being released while the caller predicts on it."""
+        self._users += 1
+        self._idle.clear()
+        try:
+            yield self
+        finally:
+            self._users -= 1
+            if self._users == 0:
+                self._idle.set()
+
+    async def wait_idle(self) -> None:
+        """Return once no caller holds this version."""
+        if self._users:
+            await self._idle.wait()
+
+    @property
+    def version_id(self) -> str:
+        return f"{self.model_dir}@{self.loaded_at}"
+
+    def describe(self) -> dict:
+        return {
+            "slot": self.slot,
+            "model_dir": self.model_dir,
+            "version_id": self.version_id,
+            "backend": self.artifacts.get("backend"),
+            "precision": self.artifacts.get("precision"),
+            "loaded_at": self.loaded_at,
+        }
+
+
+def directory_signature(path: Path) -> Tuple:
+    """``(relative path, size, mtime_ns)`` of every file under ``path``; empty if it is missing."""
+    if not path.is_dir():
+        return ()
+    entries = []
+    for file in sorted(path.rglob("*")):
+        if file.is_file():
+            stat = file.stat()
+            entries.append((file.relative_to(path).as_posix(), stat.st_size, stat.st_mtime_ns))
+    return tuple(entries)
+
+
+class ModelRegistry:
+    """
+    Keep up to two model versions resident and swap them without downtime.
+
+    A version is loaded and warmed next to whatever is serving, then
+    installed into its slot with a single assignment, so every request
+    resolved afterwards sees the new version. The replaced version is
+    released only after every caller that resolved and held it (see
+    ``ModelVersion.hold``) has finished and its batcher has drained, so
+    requests already using the old model complete on it.
+
+    The ``primary`` slot serves all traffic by default; a ``candidate`` can
+    be loaded alongside it, selected per request, and promoted.
+
+    Args:
+        load_artifacts: Blocking function that loads artifacts from a model directory
+        warm: Blocking function that warms loaded artifacts up
+        make_batcher: Builds the (not yet started) batcher for a version's artifacts
+        release_artifacts: Optional blocking function that frees a retired version's artifacts
+    """
+
+    def __init__(
+        self,
+        load_artifacts: Callable[[str], dict],
+        warm: Callable[[dict], object],
+        make_batcher: Callable[[dict], MicroBatcher],
+        release_artifacts: Optional[Callable[[dict], None]] = None,
+    ):
+        self._load_artifacts = load_artifacts
+        self._warm = warm
+        self._make_batcher = make_batcher
+        self._release_artifacts = release_artifacts
+        self._versions: Dict[str, ModelVersion] = {}
+        self._lock = asyncio.Lock()
+
+    def get(self, slot: str) -> Optional[ModelVersion]:
+        return self._versions.get(slot)
+
+    def resolve(self, requested: Optional[str] = None) -> Optional[ModelVersion]:
+        """Version for a request: the candidate when asked for and loaded, otherwise the primary."""
+        if requested and requested.strip().lower() == CANDIDATE and CANDIDATE in self._versions:
+            return self._versions[CANDIDATE]
+        return self._versions.get(PRIMARY)
+
+    def describe(self) -> Dict[str, dict]:
+        return {slot: version.describe() for slot, version in self._versions.items()}
+
+    async def load(self, slot: str, model_dir: str, artifacts: Optional[dict] = None) -> ModelVersion:
+        """
+        Load (unless ``artifacts`` is given), warm and install a version into ``slot``.
+
+        Raises:
+            ValueError: If ``slot`` is unknown
+        """
+        if slot not in SLOTS:
+            raise ValueError(f"Unknown model slot: {slot} (expected one of {SLOTS})")
+
+        async with self._lock:
+            started = time.perf_counter()
+            if artifacts is None:
+                artifacts = await asyncio.to_thread(self._load_artifacts, model_dir)
+            await asyncio.to_thread(self._warm, artifacts)
+            batcher = self._make_batcher(artifacts)
+            await batcher.start()
+
+            version = ModelVersion(slot, model_dir, artifacts, batcher)
+            previous = self._versions.get(slot)
+            self._versions[slot] = version
+            logger.info(
+                "Installed %s model %s in %.2fs", slot, version.version_id, time.perf_counter() - started
+            )
+
+        if previous is not None:
+            await self._retire(previous)
+            logger.info("Retired %s model %s", slot, previous.version_id)
+        return version
+
+    async def promote(self) -> ModelVersion:
+        """
+        Make the candidate the primary and retire the old primary.
+
+        Raises:
+            LookupError: If no candidate is loaded
+        """
+        async with self._lock:
+            candidate = self._versions.pop(CANDIDATE, None)
+            if candidate is None:
+                raise LookupError("No candidate model loaded")
+            candidate.slot = PRIMARY
+            previous = self._versions.get(PRIMARY)
+            self._versions[PRIMARY] = candidate
+            logger.info("Promoted candidate %s to primary", candidate.version_id)
+
+        if previous is not None:
+            await self._retire(previous)
+        return candidate
+
+    async def unload(self, slot: str) -> None:
+        """Drain and release the version in ``slot``, if any."""
+        async with self._lock:
+            version = self._versions.pop(slot, None)
+        if version is not None:
+            await self._retire(version)
+            logger.info("Unloaded %s model %s", slot, version.version_id)
+
+    async def close(self) -> None:
+        """Stop every resident version's batcher."""
+        versions = list(self._versions.values())
+        self._versions.clear()
+        for version in versions:
+            await version.batcher.stop()
+            await self._release(version)
+
+    async def _retire(self, version: ModelVersion) -> None:
+        await version.wait_idle()
+        await version.batcher.drain()
+        await self._release(version)
+
+    async def _release(self, version: ModelVersion) -> None:
+        if self._release_artifacts is not None:
+            try:
+                await asyncio.to_thread(self._release_artifacts, version.artifacts)
+            except Exception as exc:
+                logger.warning("Releasing %s model %s failed: %s", version.slot, version.version_id, exc)
@@ -0,0 +1,96 @@
+"""ONNX export and ONNX Runtime inference backend."""
+
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+ONNX_FILENAME = "model.onnx"
+ONNX_OPSET = 17
+ORT_INTRA_OP_THREADS = int(os.environ.get("ORT_INTRA_OP_THREADS", "0"))
+
+
+def export_onnx(model_dir: str, output_path: Optional[str] = None, opset: int = ONNX_OPSET) -> str:
+    """
+    Export a fine-tuned sequence classifier to ONNX.
+
+    The graph takes ``input_ids`` and ``attention_mask`` with dynamic batch
+    and sequence axes and returns ``logits``, so it serves both bucketed and
+    fixed padding.
+
+    Args:
+        model_dir: Directory with the saved HuggingFace model
+        output_path: Destination file (defaults to ``<model_dir>/model.onnx``)
+        opset: ONNX opset version
+
+    Returns:
+        Path of the written ONNX file
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification
+
+    output_path = output_path or str(Path(model_dir) / ONNX_FILENAME)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+    model.eval()
+
+    dummy = torch.ones((2, 8), dtype=torch.long)
+    torch.onnx.export(
+        model,
+        (dummy, dummy),
+        output_path,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits": {0: "batch"},
+        },
+        opset_version=opset,
+        dynamo=False,
+    )
+    logger.info("Exported ONNX model from %s to %s", model_dir, output_path)
+    return output_path
+
+
+class OnnxSequenceClassifier:
+    """ONNX Runtime session that returns classification logits as NumPy arrays."""
+
+    def __init__(self, onnx_path: str, num_threads: int = ORT_INTRA_OP_THREADS):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+
+        self.onnx_path = onnx_path
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+        self.num_labels = self.session.get_outputs()[0].shape[-1]
+
+    def __call__(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        return self.session.run(
+            ["logits"],
+            {
+                "input_ids": np.asarray(input_ids, dtype=np.int64),
+                "attention_mask": np.asarray(attention_mask, dtype=np.int64),
+            },
+        )[0]
+
+
+def load_onnx_model(model_dir: str, num_threads: int = ORT_INTRA_OP_THREADS) -> OnnxSequenceClassifier:
+    """Open ``<model_dir>/model.onnx``, raising FileNotFoundError when it has not been exported."""
+    onnx_path = Path(model_dir) / ONNX_FILENAME
+    if not onnx_path.exists():
+        raise FileNotFoundError(f"ONNX model not found: {onnx_path} (run scripts/export_onnx.py)")
+    return OnnxSequenceClassifier(str(onnx_path), num_threads=num_threads)
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
@@ -0,0 +1,120 @@
+"""
+Per-machine serving profiles written by scripts/tune_serving.py.
+
+A profile records the torch thread count, micro-batch size, batching wait
+and sequence-length buckets that measured best on one kind of machine.
+Profiles are stored in one JSON file keyed by machine, so a single file can
+cover several instance types. By default it sits next to the model
+directory rather than inside it: writing it must not look like a model
+change to the MODEL_DIR watcher, and an S3 sync replaces the directory's
+contents. At startup the API loads the entry for the machine it is running
+on, if there is one.
+"""
+
+import json
+import os
+import platform
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+PROFILE_FILENAME = "serving_profile.json"
+_FORMAT_VERSION = 1
+
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or "unknown"
+
+
+def _cpu_count() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def machine_fingerprint() -> Dict[str, object]:
+    """Describe the hardware a profile was measured on; ``key`` identifies it."""
+    info = {"cpu_model": _cpu_model(), "cpus": _cpu_count(), "arch": platform.machine()}
+    info["key"] = f"{info['arch']}/{info['cpu_model']}/{info['cpus']}cpu"
+    return info
+
+
+@dataclass
+class ServingProfile:
+    """Tuned serving settings for one machine type."""
+
+    max_batch_size: int
+    max_batch_wait_ms: float
+    seq_length_buckets: List[int]
+    num_threads: Optional[int] = None
+    backend: str = "pytorch"
+    precision: str = "fp32"
+    machine: Dict[str, object] = field(default_factory=machine_fingerprint)
+    measured: Dict[str, object] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ServingProfile":
+        known = {name: data[name] for name in cls.__dataclass_fields__ if name in data}
+        return cls(**known)
+
+
+def default_profile_path(model_dir: str) -> Path:
+    """``<parent>/<name>.serving_profile.json`` for ``<parent>/<name>``, e.g. models/latest.serving_profile.json."""
+    # abspath, not resolve: MODEL_DIR may be a symlink that every S3 sync repoints.
+    path = Path(os.path.abspath(model_dir))
+    return path.with_name(f"{path.name}.{PROFILE_FILENAME}")
+
+
+def save_profile(path: Path, profile: ServingProfile) -> Path:
+    """Add or replace this machine's entry in the profile file, keeping other machines' entries."""
+    path = Path(path)
+    profiles = {}
+    if path.exists():
+        profiles = json.loads(path.read_text(encoding="utf-8")).get("profiles", {})
+    profiles[profile.machine["key"]] = profile.to_dict()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps({"version": _FORMAT_VERSION, "profiles": profiles}, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def load_profile(path: Path, machine_key: Optional[str] = None) -> Optional[ServingProfile]:
+    """
+    Load the profile for ``machine_key`` (this machine by default).
+
+    Returns:
+        The matching profile, or None when the file is missing or has no
+        entry for the machine
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+    machine_key = machine_key or machine_fingerprint()["key"]
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        entry = data.get("profiles", {}).get(machine_key)
+        if entry is None:
+            logger.info("No serving profile for %s in %s", machine_key, path)
+            return None
+        return ServingProfile.from_dict(entry)
+    except (ValueError, TypeError) as exc:
+        logger.warning("Ignoring unreadable serving profile %s: %s", path, exc)
+        return None
@@ -0,0 +1,154 @@
+"""In-memory, precompressed serving of the built dashboard (``dashboard/dist``)."""
+
+import gzip
+import hashlib
+import mimetypes
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.responses import FileResponse, Response
+
+from src.serving.cache import etag_matches
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+# Vite fingerprints everything under assets/, so those files never change in place.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+MAX_IN_MEMORY_BYTES = 8 * 1024 * 1024
+MIN_COMPRESS_BYTES = 1024
+_COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+_ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def _brotli_compress(body: bytes) -> Optional[bytes]:
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(body, quality=11)
+
+
+@dataclass
+class StaticAsset:
+    """One dashboard file: identity body, precompressed variants and response headers."""
+
+    path: Path
+    media_type: str
+    etag: str
+    cache_control: str
+    body: Optional[bytes] = None
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> set:
+    """Content codings the client accepts with a non-zero quality."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class DashboardBundle:
+    """
+    Index of the dashboard build, loaded once and served from memory.
+
+    Every file under ``dist_dir`` is read at load time. Compressible files
+    get gzip and (when the optional ``brotli`` package is installed) brotli
+    variants, unless the build already shipped ``.gz``/``.br`` siblings.
+    Hashed files under ``assets/`` are served as immutable; everything else,
+    including ``index.html``, revalidates through its ETag. Files larger
+    than ``MAX_IN_MEMORY_BYTES`` stay on disk and go through FileResponse.
+    """
+
+    def __init__(self, dist_dir: Path):
+        self.dist_dir = Path(dist_dir)
+        self.assets: Dict[str, StaticAsset] = {}
+        if self.dist_dir.is_dir():
+            self._index()
+
+    @property
+    def index(self) -> Optional[StaticAsset]:
+        return self.assets.get("index.html")
+
+    def _index(self) -> None:
+        files = [path for path in self.dist_dir.rglob("*") if path.is_file()]
+        originals = {path for path in files if path.suffix not in (".gz", ".br")}
+        total = 0
+
+        for path in originals:
+            rel = path.relative_to(self.dist_dir).as_posix()
+            media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            cache_control = IMMUTABLE_CACHE_CONTROL if rel.startswith("assets/") else REVALIDATE_CACHE_CONTROL
+            stat = path.stat()
+
+            if stat.st_size > MAX_IN_MEMORY_BYTES:
+                etag = '"{:x}-{:x}"'.format(stat.st_mtime_ns, stat.st_size)
+                self.assets[rel] = StaticAsset(path, media_type, etag, cache_control)
+                continue
+
+            body = path.read_bytes()
+            asset = StaticAsset(
+                path,
+                media_type,
+                '"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+                cache_control,
+                body=body,
+            )
+            for coding, suffix in _ENCODING_SUFFIXES.items():
+                shipped = path.with_name(path.name + suffix)
+                if shipped.is_file():
+                    asset.encoded[coding] = shipped.read_bytes()
+
+            if len(body) >= MIN_COMPRESS_BYTES and media_type.startswith(_COMPRESSIBLE_TYPES):
+                if "gzip" not in asset.encoded:
+                    asset.encoded["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+                if "br" not in asset.encoded:
+                    compressed = _brotli_compress(body)
+                    if compressed is not None:
+                        asset.encoded["br"] = compressed
+            # Drop variants that do not actually save bytes.
+            asset.encoded = {coding: data for coding, data in asset.encoded.items() if len(data) < len(body)}
+
+            total += len(body) + sum(len(data) for data in asset.encoded.values())
+            self.assets[rel] = asset
+
+        logger.info("Indexed dashboard: %d file(s), %.1f KiB in memory", len(self.assets), total / 1024)
+
+    def lookup(self, path: str) -> Optional[StaticAsset]:
+        """Asset for a request path, falling back to index.html for client-side routes."""
+        asset = self.assets.get(path.lstrip("/") or "index.html")
+        if asset is not None:
+            return asset
+        if path.lstrip("/").startswith("assets/"):
+            return None
+        return self.index
+
+    def respond(self, asset: StaticAsset, headers) -> Response:
+        """Build the response for ``asset`` given the request headers."""
+        accepted = accepted_encodings(headers.get("accept-encoding"))
+        coding = next((c for c in ("br", "gzip") if c in accepted and c in asset.encoded), None)
+        # Each encoded representation needs its own strong validator.
+        etag = asset.etag if coding is None else f'{asset.etag[:-1]}-{coding}"'
+
+        response_headers = {"ETag": etag, "Cache-Control": asset.cache_control, "Vary": "Accept-Encoding"}
+        if etag_matches(headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=response_headers)
+        if asset.body is None:
+            return FileResponse(asset.path, media_type=asset.media_type, headers=response_headers)
+        if coding is None:
+            return Response(asset.body, media_type=asset.media_type, headers=response_headers)
+
+        response_headers["Content-Encoding"] = coding
+        return Response(asset.encoded[coding], media_type=asset.media_type, headers=response_headers)
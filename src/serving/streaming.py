@@ -0,0 +1,192 @@
+"""NDJSON request parsing and streaming response helpers for bulk prediction."""
+
+import asyncio
+import json
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Union
+
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from src.serving.executor import QueueFullError
+from src.utils.logging_config import setup_logging
+from src.utils.serialization import dumps
+from src.utils.validation import ValidationError, validate_text
+
+logger = setup_logging(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+StreamItem = Tuple[int, Union[str, ValidationError]]
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Streaming response that lets the body iterator keep reading the request.
+
+    Starlette's StreamingResponse may listen for client disconnects on the
+    same receive channel the request body arrives on, which would swallow
+    body chunks still being uploaded. Here the body iterator owns the
+    receive channel; a disconnect surfaces as ClientDisconnect from
+    ``request.stream()`` instead.
+    """
+
+    media_type = NDJSON_MEDIA_TYPE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+def parse_ndjson_item(line: bytes, index: int, max_length: int) -> Union[str, ValidationError]:
+    """Parse one NDJSON line (a JSON string or an object with "text") into validated text."""
+    name = f"items[{index}]"
+    try:
+        value = json.loads(line)
+    except ValueError:
+        return ValidationError(f"{name} is not valid JSON")
+
+    if isinstance(value, dict):
+        value = value.get("text")
+    try:
+        return validate_text(value, min_length=1, max_length=max_length, name=name)
+    except ValidationError as exc:
+        return exc
+
+
+async def iter_ndjson_items(
+    chunks: AsyncIterator[bytes],
+    max_length: int,
+    max_line_bytes: int,
+) -> AsyncIterator[StreamItem]:
+    """
+    Yield ``(index, text_or_error)`` for each non-blank NDJSON line as it arrives.
+
+    Only the current partial line is buffered, so memory stays bounded by
+    ``max_line_bytes`` regardless of body size.
+
+    Raises:
+        ValidationError: If a single line exceeds ``max_line_bytes``
+    """
+    buffer = b""
+    index = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        if len(buffer) > max_line_bytes:
+            raise ValidationError(f"items[{index + len(lines)}] exceeds {max_line_bytes} bytes")
+        for line in lines:
+            if line.strip():
+                yield index, parse_ndjson_item(line, index, max_length)
+                index += 1
+
+    if buffer.strip():
+        yield index, parse_ndjson_item(buffer, index, max_length)
+
+
+async def _read_into(items: AsyncIterator[StreamItem], queue: asyncio.Queue) -> None:
+    """Forward items to ``queue`` as ("item", item), then ("end", None) or ("error", exc)."""
+    try:
+        async for item in items:
+            await queue.put(("item", item))
+    except Exception as exc:
+        await queue.put(("error", exc))
+        return
+    await queue.put(("end", None))
+
+
+async def stream_predictions(
+    items: AsyncIterator[StreamItem],
+    predict: Callable[[List[str]], Awaitable[List[dict]]],
+    batch_size: int,
+    max_wait_s: float = 0.05,
+    max_retry_s: float = 30.0,
+) -> AsyncIterator[bytes]:
+    """
+    Run ``predict`` over items in batches and yield NDJSON result lines in input order.
+
+    A batch is predicted once it holds ``batch_size`` items or ``max_wait_s``
+    after its first item arrived, so results already computable are not held
+    back by a slow upload. While the inference queue is full, a batch is
+    retried after the queue's Retry-After for up to ``max_retry_s``; after
+    that its items get error lines and the stream carries on.
+
+    Invalid items produce ``{"index": i, "error": ...}`` lines in place. If the
+    stream itself fails, a final error line is emitted and the stream ends.
+    """
+    pending: List[StreamItem] = []
+    loop = asyncio.get_running_loop()
+
+    async def predict_with_retry(texts: List[str]) -> Union[List[dict], str]:
+        deadline = loop.time() + max_retry_s
+        while True:
+            try:
+                return await predict(texts)
+            except QueueFullError as exc:
+                delay = max(exc.retry_after, 0.01)
+                if loop.time() + delay > deadline:
+                    logger.warning("Inference queue still full after %.0fs; failing %d item(s)", max_retry_s, len(texts))
+                    return "Inference queue is full, retry shortly"
+                await asyncio.sleep(delay)
+
+    async def flush() -> List[bytes]:
+        texts = [item for _, item in pending if isinstance(item, str)]
+        predictions = await predict_with_retry(texts) if texts else []
+        rows = iter(predictions) if isinstance(predictions, list) else None
+        lines = []
+        for index, item in pending:
+            if not isinstance(item, str):
+                payload = {"index": index, "error": str(item)}
+            elif rows is None:
+                payload = {"index": index, "error": predictions}
+            else:
+                payload = {"index": index, **next(rows)}
+            lines.append(dumps(payload) + b"\n")
+        pending.clear()
+        return lines
+
+    # The body is read by its own task so a partial batch can be flushed on a timer
+    # without cancelling the (non-resumable) item iterator.
+    queue: asyncio.Queue = asyncio.Queue(maxsize=batch_size * 2)
+    reader = asyncio.create_task(_read_into(items, queue))
+    error: Optional[str] = None
+    try:
+        flush_at = None
+        while True:
+            timeout = None if flush_at is None else max(0.0, flush_at - loop.time())
+            try:
+                kind, value = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                flush_at = None
+                for line in await flush():
+                    yield line
+                continue
+
+            if kind == "error":
+                raise value
+            if kind == "end":
+                break
+            if not pending:
+                flush_at = loop.time() + max_wait_s
+            pending.append(value)
+            if len(pending) >= batch_size:
+                flush_at = None
+                for line in await flush():
+                    yield line
+        for line in await flush():
+            yield line
+    except ClientDisconnect:
+        logger.info("Client disconnected from prediction stream")
+        return
+    except ValidationError as exc:
+        logger.error("Validation error in prediction stream: %s", exc)
+        error = str(exc)
+    except Exception as exc:
+        logger.exception("Prediction stream aborted: %s", exc)
+        error = f"Stream aborted: {type(exc).__name__}"
+    finally:
+        reader.cancel()
+
+    if error is not None:
+        yield dumps({"error": error}) + b"\n"
@@ -0,0 +1,60 @@
+"""Runtime metrics for the inference service, scraped from GET /metrics."""
+
+from src.utils.instrumentation import REGISTRY
+
+# Stages of a /predict call: validation, queue_wait (micro-batch queue),
+# executor_wait (inference thread queue), tokenization, forward,
+# postprocess and serialization.
+STAGE_SECONDS = REGISTRY.histogram(
+    "newssnap_stage_seconds",
+    "Time spent in each stage of a prediction request.",
+    labelnames=("stage",),
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "newssnap_request_seconds",
+    "End-to-end prediction request latency, by model slot (primary/candidate/demo).",
+    labelnames=("endpoint", "mode", "version"),
+)
+BATCH_SIZE = REGISTRY.histogram(
+    "newssnap_batch_size",
+    "Texts per model forward pass.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+BATCH_TOKENS = REGISTRY.histogram(
+    "newssnap_batch_tokens",
+    "Real (unpadded) tokens per model forward pass.",
+    buckets=(16, 64, 256, 512, 1024, 2048, 4096, 8192),
+)
+TOKENS_TOTAL = REGISTRY.counter(
+    "newssnap_tokens_total",
+    "Real (unpadded) tokens sent through the model.",
+)
+PREDICTIONS_TOTAL = REGISTRY.counter(
+    "newssnap_predictions_total",
+    "Texts predicted, by serving mode.",
+    labelnames=("mode",),
+)
+CACHE_LOOKUPS_TOTAL = REGISTRY.counter(
+    "newssnap_cache_lookups_total",
+    "Prediction cache lookups by result.",
+    labelnames=("result",),
+)
+CASCADE_PREDICTIONS_TOTAL = REGISTRY.counter(
+    "newssnap_cascade_predictions_total",
+    "Texts answered by each cascade stage (first = linear classifier, second = model).",
+    labelnames=("stage",),
+)
+MODEL_MODE = REGISTRY.gauge(
+    "newssnap_model_mode",
+    "1 for the serving mode currently active (real or demo).",
+    labelnames=("mode",),
+)
+INFERENCE_WORKERS = REGISTRY.gauge(
+    "newssnap_inference_workers",
+    "Inference worker processes by state (idle, busy, starting).",
+    labelnames=("state",),
+)
+WORKER_WAIT_DEPTH = REGISTRY.gauge(
+    "newssnap_inference_worker_waiting",
+    "Batches waiting for a free inference worker process.",
+)
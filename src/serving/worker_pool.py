@@ -0,0 +1,631 @@
+"""
+Pool of inference worker processes fed through shared memory.
+
+The API process keeps the tokenizer and hands padded ``input_ids`` and
+``attention_mask`` arrays to a worker process, which runs the forward pass
+and writes logits back. The arrays never go through pickle: each worker
+owns a shared-memory slab holding its input and output buffers, and the
+pipe only carries the batch shape.
+
+Each worker is pinned to its own subset of cores with a matching
+``torch.set_num_threads``. This lets several small batches run side by
+side instead of one process spreading intra-op threads past where they
+stop scaling. The pool starts ``min_workers`` processes. It starts more,
+up to ``max_workers``, while batches are waiting for a free worker, and
+retires workers that have been idle for ``idle_timeout_s``.
+"""
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.serving.telemetry import INFERENCE_WORKERS, WORKER_WAIT_DEPTH
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
+
+_ID_DTYPE = np.int64
+_LOGIT_DTYPE = np.float32
+# Consecutive failed worker starts after which starts pause for a backoff interval
+# (doubling on every further failure, up to _MAX_START_BACKOFF_S) instead of retrying at once.
+_MAX_START_FAILURES = 3
+_MAX_START_BACKOFF_S = 300.0
+
+
+def cpu_sets(workers: int, threads_per_worker: int = 0) -> List[List[int]]:
+    """
+    Split the cores this process may run on into one set per worker.
+
+    Args:
+        workers: Number of worker slots
+        threads_per_worker: Cores per worker (0 divides the available cores evenly)
+
+    Returns:
+        One list of CPU ids per worker slot. Sets wrap around and overlap
+        when there are fewer cores than ``workers * threads_per_worker``.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+    else:
+        cpus = list(range(os.cpu_count() or 1))
+    per_worker = threads_per_worker or max(1, len(cpus) // max(1, workers))
+    return [[cpus[(slot * per_worker + idx) % len(cpus)] for idx in range(per_worker)] for slot in range(workers)]
+
+
+class SharedSlab:
+    """
+    Shared-memory input and output buffers for one worker.
+
+    Layout: ``input_ids`` and ``attention_mask`` regions of
+    ``max_rows * max_cols`` int64 each, then a ``max_rows * num_labels``
+    float32 logits region. A ``(rows, cols)`` batch is stored contiguously at
+    the start of each region, so both processes can view it as a C-ordered
+    array without copying.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, max_rows: int, max_cols: int, num_labels: int, owner: bool):
+        self.shm = shm
+        self.max_rows = max_rows
+        self.max_cols = max_cols
+        self.num_labels = num_labels
+        self.owner = owner
+        self._ids_bytes = max_rows * max_cols * np.dtype(_ID_DTYPE).itemsize
+
+    @staticmethod
+    def nbytes(max_rows: int, max_cols: int, num_labels: int) -> int:
+        ids = max_rows * max_cols * np.dtype(_ID_DTYPE).itemsize
+        return 2 * ids + max_rows * num_labels * np.dtype(_LOGIT_DTYPE).itemsize
+
+    @classmethod
+    def create(cls, max_rows: int, max_cols: int, num_labels: int) -> "SharedSlab":
+        shm = shared_memory.SharedMemory(create=True, size=cls.nbytes(max_rows, max_cols, num_labels))
+        return cls(shm, max_rows, max_cols, num_labels, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, max_rows: int, max_cols: int, num_labels: int) -> "SharedSlab":
+        return cls(shared_memory.SharedMemory(name=name), max_rows, max_cols, num_labels, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def inputs(self, rows: int, cols: int) -> Tuple[np.ndarray, np.ndarray]:
+        """``(input_ids, attention_mask)`` views for a ``rows x cols`` batch."""
+        if rows > self.max_rows or cols > self.max_cols:
+            raise ValueError(f"Batch {rows}x{cols} exceeds slab capacity {self.max_rows}x{self.max_cols}")
+        shape = (rows, cols)
+        input_ids = np.ndarray(shape, dtype=_ID_DTYPE, buffer=self.shm.buf, offset=0)
+        attention_mask = np.ndarray(shape, dtype=_ID_DTYPE, buffer=self.shm.buf, offset=self._ids_bytes)
+        return input_ids, attention_mask
+
+    def logits(self, rows: int) -> np.ndarray:
+        """View of the logits for the first ``rows`` rows."""
+        return np.ndarray(
+            (rows, self.num_labels), dtype=_LOGIT_DTYPE, buffer=self.shm.buf, offset=2 * self._ids_bytes
+        )
+
+    def close(self) -> None:
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _load_runner(model_dir: str, backend: str, precision: Optional[str], num_threads: int):
+    """Load the classifier in a worker and return ``(run(input_ids, mask) -> logits, applied precision)``."""
+    from src.serving.inference import get_device, load_classifier
+
+    if backend == "onnx":
+        from src.serving.onnx_backend import load_onnx_model
+
+        session = load_onnx_model(model_dir, num_threads=num_threads)
+        return session, "fp32"
+
+    import torch
+
+    torch.set_num_threads(num_threads)
+    model, applied = load_classifier(model_dir, precision, backend)
+    device = get_device()
+
+    def run(input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        with torch.inference_mode():
+            outputs = model(
+                input_ids=torch.from_numpy(input_ids).to(device),
+                attention_mask=torch.from_numpy(attention_mask).to(device),
+            )
+            return outputs.logits.float().cpu().numpy()
+
+    return run, applied
+
+
+def _worker_main(
+    model_dir: str,
+    backend: str,
+    precision: Optional[str],
+    cpus: Sequence[int],
+    slab_spec: Tuple[str, int, int, int],
+    warmup_shapes: Sequence[Tuple[int, int]],
+    conn,
+) -> None:
+    """Worker process entry point: load the model, then serve forward requests until told to stop."""
+    num_threads = max(1, len(cpus))
+    # Set before torch (or onnxruntime) is imported so its thread pools are sized for our cores.
+    os.environ["OMP_NUM_THREADS"] = str(num_threads)
+    slab = None
+    try:
+        if cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpus)
+        slab = SharedSlab.attach(*slab_spec)
+        run, applied = _load_runner(model_dir, backend, precision, num_threads)
+        for rows, cols in warmup_shapes:
+            run(np.zeros((rows, cols), dtype=_ID_DTYPE), np.ones((rows, cols), dtype=_ID_DTYPE))
+        conn.send(("ready", {"pid": os.getpid(), "precision": applied}))
+    except Exception as exc:
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+        if slab is not None:
+            slab.close()
+        return
+
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            if message[0] == "stop":
+                break
+            _, rows, cols = message
+            try:
+                # No array views outlive the call, so the slab can be closed on exit.
+                slab.logits(rows)[...] = run(*slab.inputs(rows, cols))
+                conn.send(("ok", rows))
+            except Exception as exc:
+                conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    finally:
+        slab.close()
+
+
+class WorkerCrashedError(RuntimeError):
+    """Raised when a worker process exits while running a batch."""
+
+
+@dataclass(eq=False)
+class _Worker:
+    slot: int
+    cpus: List[int]
+    process: multiprocessing.process.BaseProcess
+    conn: object
+    slab: SharedSlab
+    precision: str = "fp32"
+    last_used: float = field(default_factory=time.monotonic)
+
+    def forward(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        rows, cols = input_ids.shape
+        ids_view, mask_view = self.slab.inputs(rows, cols)
+        ids_view[...] = input_ids
+        mask_view[...] = attention_mask
+        try:
+            self.conn.send(("forward", rows, cols))
+            status, detail = self.conn.recv()
+        except (EOFError, OSError) as exc:
+            raise WorkerCrashedError(f"Inference worker {self.process.pid} exited: {exc}") from exc
+        if status != "ok":
+            raise RuntimeError(f"Inference worker {self.process.pid} failed: {detail}")
+        return self.slab.logits(rows).copy()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        try:
+            self.conn.send(("stop",))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        self.conn.close()
+        self.slab.close()
+
+
+def _num_labels(model_dir: str) -> int:
+    config_path = Path(model_dir) / "config.json"
+    config = json.loads(config_path.read_text(encoding="utf-8"))
+    if config.get("id2label"):
+        return len(config["id2label"])
+    return int(config.get("num_labels", 2))
+
+
+class WorkerPool:
+    """
+    Run forward passes on a pool of worker processes.
+
+    Called like the ONNX session, ``pool(input_ids, attention_mask)`` returns
+    float32 logits. The call blocks until a worker is free, so concurrent
+    callers (the inference executor's threads) each get their own worker.
+    A batch larger than ``max_rows`` is split across consecutive calls.
+
+    Args:
+        model_dir: Model directory each worker loads
+        min_workers: Workers kept running at all times
+        max_workers: Upper bound on workers while batches are waiting
+        threads_per_worker: Cores (and torch threads) per worker; 0 divides the available cores
+        backend: ``pytorch`` or ``onnx`` model inside the workers
+        precision: Precision for the PyTorch backend
+        max_rows: Largest batch a worker takes in one call
+        max_cols: Longest padded sequence
+        warmup_shapes: ``(rows, cols)`` shapes each new worker runs before taking traffic
+        idle_timeout_s: Idle time after which workers above ``min_workers`` are retired
+        start_timeout_s: Time allowed for a worker to load its model
+        start_backoff_s: Pause before starting workers again after repeated start failures
+        start_method: multiprocessing start method (``spawn`` is safe with torch threads)
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        min_workers: int = 1,
+        max_workers: int = 1,
+        threads_per_worker: int = 0,
+        backend: str = "pytorch",
+        precision: Optional[str] = None,
+        max_rows: int = 32,
+        max_cols: int = 128,
+        warmup_shapes: Sequence[Tuple[int, int]] = (),
+        idle_timeout_s: float = 60.0,
+        start_timeout_s: float = 300.0,
+        start_backoff_s: float = 30.0,
+        start_method: str = "spawn",
+    ):
+        if min_workers < 0:
+            raise ValueError("min_workers must be >= 0")
+        if max_workers < max(1, min_workers):
+            raise ValueError("max_workers must be >= max(1, min_workers)")
+
+        self.model_dir = model_dir
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.backend = backend
+        self.precision = precision
+        self.applied_precision: Optional[str] = None
+        self.max_rows = max_rows
+        self.max_cols = max_cols
+        self.warmup_shapes = [(min(rows, max_rows), min(cols, max_cols)) for rows, cols in warmup_shapes]
+        self.idle_timeout_s = idle_timeout_s
+        self.start_timeout_s = start_timeout_s
+        self.start_backoff_s = start_backoff_s
+        self.num_labels = _num_labels(model_dir)
+
+        self._ctx = multiprocessing.get_context(start_method)
+        self._cpu_sets = cpu_sets(max_workers, threads_per_worker)
+        self._free_slots = list(range(max_workers))
+        self._workers: List[_Worker] = []
+        self._idle: List[_Worker] = []
+        self._starting = 0
+        self._waiting = 0
+        self._start_failures = 0
+        self._retry_starts_at = 0.0
+        self._last_error: Optional[str] = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+    @property
+    def size(self) -> int:
+        """Workers currently running (idle or busy)."""
+        return len(self._workers)
+
+    @property
+    def waiting(self) -> int:
+        """Calls currently waiting for a free worker."""
+        return self._waiting
+
+    def start(self) -> "WorkerPool":
+        """
+        Start ``min_workers`` workers and wait until they have loaded the model.
+
+        Raises:
+            RuntimeError: If a worker fails to start
+        """
+        with self._cond:
+            self._starting += self.min_workers
+        threads = [threading.Thread(target=self._spawn, daemon=True) for _ in range(self.min_workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if len(self._workers) < self.min_workers:
+            self.close()
+            raise RuntimeError(f"Inference workers failed to start: {self._last_error}")
+
+        self._reaper = threading.Thread(target=self._reap_loop, name="worker-pool-reaper", daemon=True)
+        self._reaper.start()
+        logger.info(
+            "Inference worker pool ready: %d worker(s) (max %d), %d core(s) per worker",
+            len(self._workers),
+            self.max_workers,
+            len(self._cpu_sets[0]),
+        )
+        return self
+
+    def __call__(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        input_ids = np.asarray(input_ids, dtype=_ID_DTYPE)
+        attention_mask = np.asarray(attention_mask, dtype=_ID_DTYPE)
+        rows = input_ids.shape[0]
+        if rows <= self.max_rows:
+            return self._forward(input_ids, attention_mask)
+
+        logits = np.empty((rows, self.num_labels), dtype=_LOGIT_DTYPE)
+        for start in range(0, rows, self.max_rows):
+            end = start + self.max_rows
+            logits[start:end] = self._forward(input_ids[start:end], attention_mask[start:end])
+        return logits
+
+    def _forward(self, input_ids: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        worker = self._acquire()
+        try:
+            logits = worker.forward(input_ids, attention_mask)
+        except WorkerCrashedError:
+            self._discard(worker)
+            raise
+        except BaseException:
+            self._release(worker)
+            raise
+        self._release(worker)
+        return logits
+
+    def _acquire(self) -> _Worker:
+        with self._cond:
+            self._waiting += 1
+            self._update_gauges()
+            try:
+                while not self._idle:
+                    if self._closed:
+                        raise RuntimeError("Inference worker pool is closed")
+                    self._grow()
+                    if not self._workers and not self._starting:
+                        raise RuntimeError(f"No inference workers available: {self._last_error}")
+                    self._cond.wait(timeout=1.0)
+                # Most recently used first, so surplus workers stay idle long enough to be retired.
+                worker = self._idle.pop()
+            finally:
+                self._waiting -= 1
+            self._update_gauges()
+            return worker
+
+    def _release(self, worker: _Worker) -> None:
+        with self._cond:
+            worker.last_used = time.monotonic()
+            if self._closed:
+                self._workers.remove(worker)
+            else:
+                self._idle.append(worker)
+                self._cond.notify()
+            self._update_gauges()
+        if self._closed:
+            worker.stop()
+
+    def _discard(self, worker: _Worker) -> None:
+        logger.error("Inference worker %s (slot %d) died; replacing it", worker.process.pid, worker.slot)
+        with self._cond:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            self._free_slots.append(worker.slot)
+            self._update_gauges()
+            self._cond.notify_all()
+        worker.stop(timeout=1.0)
+
+    def _starts_allowed(self) -> bool:
+        """False while backing off after repeated start failures. Call with the lock held."""
+        return self._start_failures < _MAX_START_FAILURES or time.monotonic() >= self._retry_starts_at
+
+    def _grow(self) -> None:
+        """Start workers for callers that are waiting. Call with the lock held."""
+        if not self._starts_allowed():
+            return
+        wanted = self._waiting - self._starting
+        room = self.max_workers - len(self._workers) - self._starting
+        for _ in range(min(wanted, room)):
+            self._starting += 1
+            threading.Thread(target=self._spawn, daemon=True).start()
+        self._update_gauges()
+
+    def _spawn(self) -> None:
+        with self._cond:
+            slot = min(self._free_slots) if self._free_slots else None
+            if slot is not None:
+                self._free_slots.remove(slot)
+        worker = None
+        if slot is not None:
+            try:
+                worker = self._start_worker(slot)
+            except Exception as exc:
+                self._last_error = f"{type(exc).__name__}: {exc}"
+                if not self._closed:
+                    logger.error("Inference worker failed to start: %s", self._last_error)
+
+        stop = False
+        with self._cond:
+            self._starting -= 1
+            if worker is None:
+                if slot is not None:
+                    self._free_slots.append(slot)
+                self._start_failures += 1
+                if self._start_failures >= _MAX_START_FAILURES and not self._closed:
+                    backoff = min(
+                        self.start_backoff_s * 2 ** (self._start_failures - _MAX_START_FAILURES), _MAX_START_BACKOFF_S
+                    )
+                    self._retry_starts_at = time.monotonic() + backoff
+                    logger.warning(
+                        "%d consecutive inference worker start failures; retrying in %.0fs",
+                        self._start_failures,
+                        backoff,
+                    )
+            elif self._closed:
+                self._free_slots.append(slot)
+                stop = True
+            else:
+                self._start_failures = 0
+                self._workers.append(worker)
+                self._idle.append(worker)
+                self.applied_precision = self.applied_precision or worker.precision
+            self._update_gauges()
+            self._cond.notify_all()
+        if stop:
+            worker.stop()
+
+    def _start_worker(self, slot: int) -> _Worker:
+        started = time.perf_counter()
+        slab = SharedSlab.create(self.max_rows, self.max_cols, self.num_labels)
+        parent_conn, child_conn = self._ctx.Pipe()
+        cpus = self._cpu_sets[slot]
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(
+                self.model_dir,
+                self.backend,
+                self.precision,
+                cpus,
+                (slab.name, self.max_rows, self.max_cols, self.num_labels),
+                self.warmup_shapes,
+                child_conn,
+            ),
+            name=f"inference-worker-{slot}",
+            daemon=True,
+        )
+        try:
+            process.start()
+            child_conn.close()
+            if not parent_conn.poll(self.start_timeout_s):
+                raise TimeoutError(f"worker did not load the model within {self.start_timeout_s:.0f}s")
+            status, detail = parent_conn.recv()
+            if status != "ready":
+                raise RuntimeError(detail)
+        except BaseException:
+            if process.is_alive():
+                process.terminate()
+            process.join(1.0)
+            parent_conn.close()
+            slab.close()
+            raise
+
+        logger.info(
+            "Started inference worker %d (pid %d, cpus %s) in %.2fs",
+            slot,
+            detail["pid"],
+            cpus,
+            time.perf_counter() - started,
+        )
+        return _Worker(slot, cpus, process, parent_conn, slab, precision=detail["precision"])
+
+    def _reap_loop(self) -> None:
+        interval = max(0.05, min(self.idle_timeout_s / 2, 5.0))
+        while not self._stop_event.wait(interval):
+            self.reap()
+
+    def reap(self) -> None:
+        """Retire workers idle past ``idle_timeout_s`` above ``min_workers`` and replace dead ones."""
+        retired = []
+        now = time.monotonic()
+        with self._cond:
+            for worker in list(self._idle):
+                if not worker.process.is_alive():
+                    self._idle.remove(worker)
+                    self._workers.remove(worker)
+                    self._free_slots.append(worker.slot)
+                    retired.append(worker)
+            # Oldest-idle workers sit at the front of the idle list.
+            for worker in list(self._idle):
+                if len(self._workers) <= self.min_workers:
+                    break
+                if now - worker.last_used < self.idle_timeout_s:
+                    break
+                self._idle.remove(worker)
+                self._workers.remove(worker)
+                self._free_slots.append(worker.slot)
+                retired.append(worker)
+
+            missing = self.min_workers - len(self._workers) - self._starting
+            if missing > 0 and not self._closed and self._starts_allowed():
+                for _ in range(missing):
+                    self._starting += 1
+                    threading.Thread(target=self._spawn, daemon=True).start()
+            self._update_gauges()
+
+        for worker in retired:
+            logger.info("Retiring inference worker %d (pid %s)", worker.slot, worker.process.pid)
+            worker.stop()
+
+    def close(self) -> None:
+        """Stop every idle worker now; busy workers stop when their batch finishes."""
+        self._stop_event.set()
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            for worker in idle:
+                self._workers.remove(worker)
+            self._update_gauges()
+            self._cond.notify_all()
+        for worker in idle:
+            worker.stop()
+        if self._reaper is not None and self._reaper is not threading.current_thread():
+            self._reaper.join()
+
+    def _update_gauges(self) -> None:
+        busy = len(self._workers) - len(self._idle)
+        INFERENCE_WORKERS.labels("idle").set(len(self._idle))
+        INFERENCE_WORKERS.labels("busy").set(busy)
+        INFERENCE_WORKERS.labels("starting").set(self._starting)
+        WORKER_WAIT_DEPTH.set(self._waiting)
+
+
+def load_pooled_model(
+    model_dir: str,
+    min_workers: int,
+    max_workers: int,
+    threads_per_worker: int = 0,
+    backend: str = None,
+    precision: str = None,
+    max_batch_size: int = 32,
+    warmup_batch_sizes: Sequence[int] = (1,),
+    idle_timeout_s: float = 60.0,
+) -> dict:
+    """
+    Load the tokenizer in this process and the model in a started worker pool.
+
+    Returns artifacts in the ``model_fn`` format with ``backend`` set to
+    ``workers``, so predict_fn and warmup use the pool like any other model.
+    """
+    from src.serving.inference import (
+        INFERENCE_BACKEND,
+        MAX_SEQ_LENGTH,
+        PADDING_MODE,
+        SEQ_LENGTH_BUCKETS,
+        load_tokenizer,
+    )
+
+    backend = (backend or INFERENCE_BACKEND).lower()
+    tokenizer = load_tokenizer(model_dir, backend)
+    seq_lengths = (MAX_SEQ_LENGTH,) if PADDING_MODE == "max_length" else SEQ_LENGTH_BUCKETS
+    pool = WorkerPool(
+        model_dir,
+        min_workers=min_workers,
+        max_workers=max_workers,
+        threads_per_worker=threads_per_worker,
+        backend=backend,
+        precision=precision,
+        max_rows=max_batch_size,
+        max_cols=MAX_SEQ_LENGTH,
+        warmup_shapes=[(rows, cols) for cols in seq_lengths for rows in warmup_batch_sizes],
+        idle_timeout_s=idle_timeout_s,
+    ).start()
+    return {"model": pool, "tokenizer": tokenizer, "precision": pool.applied_precision, "backend": "workers"}
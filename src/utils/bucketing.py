@@ -0,0 +1,76 @@
+"""Length bucketing helpers for dynamic padding."""
+
+import os
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_BUCKET_BOUNDARIES = (32, 64, 128)
+
+
+def normalize_boundaries(boundaries: Optional[Sequence[int]], max_length: int) -> List[int]:
+    """
+    Sort and clamp bucket boundaries.
+
+    Boundaries at or above ``max_length`` are dropped and ``max_length`` is
+    always the last boundary, so every truncated sequence fits in some bucket.
+    """
+    values = sorted({int(b) for b in (boundaries or DEFAULT_BUCKET_BOUNDARIES)})
+    return [b for b in values if 0 < b < max_length] + [max_length]
+
+
+def parse_boundaries(value: Optional[str], max_length: int) -> List[int]:
+    """Parse a comma-separated list of bucket boundaries."""
+    parts = [part for part in (value or "").split(",") if part.strip()]
+    return normalize_boundaries([int(part) for part in parts], max_length)
+
+
+def boundaries_from_env(max_length: int, env_var: str = "SEQ_LENGTH_BUCKETS") -> List[int]:
+    """Read bucket boundaries from the environment."""
+    return parse_boundaries(os.environ.get(env_var), max_length)
+
+
+def length_buckets(lengths: Sequence[int], boundaries: Sequence[int]) -> List[List[int]]:
+    """
+    Group item indices by sequence length.
+
+    Items are sorted by length and assigned to the smallest boundary that
+    holds them. Returns one list of original indices per non-empty bucket,
+    shortest bucket first. Lengths above the last boundary fall in the last
+    bucket.
+
+    Args:
+        lengths: Token count per item
+        boundaries: Ascending bucket upper bounds
+
+    Returns:
+        List of index lists
+    """
+    order = sorted(range(len(lengths)), key=lambda idx: lengths[idx])
+    buckets: List[List[int]] = []
+    current: List[int] = []
+    bound_idx = 0
+
+    for idx in order:
+        while bound_idx < len(boundaries) - 1 and lengths[idx] > boundaries[bound_idx]:
+            bound_idx += 1
+            if current:
+                buckets.append(current)
+                current = []
+        current.append(idx)
+
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def pad_bucket(encodings: Dict[str, list], indices: List[int], pad_token_id: int = 0) -> Dict[str, list]:
+    """
+    Right-pad one bucket of pre-tokenized items to its own longest sequence.
+
+    Returns plain nested lists so callers can build torch or NumPy arrays.
+    """
+    input_ids = [encodings["input_ids"][idx] for idx in indices]
+    width = max((len(ids) for ids in input_ids), default=0)
+    return {
+        "input_ids": [ids + [pad_token_id] * (width - len(ids)) for ids in input_ids],
+        "attention_mask": [[1] * len(ids) + [0] * (width - len(ids)) for ids in input_ids],
+    }
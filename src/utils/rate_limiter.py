@@ -1,96 +1,368 @@
 """
 Rate Limiting Middleware
 Provides per-IP and per-endpoint rate limiting for API protection.
+
+All limits live in one rule table on a RateLimiter. Each (rule, key) pair
+is a token bucket: O(1) work and two floats of state per key. Buckets that
+have been idle long enough to refill completely are swept out periodically,
+so memory tracks active clients rather than every client ever seen.
+
+State lives in a pluggable store: in-process (single worker), SQLite
+(several workers on one host) or Redis (several hosts). The shared stores
+do blocking I/O, so async callers run their hits in a worker thread.
 """
 
+import asyncio
+import json
+import math
+import os
+import sqlite3
+import tempfile
+import threading
 import time
-from collections import defaultdict
-from typing import Dict, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.utils.logging_config import setup_logging
+
+logger = setup_logging(__name__)
 
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+Rules = Dict[str, Tuple[int, float]]
 
 
-class RateLimiterMiddleware(BaseHTTPMiddleware):
+class MemoryStore:
     """
-    Rate limiting middleware that tracks requests per IP address.
+    In-process token buckets. Fastest, but each worker process limits on its own.
 
-    Default: 100 requests per minute per IP
+    State is ``rule -> key -> [tokens, last_update]``.
     """
 
-    def __init__(self, app, requests_per_minute: int = 100):
-        super().__init__(app)
-        self.requests_per_minute = requests_per_minute
-        self.requests: Dict[str, list] = defaultdict(list)  # IP -> list of timestamps
+    blocking = False
 
-    async def dispatch(self, request: Request, call_next):
-        """Process request and apply rate limiting."""
-        client_ip = request.client.host if request.client else "unknown"
-        now = time.time()
-        one_minute_ago = now - 60
+    def __init__(self):
+        self._buckets: Dict[str, Dict[str, List[float]]] = {}
 
-        # Clean old requests
-        self.requests[client_ip] = [
-            ts for ts in self.requests[client_ip] if ts > one_minute_ago
-        ]
+    def take(self, rule: str, key: str, limit: int, window: float, now: float) -> Tuple[bool, int]:
+        buckets = self._buckets.setdefault(rule, {})
+        bucket = buckets.get(key)
+        if bucket is None:
+            tokens = float(limit)
+        else:
+            tokens = min(float(limit), bucket[0] + (now - bucket[1]) * limit / window)
 
-        # Check limit
-        if len(self.requests[client_ip]) >= self.requests_per_minute:
-            raise HTTPException(
-                status_code=429,
-                detail=f"Rate limit exceeded: {self.requests_per_minute} requests per minute"
-            )
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+
+        if bucket is None:
+            buckets[key] = [tokens, now]
+        else:
+            bucket[0] = tokens
+            bucket[1] = now
+        return allowed, int(tokens)
+
+    def evict_idle(self, rules: Rules, now: float) -> int:
+        evicted = 0
+        for rule, buckets in self._buckets.items():
+            idle_before = now - rules[rule][1]
+            stale = [key for key, bucket in buckets.items() if bucket[1] <= idle_before]
+            for key in stale:
+                del buckets[key]
+            evicted += len(stale)
+        return evicted
+
+    def reset(self, rule: str) -> None:
+        self._buckets[rule] = {}
+
+    def size(self, rule: Optional[str] = None) -> int:
+        if rule is not None:
+            return len(self._buckets.get(rule, ()))
+        return sum(len(buckets) for buckets in self._buckets.values())
+
+
+class SQLiteStore:
+    """
+    Token buckets in a local SQLite file, shared by every worker on one host.
+
+    Each hit is a single UPSERT ... RETURNING statement, so the refill, the
+    token take and the write are atomic across processes without an explicit
+    transaction. WAL mode with synchronous=OFF keeps writes off the disk's
+    fsync path; the state is disposable.
+    """
 
-        # Record this request
-        self.requests[client_ip].append(now)
+    blocking = True  # a locked database file can stall a hit for up to the 5 s busy timeout
 
-        response = await call_next(request)
-        response.headers["X-RateLimit-Limit"] = str(self.requests_per_minute)
-        response.headers["X-RateLimit-Remaining"] = str(
-            max(0, self.requests_per_minute - len(self.requests[client_ip]))
+    _TAKE_SQL = """
+        INSERT INTO buckets (rule, key, tokens, updated, allowed)
+        VALUES (:rule, :key, :limit - 1, :now, 1)
+        ON CONFLICT (rule, key) DO UPDATE SET
+            allowed = MIN(:limit, tokens + (:now - updated) * :rate) >= 1,
+            tokens = MIN(:limit, tokens + (:now - updated) * :rate)
+                     - (MIN(:limit, tokens + (:now - updated) * :rate) >= 1),
+            updated = :now
+        RETURNING allowed, tokens
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "rule TEXT NOT NULL, key TEXT NOT NULL, tokens REAL NOT NULL, "
+            "updated REAL NOT NULL, allowed INTEGER NOT NULL, PRIMARY KEY (rule, key))"
         )
-        return response
 
+    def take(self, rule: str, key: str, limit: int, window: float, now: float) -> Tuple[bool, int]:
+        params = {"rule": rule, "key": key, "limit": float(limit), "now": now, "rate": limit / window}
+        with self._lock:
+            allowed, tokens = self._conn.execute(self._TAKE_SQL, params).fetchone()
+        return bool(allowed), int(tokens)
 
-class EndpointRateLimiter:
-    """Per-endpoint rate limiter with configurable limits."""
+    def evict_idle(self, rules: Rules, now: float) -> int:
+        evicted = 0
+        with self._lock:
+            for rule, (_, window) in rules.items():
+                cursor = self._conn.execute(
+                    "DELETE FROM buckets WHERE rule = ? AND updated <= ?", (rule, now - window)
+                )
+                evicted += cursor.rowcount
+        return evicted
 
-    def __init__(self):
-        self.endpoint_limits: Dict[str, Tuple[int, int]] = {}  # endpoint -> (limit, window_seconds)
-        self.endpoint_requests: Dict[str, Dict[str, list]] = defaultdict(lambda: defaultdict(list))
-
-    def set_limit(self, endpoint: str, requests_per_window: int, window_seconds: int = 60):
-        """Configure rate limit for specific endpoint."""
-        self.endpoint_limits[endpoint] = (requests_per_window, window_seconds)
-
-    async def check_limit(self, endpoint: str, client_ip: str) -> bool:
-        """Check if client has exceeded endpoint limit."""
-        if endpoint not in self.endpoint_limits:
-            return True
-
-        limit, window = self.endpoint_limits[endpoint]
-        now = time.time()
-        window_start = now - window
-
-        # Clean old requests
-        self.endpoint_requests[endpoint][client_ip] = [
-            ts for ts in self.endpoint_requests[endpoint][client_ip]
-            if ts > window_start
-        ]
+    def reset(self, rule: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM buckets WHERE rule = ?", (rule,))
+
+    def size(self, rule: Optional[str] = None) -> int:
+        with self._lock:
+            if rule is not None:
+                return self._conn.execute("SELECT COUNT(*) FROM buckets WHERE rule = ?", (rule,)).fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM buckets").fetchone()[0]
+
+
+class RedisStore:
+    """
+    Sliding-window counters on any Redis-protocol server, shared across hosts.
+
+    Each hit sends INCR + EXPIRE on the current window's counter and GET on
+    the previous one as a single MULTI/EXEC pipeline: one round trip, applied
+    atomically. The estimate ``previous * (1 - elapsed_fraction) + current``
+    approximates the token bucket without server-side scripting, so any
+    Redis-compatible stand-in works. Counters expire on their own.
+    """
+
+    blocking = True  # every hit is a network round trip
+
+    def __init__(self, client=None, url: str = "redis://localhost:6379/0", prefix: str = "ratelimit"):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, rule: str, key: str, window_id: int) -> str:
+        return f"{self.prefix}:{rule}:{key}:{window_id}"
+
+    def take(self, rule: str, key: str, limit: int, window: float, now: float) -> Tuple[bool, int]:
+        window_id = int(now // window)
+        current_key = self._key(rule, key, window_id)
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.incr(current_key)
+        pipe.expire(current_key, int(window * 2) + 1)
+        pipe.get(self._key(rule, key, window_id - 1))
+        current, _, previous = pipe.execute()
+
+        elapsed = (now - window_id * window) / window
+        estimate = int(previous or 0) * (1.0 - elapsed) + int(current)
+        if estimate > limit:
+            self.client.decr(current_key)
+            return False, 0
+        return True, int(limit - estimate)
+
+    def evict_idle(self, rules: Rules, now: float) -> int:
+        return 0  # counters carry their own TTL
+
+    def reset(self, rule: str) -> None:
+        for redis_key in self.client.scan_iter(match=f"{self.prefix}:{rule}:*"):
+            self.client.delete(redis_key)
 
-        # Check limit
-        if len(self.endpoint_requests[endpoint][client_ip]) >= limit:
-            return False
+    def size(self, rule: Optional[str] = None) -> int:
+        pattern = f"{self.prefix}:{rule}:*" if rule is not None else f"{self.prefix}:*"
+        return sum(1 for _ in self.client.scan_iter(match=pattern))
 
-        # Record this request
-        self.endpoint_requests[endpoint][client_ip].append(now)
-        return True
 
-    async def rate_limit_check(self, endpoint: str, client_ip: str):
+def create_store(backend: str = "memory", sqlite_path: Optional[str] = None, redis_url: Optional[str] = None):
+    """
+    Build a limiter store by name: "memory", "sqlite" or "redis".
+
+    Shared stores fall back to the in-process store if they cannot be opened,
+    so a misconfigured limiter never takes the API down.
+    """
+    backend = (backend or "memory").lower()
+    try:
+        if backend == "sqlite":
+            path = sqlite_path or os.path.join(tempfile.gettempdir(), "newssnap-ratelimit.sqlite")
+            return SQLiteStore(path)
+        if backend == "redis":
+            store = RedisStore(url=redis_url or "redis://localhost:6379/0")
+            store.client.ping()
+            return store
+    except Exception as exc:
+        logger.warning("Rate limit backend %s unavailable: %s. Using in-process store.", backend, exc)
+        return MemoryStore()
+
+    if backend != "memory":
+        logger.warning("Unknown rate limit backend %s. Using in-process store.", backend)
+    return MemoryStore()
+
+
+class RateLimiter:
+    """
+    Rate limiter with a named rule table over a pluggable store.
+
+    A rule allows ``requests_per_window`` requests per ``window_seconds``.
+    The memory and SQLite stores keep a token bucket per key holding that
+    many tokens and refilling at ``requests_per_window / window_seconds``
+    tokens per second; the Redis store approximates it with sliding-window
+    counters.
+    """
+
+    def __init__(self, store=None, clock: Callable[[], float] = time.time, sweep_interval: float = 60.0):
+        self.store = store or MemoryStore()
+        self._clock = clock
+        self.sweep_interval = sweep_interval
+        self.rules: Rules = {}  # rule -> (limit, window_seconds)
+        self._next_sweep = clock() + sweep_interval
+
+    def set_limit(self, rule: str, requests_per_window: int, window_seconds: float = 60):
+        """Configure (or replace) a rule."""
+        if requests_per_window < 1:
+            raise ValueError("requests_per_window must be >= 1")
+        if window_seconds <= 0:
+            raise ValueError("window_seconds must be > 0")
+        self.rules[rule] = (requests_per_window, window_seconds)
+        if isinstance(self.store, MemoryStore):
+            self.store.reset(rule)
+
+    def hit(self, rule: str, key: str) -> Tuple[bool, int]:
+        """
+        Try to take one request for ``key`` under ``rule``.
+
+        Returns:
+            (allowed, remaining) where remaining is the whole requests left
+        """
+        if rule not in self.rules:
+            return True, 0
+
+        now = self._clock()
+        if now >= self._next_sweep:
+            self.evict_idle(now)
+
+        limit, window = self.rules[rule]
+        return self.store.take(rule, key, limit, window, now)
+
+    async def hit_async(self, rule: str, key: str) -> Tuple[bool, int]:
+        """
+        ``hit`` for the event loop: hits on stores that do blocking I/O run in a worker thread.
+
+        The in-process store answers inline; a thread hop would cost more than the hit.
+        """
+        if rule not in self.rules or not getattr(self.store, "blocking", False):
+            return self.hit(rule, key)
+        return await asyncio.to_thread(self.hit, rule, key)
+
+    def evict_idle(self, now: float = None) -> int:
+        """
+        Drop buckets idle for at least their rule's window.
+
+        Such a bucket has refilled completely, so it is indistinguishable from
+        a new key. Runs automatically every ``sweep_interval`` seconds; the
+        cost is amortized over all hits in that interval.
+
+        Returns:
+            Number of evicted keys
+        """
+        now = self._clock() if now is None else now
+        self._next_sweep = now + self.sweep_interval
+        return self.store.evict_idle(self.rules, now)
+
+    def size(self, rule: str = None) -> int:
+        """Number of tracked keys for one rule, or across all rules."""
+        return self.store.size(rule)
+
+    async def check_limit(self, rule: str, client_ip: str) -> bool:
+        """Check if client has exceeded the rule's limit."""
+        allowed, _ = await self.hit_async(rule, client_ip)
+        return allowed
+
+    async def rate_limit_check(self, rule: str, client_ip: str):
         """Check and raise HTTPException if limit exceeded."""
-        if not await self.check_limit(endpoint, client_ip):
-            limit, window = self.endpoint_limits[endpoint]
+        if not await self.check_limit(rule, client_ip):
+            limit, window = self.rules[rule]
             raise HTTPException(
                 status_code=429,
-                detail=f"Rate limit: {limit} requests per {window} seconds"
+                detail=f"Rate limit: {limit} requests per {window:g} seconds"
             )
+
+
+class RateLimiterMiddleware:
+    """
+    Pure ASGI middleware that applies one limiter rule per IP address.
+
+    Rejected requests are answered with a precomputed 429 response without
+    reaching the app. Allowed requests pass straight through; the
+    X-RateLimit headers are appended to the response start message, so
+    bodies (including streaming ones) are never buffered or wrapped.
+
+    Default: 100 requests per minute per IP
+    """
+
+    def __init__(self, app: ASGIApp, requests_per_minute: int = 100, limiter: RateLimiter = None,
+                 rule: str = "global"):
+        self.app = app
+        self.limiter = limiter or RateLimiter()
+        self.rule = rule
+        if rule not in self.limiter.rules:
+            self.limiter.set_limit(rule, requests_per_minute, 60)
+        self.requests_per_minute, window = self.limiter.rules[rule]
+
+        self._limit_header = (b"x-ratelimit-limit", str(self.requests_per_minute).encode("latin-1"))
+        self._rejected_body = json.dumps(
+            {"detail": f"Rate limit exceeded: {self.requests_per_minute} requests per minute"}
+        ).encode("utf-8")
+        self._rejected_headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(self._rejected_body)).encode("latin-1")),
+            (b"retry-after", str(max(1, math.ceil(window / self.requests_per_minute))).encode("latin-1")),
+            self._limit_header,
+            (b"x-ratelimit-remaining", b"0"),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        allowed, remaining = await self.limiter.hit_async(self.rule, client_ip)
+
+        if not allowed:
+            await send({"type": "http.response.start", "status": 429, "headers": self._rejected_headers})
+            await send({"type": "http.response.body", "body": self._rejected_body})
+            return
+
+        rate_headers = [self._limit_header, (b"x-ratelimit-remaining", str(remaining).encode("latin-1"))]
+
+        async def send_with_rate_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *rate_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_rate_headers)
@@ -0,0 +1,42 @@
+"""Fast JSON encoding shared by the HTTP API and the SageMaker handlers."""
+
+import json
+from typing import Any
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Encode NumPy scalars and arrays that reach the encoder unconverted."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Encode ``obj`` as UTF-8 JSON bytes.
+
+    Uses orjson when it is installed and the standard library otherwise.
+    Output is compact unless ``indent`` is set.
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_default, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=_default).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with ``dumps``; the content is not re-validated."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
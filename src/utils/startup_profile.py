@@ -0,0 +1,143 @@
+"""
+Cold-start profiling with ``python -X importtime`` and per-entry-point budgets.
+
+Each profile runs its statement in a fresh interpreter, parses the
+importtime report from stderr and records which modules ended up loaded.
+``check_budget`` compares a result against its import-time budget and the
+modules that entry point must never load (demo instances must not import
+torch, for example).
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+_HEAVY_MODULES = ("torch", "transformers", "sklearn", "pandas", "onnxruntime")
+
+# Budgets are for the entry point's cumulative import time on a CI runner.
+# STARTUP_BUDGET_SCALE multiplies them on slower machines.
+STARTUP_BUDGETS: Dict[str, dict] = {
+    "api": {
+        "statement": "import src.serving.api",
+        "module": "src.serving.api",
+        "budget_ms": 1000,
+        "forbidden": _HEAVY_MODULES + ("numpy",),
+    },
+    "demo_ready": {
+        "statement": (
+            "import src.serving.api as api; "
+            "api.MODEL_DIR = '/nonexistent-model-dir'; "
+            "api._load_model(); "
+            "assert api._model_state['mode'] == 'demo'"
+        ),
+        "module": "src.serving.api",
+        "budget_ms": 1000,
+        "forbidden": _HEAVY_MODULES + ("numpy",),
+    },
+    "inference": {
+        "statement": "import src.serving.inference",
+        "module": "src.serving.inference",
+        "budget_ms": 750,
+        "forbidden": ("torch", "transformers", "sklearn", "pandas"),
+    },
+}
+
+
+@dataclass
+class ImportRecord:
+    """One line of ``-X importtime`` output."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportRecord]:
+    """Parse ``import time: self | cumulative | module`` lines, ignoring everything else."""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        records.append(
+            ImportRecord(stripped, int(fields[0]), int(fields[1]), (len(name) - len(stripped)) // 2)
+        )
+    return records
+
+
+def profile_statement(statement: str, env: Optional[dict] = None) -> dict:
+    """
+    Run ``statement`` in a fresh interpreter under ``-X importtime``.
+
+    Returns:
+        Dict with wall_ms (process start to exit), records (ImportRecord list)
+        and modules (names in sys.modules when the statement finished)
+    """
+    code = f"{statement}\nimport json as _json, sys as _sys\nprint(_json.dumps(sorted(_sys.modules)))"
+    run_env = {**os.environ, **(env or {})}
+    started = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=str(PROJECT_ROOT),
+            env=run_env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except subprocess.CalledProcessError as exc:
+        raise RuntimeError(
+            f"Startup profile failed for {statement!r} (exit code {exc.returncode}):\n{exc.stderr[-2000:]}"
+        ) from exc
+    wall_ms = (time.perf_counter() - started) * 1000
+    if not proc.stdout.strip():
+        raise RuntimeError(f"Startup profile for {statement!r} printed no module list:\n{proc.stderr[-2000:]}")
+
+    return {
+        "wall_ms": wall_ms,
+        "records": parse_importtime(proc.stderr),
+        "modules": set(json.loads(proc.stdout.strip().splitlines()[-1])),
+    }
+
+
+def module_cumulative_ms(records: List[ImportRecord], module: str) -> float:
+    """Cumulative import time of ``module`` (0 if it was already imported or never imported)."""
+    return sum(r.cumulative_us for r in records if r.module == module) / 1000
+
+
+def package_breakdown(records: List[ImportRecord], top: int = 15) -> List[tuple]:
+    """Self time summed per top-level package, largest first, as ``(package, ms)`` pairs."""
+    totals: Dict[str, int] = defaultdict(int)
+    for record in records:
+        totals[record.module.split(".")[0]] += record.self_us
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [(package, micros / 1000) for package, micros in ranked]
+
+
+def check_budget(name: str, result: dict, scale: Optional[float] = None) -> List[str]:
+    """Return budget violations for a profile result (empty when within budget)."""
+    spec = STARTUP_BUDGETS[name]
+    if scale is None:
+        scale = float(os.environ.get("STARTUP_BUDGET_SCALE", "1"))
+
+    problems = []
+    loaded = sorted(m for m in spec["forbidden"] if m in result["modules"])
+    if loaded:
+        problems.append(f"{name}: imports {', '.join(loaded)}")
+    import_ms = module_cumulative_ms(result["records"], spec["module"])
+    budget_ms = spec["budget_ms"] * scale
+    if import_ms > budget_ms:
+        problems.append(f"{name}: {spec['module']} took {import_ms:.0f} ms to import (budget {budget_ms:.0f} ms)")
+    return problems
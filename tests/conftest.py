@@ -0,0 +1,38 @@
+"""Shared fixtures for tests."""
+
+import string
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def tiny_model_dir(tmp_path_factory):
+    """Save a tiny randomly initialised DistilBERT classifier and tokenizer."""
+    transformers = pytest.importorskip("transformers")
+    pytest.importorskip("torch")
+
+    model_dir = tmp_path_factory.mktemp("tiny_model")
+    vocab = (
+        ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+        + list(string.ascii_lowercase)
+        + [f"##{char}" for char in string.ascii_lowercase]
+        + list(string.digits)
+        + list(".,!?'-")
+        + "the a of to in and stock market team win nasa launch government".split()
+    )
+    vocab_file = model_dir / "vocab.txt"
+    vocab_file.write_text("\n".join(vocab), encoding="utf-8")
+
+    tokenizer = transformers.DistilBertTokenizerFast(vocab_file=str(vocab_file))
+    config = transformers.DistilBertConfig(
+        vocab_size=len(vocab),
+        dim=32,
+        hidden_dim=64,
+        n_layers=2,
+        n_heads=2,
+        num_labels=4,
+    )
+    model = transformers.DistilBertForSequenceClassification(config)
+    model.save_pretrained(str(model_dir))
+    tokenizer.save_pretrained(str(model_dir))
+    return str(model_dir)
@@ -1,8 +1,11 @@
 """API request validation and response behavior tests."""
 
+from types import SimpleNamespace
+
 from fastapi.testclient import TestClient
 
 from src.serving.api import app
+from src.serving.model_registry import ModelVersion
 
 
 client = TestClient(app)
@@ -29,3 +32,253 @@ def test_predict_rejects_overly_long_text():
 
     assert response.status_code == 422
     assert "cannot exceed 5000" in response.json()["detail"]
+
+
+def test_predict_returns_503_with_retry_after_when_inference_queue_full(monkeypatch):
+    from src.serving import api
+    from src.serving.executor import QueueFullError
+
+    async def full(*_args):
+        raise QueueFullError("full", retry_after=3)
+
+    primary = ModelVersion("primary", "models/latest", {}, SimpleNamespace(running=False))
+    monkeypatch.setitem(api._model_state, "mode", "real")
+    monkeypatch.setattr(api._registry, "resolve", lambda requested=None: primary)
+    monkeypatch.setattr(api._executor, "submit", full)
+    response = client.post("/predict", json={"text": "Markets rally on rate cut hopes"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+
+
+def test_keyword_counts_score_all_labels_in_one_pass():
+    from src.serving.api import _keyword_counts
+
+    texts = [
+        "The United Nations summit on AI and NASA satellite launch",
+        "Team wins cup as stock market rallies",
+        "nothing relevant here",
+        "CEO says UN vote will hit bank earnings\nbefore the game",
+    ]
+
+    assert _keyword_counts(texts) == [[2, 0, 0, 4], [0, 2, 2, 0], [0, 0, 0, 0], [2, 1, 3, 0]]
+
+
+def test_predict_stream_returns_ndjson_in_order_with_inline_errors():
+    import json
+
+    lines = ['"Lakers win the championship"', "", '{"text": "Stocks rally"}', '{"text": "   "}', "not json"]
+    lines += [json.dumps(f"Headline number {idx}") for idx in range(40)]
+    response = client.post("/predict/stream", content="\n".join(lines).encode("utf-8"))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["index"] for r in results] == list(range(44))
+    assert results[0]["text"] == "Lakers win the championship"
+    assert "at least 1 characters" in results[2]["error"]
+    assert "not valid JSON" in results[3]["error"]
+    assert all("label" in r for r in results[4:])
+
+
+def test_predict_stream_routes_each_batch_to_the_current_version(monkeypatch):
+    import json
+
+    from src.serving import api
+
+    versions = [ModelVersion("primary", f"v{idx}", {"name": f"v{idx}"}, SimpleNamespace(running=False)) for idx in (1, 2)]
+    held = []
+
+    def resolve(requested=None):
+        # The first resolve routes the request; every batch after the second one sees the reloaded v2.
+        resolve.calls += 1
+        return versions[0] if resolve.calls <= 2 else versions[1]
+
+    resolve.calls = 0
+
+    async def submit(_fn, texts, artifacts):
+        held.append([version._users for version in versions])
+        return [{"text": text, "label": "World", "model": artifacts["name"]} for text in texts]
+
+    monkeypatch.setitem(api._model_state, "mode", "real")
+    monkeypatch.setattr(api._registry, "resolve", resolve)
+    monkeypatch.setattr(api._executor, "submit", submit)
+    monkeypatch.setattr(api, "MAX_TEXTS_PER_REQUEST", 1)
+    lines = [json.dumps(f"Swap headline {idx}") for idx in range(3)]
+    response = client.post("/predict/stream", content="\n".join(lines).encode("utf-8"))
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["model"] for r in results] == ["v1", "v2", "v2"]
+    assert held == [[1, 0], [0, 1], [0, 1]]
+    assert [version._users for version in versions] == [0, 0]
+
+
+def test_metrics_endpoint_exposes_stage_histograms_after_prediction():
+    client.post("/predict", json={"text": "Stocks rally on strong earnings"})
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE newssnap_stage_seconds histogram" in body
+    assert 'newssnap_stage_seconds_count{stage="validation"}' in body
+    assert 'newssnap_stage_seconds_count{stage="serialization"}' in body
+    assert 'newssnap_request_seconds_bucket{endpoint="predict",mode=' in body
+    assert 'newssnap_cache_lookups_total{result="miss"}' in body
+
+
+def _wait_ready(lifespan_client, timeout=30):
+    import time
+
+    deadline = time.monotonic() + timeout
+    response = lifespan_client.get("/ready")
+    while response.status_code == 503 and time.monotonic() < deadline:
+        assert response.json()["status"] in {"loading", "warming"}
+        time.sleep(0.05)
+        response = lifespan_client.get("/ready")
+    return response
+
+
+def test_ready_turns_200_only_after_background_load_and_warmup(monkeypatch, tiny_model_dir):
+    from src.serving import api, inference
+
+    monkeypatch.setattr(api, "MODEL_DIR", tiny_model_dir)
+    monkeypatch.setattr(api, "_model_state", dict(api._model_state))
+    monkeypatch.setattr(api, "WARMUP_BATCH_SIZES", [1, 2])
+    warmed = []
+    monkeypatch.setattr(inference, "warmup", lambda artifacts, sizes: warmed.append(sizes))
+
+    with TestClient(api.app) as lifespan_client:
+        assert lifespan_client.get("/health").status_code == 200
+        response = _wait_ready(lifespan_client)
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready", "mode": "real"}
+        assert warmed == [[1, 2]]
+
+
+def test_admin_loads_candidate_routes_by_header_and_promotes(monkeypatch, tiny_model_dir):
+    from src.serving import api, inference
+
+    monkeypatch.setattr(api, "MODEL_DIR", tiny_model_dir)
+    monkeypatch.setattr(api, "_model_state", dict(api._model_state))
+    monkeypatch.setattr(inference, "warmup", lambda artifacts, sizes: None)
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "")
+    assert client.get("/admin/models").status_code == 403
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+    admin = {"X-Admin-Token": "secret"}
+
+    with TestClient(api.app) as lifespan_client:
+        assert _wait_ready(lifespan_client).status_code == 200
+        assert lifespan_client.get("/admin/models", headers={"X-Admin-Token": "wrong"}).status_code == 401
+
+        loaded = lifespan_client.post("/admin/models/candidate/load", headers=admin)
+        assert loaded.status_code == 200
+        assert loaded.json()["slot"] == "candidate"
+
+        body = {"text": "stock market rally"}
+        default = lifespan_client.post("/predict", json=body)
+        routed = lifespan_client.post("/predict", json=body, headers={"X-Model-Version": "candidate"})
+        assert default.headers["x-model-version"] == "primary"
+        assert routed.headers["x-model-version"] == "candidate"
+        assert routed.json()["mode"] == "real"
+
+        promoted = lifespan_client.post("/admin/models/promote", headers=admin)
+        assert promoted.json()["version_id"] == loaded.json()["version_id"]
+        versions = lifespan_client.get("/admin/models", headers=admin).json()["versions"]
+        assert list(versions) == ["primary"]
+        assert lifespan_client.post("/admin/models/promote", headers=admin).status_code == 409
+
+
+def test_model_dir_watcher_hot_reloads_primary(monkeypatch, tiny_model_dir, tmp_path):
+    import os
+    import shutil
+    import time
+
+    from src.serving import api, inference
+
+    model_dir = tmp_path / "latest"
+    shutil.copytree(tiny_model_dir, model_dir)
+    monkeypatch.setattr(api, "MODEL_DIR", str(model_dir))
+    monkeypatch.setattr(api, "_model_state", dict(api._model_state))
+    monkeypatch.setattr(api, "MODEL_WATCH_INTERVAL_S", 0.05)
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(inference, "warmup", lambda artifacts, sizes: None)
+    admin = {"X-Admin-Token": "secret"}
+
+    with TestClient(api.app) as lifespan_client:
+        assert _wait_ready(lifespan_client).status_code == 200
+        first = lifespan_client.get("/admin/models", headers=admin).json()["versions"]["primary"]["version_id"]
+
+        config = model_dir / "config.json"
+        os.utime(config, ns=(config.stat().st_atime_ns, config.stat().st_mtime_ns + 10**9))
+        deadline = time.monotonic() + 20
+        current = first
+        while current == first and time.monotonic() < deadline:
+            time.sleep(0.05)
+            current = lifespan_client.get("/admin/models", headers=admin).json()["versions"]["primary"]["version_id"]
+
+        assert current != first
+        assert lifespan_client.post("/predict", json={"text": "team win"}).status_code == 200
+
+
+def test_predict_returns_503_instead_of_demo_while_model_loads(monkeypatch, tiny_model_dir):
+    import threading
+
+    from src.serving import api
+
+    monkeypatch.setattr(api, "MODEL_DIR", tiny_model_dir)
+    monkeypatch.setattr(api, "_model_state", {"mode": None, "loaded_at": None, "status": "loading"})
+    release = threading.Event()
+    monkeypatch.setattr(api, "_load_model", lambda: release.wait(30) and None)
+
+    with TestClient(api.app) as lifespan_client:
+        try:
+            response = lifespan_client.post("/predict", json={"text": "stock market rally"})
+            stream = lifespan_client.post("/predict/stream", content=b'"stock market rally"')
+        finally:
+            release.set()
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(api.MODEL_NOT_READY_RETRY_AFTER_S)
+    assert stream.status_code == 503
+
+
+def test_predict_returns_503_during_warmup_and_demo_after_warmup_fails(monkeypatch, tiny_model_dir):
+    import threading
+    import time
+
+    from src.serving import api, inference
+
+    monkeypatch.setattr(api, "MODEL_DIR", tiny_model_dir)
+    monkeypatch.setattr(api, "_model_state", {"mode": None, "loaded_at": None, "status": "loading"})
+    warming, release = threading.Event(), threading.Event()
+
+    def blocked_warmup(artifacts, sizes):
+        warming.set()
+        release.wait(30)
+        raise RuntimeError("warmup failed")
+
+    monkeypatch.setattr(inference, "warmup", blocked_warmup)
+
+    with TestClient(api.app) as lifespan_client:
+        try:
+            assert warming.wait(30)
+            during = lifespan_client.post("/predict", json={"text": "stock market rally"})
+            stream = lifespan_client.post("/predict/stream", content=b'"stock market rally"')
+            ready = lifespan_client.get("/ready")
+        finally:
+            release.set()
+        deadline = time.monotonic() + 30
+        while api._model_state["status"] == "warming" and time.monotonic() < deadline:
+            time.sleep(0.05)
+        response = lifespan_client.get("/ready")
+        after = lifespan_client.post("/predict", json={"text": "stock market rally"})
+
+    assert during.status_code == 503
+    assert during.headers["retry-after"] == str(api.MODEL_NOT_READY_RETRY_AFTER_S)
+    assert stream.status_code == 503
+    assert ready.json()["status"] == "warming"
+    assert response.json()["status"] == "failed"
+    assert after.status_code == 200
+    assert after.json()["mode"] == "demo"
@@ -0,0 +1,70 @@
+"""Tests for offline batch scoring."""
+
+import json
+import sys
+
+import pytest
+
+from src.serving import batch_scoring
+
+
+def _write_jsonl(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        for idx in range(count):
+            f.write(json.dumps({"id": idx, "text": f"team win number {idx}"}) + "\n")
+
+
+def test_iter_shards_chunks_input(tmp_path):
+    input_path = tmp_path / "input.jsonl"
+    _write_jsonl(input_path, 7)
+
+    shards = list(batch_scoring.iter_shards(str(input_path), shard_size=3))
+
+    assert [shard_id for shard_id, _ in shards] == [0, 1, 2]
+    assert [len(records) for _, records in shards] == [3, 3, 1]
+
+
+def test_score_file_writes_shards_and_resumes(tiny_model_dir, tmp_path, monkeypatch):
+    input_path = tmp_path / "input.jsonl"
+    output_dir = tmp_path / "scored"
+    _write_jsonl(input_path, 5)
+
+    summary = batch_scoring.score_file(str(input_path), str(output_dir), tiny_model_dir, shard_size=2, batch_size=2)
+
+    rows = [json.loads(line) for part in sorted(output_dir.glob("part-*.jsonl")) for line in part.open()]
+    assert summary["rows"] == 5
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(tiny_model_dir)
+    texts = [f"team win number {idx}" for idx in range(5)]
+    assert summary["tokens"] == sum(len(ids) for ids in tokenizer(texts)["input_ids"])
+    assert [row["id"] for row in rows] == [0, 1, 2, 3, 4]
+    assert all("predicted_class" in row and "text" not in row for row in rows)
+
+    def fail(_task):
+        raise AssertionError("completed shards must not be rescored")
+
+    monkeypatch.setattr(batch_scoring, "_score_shard", fail)
+    resumed = batch_scoring.score_file(str(input_path), str(output_dir), tiny_model_dir, shard_size=2)
+    assert resumed["rows"] == 0
+    assert resumed["shards_completed"] == 3
+
+
+def test_onnx_workers_never_import_torch(monkeypatch):
+    from src.serving import inference
+
+    loaded = []
+    monkeypatch.setitem(sys.modules, "torch", None)
+    monkeypatch.setattr(inference, "model_fn", lambda *args, **kwargs: loaded.append(kwargs) or {"backend": "onnx"})
+
+    batch_scoring._init_worker("models/latest", None, "onnx", "text", 8, num_threads=2)
+
+    assert loaded == [{"precision": None, "backend": "onnx"}]
+    assert batch_scoring._worker_state["artifacts"] == {"backend": "onnx"}
+
+
+def test_manifest_rejects_different_job(tmp_path):
+    batch_scoring.save_manifest(tmp_path, {"input": "a.jsonl", "shard_size": 10, "completed": {}})
+
+    with pytest.raises(ValueError):
+        batch_scoring.load_manifest(tmp_path, "b.jsonl", 10)
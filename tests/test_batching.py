@@ -0,0 +1,123 @@
+"""Tests for the micro-batching scheduler."""
+
+import asyncio
+
+import pytest
+
+from src.serving.batching import MicroBatcher
+
+
+def _echo_predict(calls):
+    def predict(texts):
+        calls.append(list(texts))
+        return [{"text": text} for text in texts]
+
+    return predict
+
+
+def test_concurrent_requests_share_one_batch():
+    calls = []
+
+    async def scenario():
+        batcher = MicroBatcher(_echo_predict(calls), max_batch_size=8, max_wait_ms=20)
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit([f"t{i}"]) for i in range(5)))
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(scenario())
+
+    assert calls == [["t0", "t1", "t2", "t3", "t4"]]
+    assert [r[0]["text"] for r in results] == ["t0", "t1", "t2", "t3", "t4"]
+
+
+def test_flushes_at_max_batch_size_without_splitting_requests():
+    calls = []
+
+    async def scenario():
+        batcher = MicroBatcher(_echo_predict(calls), max_batch_size=3, max_wait_ms=20)
+        await batcher.start()
+        try:
+            return await asyncio.gather(
+                batcher.submit(["a", "b"]),
+                batcher.submit(["c", "d"]),
+                batcher.submit(["e"]),
+            )
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(scenario())
+
+    assert all(len(call) <= 3 for call in calls)
+    assert [[item["text"] for item in r] for r in results] == [["a", "b"], ["c", "d"], ["e"]]
+
+
+def test_errors_fan_out_to_every_caller():
+    def failing(_texts):
+        raise RuntimeError("boom")
+
+    async def scenario():
+        batcher = MicroBatcher(failing, max_batch_size=4, max_wait_ms=5)
+        await batcher.start()
+        try:
+            return await asyncio.gather(
+                batcher.submit(["a"]), batcher.submit(["b"]), return_exceptions=True
+            )
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_submit_requires_running_batcher():
+    batcher = MicroBatcher(_echo_predict([]))
+    with pytest.raises(RuntimeError):
+        asyncio.run(batcher.submit(["a"]))
+
+
+def test_drain_answers_collecting_and_queued_requests_before_stopping():
+    calls = []
+
+    async def scenario():
+        batcher = MicroBatcher(_echo_predict(calls), max_batch_size=2, max_wait_ms=50)
+        await batcher.start()
+        pending = [asyncio.ensure_future(batcher.submit([f"t{i}"])) for i in range(3)]
+        await asyncio.sleep(0)
+        await batcher.drain()
+        return batcher.running, await asyncio.gather(*pending)
+
+    running, results = asyncio.run(scenario())
+
+    assert not running
+    assert [r[0]["text"] for r in results] == ["t0", "t1", "t2"]
+    assert calls == [["t0", "t1"], ["t2"]]
+
+
+def test_concurrency_runs_batches_side_by_side():
+    import threading
+
+    from src.serving.executor import InferenceExecutor
+
+    gate = threading.Barrier(2, timeout=5)
+
+    def predict(texts):
+        # Only returns once two batches are running at the same time.
+        gate.wait()
+        return [{"text": text} for text in texts]
+
+    async def scenario():
+        executor = InferenceExecutor(max_workers=2, max_queue_size=8)
+        batcher = MicroBatcher(predict, max_batch_size=1, max_wait_ms=1, executor=executor, concurrency=2)
+        await batcher.start()
+        try:
+            return await asyncio.gather(batcher.submit(["a"]), batcher.submit(["b"]))
+        finally:
+            await batcher.drain()
+            executor.shutdown()
+
+    results = asyncio.run(scenario())
+
+    assert [r[0]["text"] for r in results] == ["a", "b"]
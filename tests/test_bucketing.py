@@ -0,0 +1,23 @@
+"""Tests for the length bucketing helpers."""
+
+from src.utils.bucketing import length_buckets, normalize_boundaries, pad_bucket
+
+
+class TestLengthBuckets:
+    def test_groups_by_boundary_and_covers_every_index(self):
+        lengths = [40, 5, 120, 31, 64, 70]
+        buckets = length_buckets(lengths, [32, 64, 128])
+
+        assert buckets == [[1, 3], [0, 4], [5, 2]]
+        assert sorted(idx for bucket in buckets for idx in bucket) == list(range(len(lengths)))
+
+    def test_normalize_boundaries_always_ends_at_max_length(self):
+        assert normalize_boundaries([256, 16, 64, 16], 128) == [16, 64, 128]
+        assert normalize_boundaries(None, 128) == [32, 64, 128]
+
+    def test_pad_bucket_pads_to_longest_in_bucket(self):
+        encodings = {"input_ids": [[101, 7, 102], [101, 102], [101, 5, 6, 7, 102]]}
+        padded = pad_bucket(encodings, [0, 1], pad_token_id=0)
+
+        assert padded["input_ids"] == [[101, 7, 102], [101, 102, 0]]
+        assert padded["attention_mask"] == [[1, 1, 1], [1, 1, 0]]
@@ -0,0 +1,119 @@
+"""Tests for the LRU + TTL prediction cache."""
+
+import asyncio
+
+from src.serving.cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_after_put_and_model_identity_isolates_entries():
+    cache = PredictionCache(max_size=4, ttl_seconds=60)
+    cache.put("model-a", "Stocks rally", {"label": "Business"})
+
+    assert cache.get("model-a", "Stocks rally") == {"label": "Business"}
+    assert cache.get("model-b", "Stocks rally") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_evicts_least_recently_used_entry():
+    cache = PredictionCache(max_size=2, ttl_seconds=60)
+    cache.put("m", "a", {"label": "A"})
+    cache.put("m", "b", {"label": "B"})
+    cache.get("m", "a")
+    cache.put("m", "c", {"label": "C"})
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_misses():
+    clock = FakeClock()
+    cache = PredictionCache(max_size=4, ttl_seconds=10, clock=clock)
+    cache.put("m", "a", {"label": "A"})
+    clock.now = 11
+
+    assert cache.get("m", "a") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_zero_size_disables_cache():
+    cache = PredictionCache(max_size=0)
+    cache.put("m", "a", {"label": "A"})
+
+    assert cache.get("m", "a") is None
+    assert cache.stats()["misses"] == 0
+
+
+def test_api_runs_model_only_on_unique_misses(monkeypatch):
+    from src.serving import api
+
+    calls = []
+
+    def fake_demo(texts):
+        calls.append(list(texts))
+        return [{"text": text, "label": "World", "latency_ms": 5.0} for text in texts]
+
+    monkeypatch.setattr(api, "_prediction_cache", PredictionCache(max_size=8, ttl_seconds=60))
+    monkeypatch.setattr(api, "_demo_predict", fake_demo)
+
+    asyncio.run(api._cached_predict(["a", "b"], "demo"))
+    results = asyncio.run(api._cached_predict(["b", "c", "c", "a"], "demo"))
+
+    assert calls == [["a", "b"], ["c"]]
+    assert [r["text"] for r in results] == ["b", "c", "c", "a"]
+    assert results[0]["latency_ms"] == 0.0
+
+
+def test_json_file_cache_reparses_only_when_file_changes(tmp_path):
+    import os
+
+    from src.serving.cache import JSONFileCache, etag_matches
+
+    path = tmp_path / "evaluation_results.json"
+    path.write_text('{"accuracy": 0.9}', encoding="utf-8")
+    cache = JSONFileCache()
+
+    body, etag = cache.get(path)
+    assert body == b'{"accuracy":0.9}'
+    assert cache.get(path) == (body, etag)
+    assert cache.reloads == 1
+
+    path.write_text('{"accuracy": 0.95}', encoding="utf-8")
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+    new_body, new_etag = cache.get(path)
+    assert new_body == b'{"accuracy":0.95}'
+    assert new_etag != etag
+    assert cache.reloads == 2
+
+    assert etag_matches(f'"other", W/{new_etag}', new_etag)
+    assert etag_matches("*", new_etag)
+    assert not etag_matches(etag, new_etag)
+
+
+def test_metrics_endpoint_answers_if_none_match_with_304(monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+
+    from src.serving import api
+
+    (tmp_path / "training_history.json").write_text('[{"epoch": 1}]', encoding="utf-8")
+    monkeypatch.setattr(api, "METRICS_DIR", tmp_path)
+    client = TestClient(api.app)
+
+    first = client.get("/metrics/latest_metrics.json")
+    assert first.status_code == 200
+    assert first.json() == {"metrics": [{"epoch": 1}]}
+
+    second = client.get("/metrics/latest_metrics.json", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 304
+    assert second.headers["etag"] == first.headers["etag"]
+    assert client.get("/metrics/latest_evaluation.json").status_code == 404
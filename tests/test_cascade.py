@@ -0,0 +1,170 @@
+"""Tests for the confidence-gated cascade first stage."""
+
+import asyncio
+import json
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.serving.cascade import (
+    LinearTextClassifier,
+    cascade_tradeoff,
+    fit_temperature,
+    load_first_stage,
+    split_by_confidence,
+    train_first_stage,
+)
+
+LABELS = ["World", "Sports", "Business", "Sci/Tech"]
+_TOPIC_WORDS = [
+    "government president election treaty minister border summit".split(),
+    "team coach match league cup player season".split(),
+    "stock market shares profit earnings bank investors".split(),
+    "software chip nasa satellite research internet robot".split(),
+]
+_SHARED_WORDS = "the a of in on after new said report week".split()
+
+
+def _corpus(count: int, seed: int = 0) -> tuple:
+    rng = random.Random(seed)
+    texts, labels = [], []
+    for _ in range(count):
+        label = rng.randrange(4)
+        words = rng.sample(_TOPIC_WORDS[label], 2) + rng.sample(_TOPIC_WORDS[rng.randrange(4)], 1)
+        words += rng.sample(_SHARED_WORDS, 4)
+        rng.shuffle(words)
+        texts.append(" ".join(words).capitalize())
+        labels.append(label)
+    return texts, labels
+
+
+@pytest.fixture(scope="module")
+def trained():
+    pytest.importorskip("sklearn")
+    texts, labels = _corpus(400)
+    val_texts, val_labels = _corpus(200, seed=1)
+    return train_first_stage(texts, labels, val_texts, val_labels, LABELS, min_df=1)
+
+
+def test_scores_match_sklearn_on_same_features():
+    pytest.importorskip("sklearn")
+    from sklearn.feature_extraction.text import CountVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    from src.serving.cascade import _terms
+
+    texts, labels = _corpus(200)
+    vectorizer = CountVectorizer(tokenizer=_terms, lowercase=False, token_pattern=None, binary=True)
+    model = LogisticRegression(max_iter=1000).fit(vectorizer.fit_transform(texts), labels)
+    classifier = LinearTextClassifier(vectorizer.get_feature_names_out(), model.coef_.T, model.intercept_, LABELS)
+
+    test_texts, _ = _corpus(20, seed=3)
+    test_texts.append("Team team TEAM, coach!")
+    np.testing.assert_allclose(
+        classifier.logits(test_texts), model.decision_function(vectorizer.transform(test_texts)), rtol=1e-4, atol=1e-4
+    )
+
+
+def test_texts_without_known_terms_score_the_bias():
+    classifier = LinearTextClassifier(["team"], np.ones((1, 4)), np.arange(4), LABELS)
+
+    logits = classifier.logits(["", "zzz qqq", "team"])
+
+    np.testing.assert_allclose(logits, [[0, 1, 2, 3], [0, 1, 2, 3], [1, 2, 3, 4]])
+
+
+def test_training_calibrates_and_round_trips(trained, tmp_path):
+    classifier, metrics = trained
+    assert metrics["val_accuracy"] > 0.8
+    assert metrics["val_ece"] <= metrics["val_ece_uncalibrated"] + 1e-6
+
+    classifier.save(tmp_path / "first_stage.npz")
+    loaded = load_first_stage(str(tmp_path))
+
+    texts, _ = _corpus(10, seed=2)
+    np.testing.assert_allclose(loaded.predict_proba(texts), classifier.predict_proba(texts), rtol=1e-6)
+    assert loaded.labels == LABELS
+    assert loaded.temperature == pytest.approx(classifier.temperature)
+    assert load_first_stage(str(tmp_path / "missing")) is None
+
+
+@pytest.mark.parametrize(
+    "id2label, usable",
+    [
+        (dict(enumerate(LABELS)), True),
+        ({i: f"LABEL_{i}" for i in range(4)}, True),
+        (dict(enumerate(["Sports", "World", "Business", "Sci/Tech"])), False),
+        ({i: f"LABEL_{i}" for i in range(2)}, False),
+    ],
+)
+def test_first_stage_labels_must_match_model_config(tmp_path, id2label, usable):
+    LinearTextClassifier(["team"], np.ones((1, 4)), np.zeros(4), LABELS).save(tmp_path / "first_stage.npz")
+    config = {"num_labels": len(id2label), "id2label": {str(i): name for i, name in id2label.items()}}
+    (tmp_path / "config.json").write_text(json.dumps(config))
+
+    assert (load_first_stage(str(tmp_path)) is not None) is usable
+
+
+def test_fit_temperature_undoes_overconfidence():
+    rng = np.random.default_rng(0)
+    true_logits = rng.normal(size=(4000, 4)) * 2
+    probs = np.exp(true_logits) / np.exp(true_logits).sum(axis=1, keepdims=True)
+    labels = np.array([rng.choice(4, p=row) for row in probs])
+
+    assert fit_temperature(true_logits * 3, labels) == pytest.approx(3, rel=0.1)
+
+
+def test_split_by_confidence_and_tradeoff():
+    first = np.array([[0.97, 0.01, 0.01, 0.01], [0.6, 0.4, 0, 0], [0.1, 0.9, 0, 0], [0, 0, 0.5, 0.5]])
+    model = np.array([[0.9, 0.1, 0, 0], [0.2, 0.8, 0, 0], [0.1, 0.9, 0, 0], [0, 0, 0.1, 0.9]])
+    labels = [1, 1, 1, 3]
+
+    confident, unsure = split_by_confidence(first, 0.9)
+    assert confident.tolist() == [0, 2] and unsure.tolist() == [1, 3]
+
+    strict, loose = cascade_tradeoff(first, model, labels, [0.99, 0.9])
+    assert strict == {
+        "threshold": 0.99, "skip_fraction": 0.0, "first_stage_accuracy": None,
+        "cascade_accuracy": 0.75, "model_accuracy": 0.75, "accuracy_loss": 0.0,
+    }
+    assert loose["skip_fraction"] == 0.5
+    assert loose["first_stage_accuracy"] == 0.5
+    assert loose["cascade_accuracy"] == 0.75
+
+
+def test_api_sends_only_unsure_texts_to_the_model(monkeypatch):
+    from src.serving import api
+
+    classifier = LinearTextClassifier(["team", "stock"], [[5, 0, 0, 0], [0, 0, 0.5, 0]], np.zeros(4), LABELS)
+    submitted = []
+
+    async def submit(texts):
+        submitted.append(texts)
+        return [{"text": text, "label": "Business", "confidence": 0.7, "model": "m"} for text in texts]
+
+    version = SimpleNamespace(artifacts={"first_stage": classifier}, batcher=SimpleNamespace(running=True, submit=submit))
+    monkeypatch.setattr(api, "CASCADE_THRESHOLD", 0.9)
+
+    results = asyncio.run(api._run_predictions(["team wins", "stock dips", "team"], "real", version))
+
+    assert submitted == [["stock dips"]]
+    assert [r["stage"] for r in results] == ["first", "second", "first"]
+    assert [r["label"] for r in results] == ["World", "Business", "World"]
+    assert results[0]["model"] == "cascade-linear"
+    assert set(results[0]["probabilities"]) == set(LABELS)
+
+
+def test_api_skips_cascade_when_disabled(monkeypatch):
+    from src.serving import api
+
+    classifier = LinearTextClassifier(["team"], [[5, 0, 0, 0]], np.zeros(4), LABELS)
+
+    async def submit(texts):
+        return [{"text": text} for text in texts]
+
+    version = SimpleNamespace(artifacts={"first_stage": classifier}, batcher=SimpleNamespace(running=True, submit=submit))
+    monkeypatch.setattr(api, "CASCADE_THRESHOLD", 0.0)
+
+    assert asyncio.run(api._run_predictions(["team"], "real", version)) == [{"text": "team"}]
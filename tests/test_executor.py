@@ -0,0 +1,95 @@
+"""Tests for the bounded inference executor."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.serving.batching import MicroBatcher
+from src.serving.executor import InferenceExecutor, QueueFullError
+
+
+def test_blocking_call_does_not_stall_event_loop():
+    executor = InferenceExecutor(max_workers=1, max_queue_size=4)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        result, _ = await asyncio.gather(executor.submit(time.sleep, 0.1), ticker())
+        return result
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < 0.1
+
+
+def test_rejects_when_queue_is_full():
+    executor = InferenceExecutor(max_workers=1, max_queue_size=1, retry_after_s=2)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.submit(release.wait))
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(QueueFullError) as exc_info:
+                await executor.submit(lambda: None)
+        finally:
+            release.set()
+        await first
+        return exc_info.value
+
+    try:
+        error = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert error.retry_after == 2
+    assert executor.pending == 0
+
+
+def test_batcher_runs_batches_on_executor_thread():
+    executor = InferenceExecutor(max_workers=1, max_queue_size=4)
+    threads = []
+
+    def predict(texts):
+        threads.append(threading.current_thread().name)
+        return [{"text": text} for text in texts]
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_size=4, max_wait_ms=5, executor=executor)
+        await batcher.start()
+        try:
+            return await asyncio.gather(batcher.submit(["a"]), batcher.submit(["b"]))
+        finally:
+            await batcher.stop()
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert [r[0]["text"] for r in results] == ["a", "b"]
+    assert threads and all(name.startswith("inference") for name in threads)
+
+
+def test_batcher_rejects_when_queue_is_full():
+    async def scenario():
+        batcher = MicroBatcher(lambda texts: texts, max_batch_size=1, max_queue_size=1)
+        await batcher.start()
+        try:
+            batcher._queue.put_nowait((["x"], asyncio.get_running_loop().create_future(), 0.0))
+            with pytest.raises(QueueFullError):
+                await batcher.submit(["y"])
+        finally:
+            await batcher.stop()
+
+    asyncio.run(scenario())
@@ -38,6 +38,139 @@ class TestOutputFn:
         result = output_fn(prediction)
         assert json.loads(result) == prediction
 
+    def test_json_output_is_compact_and_encodes_numpy(self):
+        import numpy as np
+
+        result = output_fn([{"label": np.int64(2), "probs": np.array([0.25, 0.75], dtype=np.float32)}])
+        assert "\n" not in result
+        assert json.loads(result) == [{"label": 2, "probs": [0.25, 0.75]}]
+
     def test_unsupported_type_raises(self):
         with pytest.raises(ValueError):
             output_fn([], "text/xml")
+
+
+class TestPredictFn:
+    TEXTS = [
+        "stock market",
+        "the government and the nasa launch team win the stock market in a race to the end",
+        "team win",
+    ]
+
+    def test_bucketed_padding_matches_max_length(self, tiny_model_dir, monkeypatch):
+        from src.serving import inference
+
+        artifacts = inference.model_fn(tiny_model_dir)
+        bucketed = inference.predict_fn({"texts": self.TEXTS}, artifacts)
+        monkeypatch.setattr(inference, "PADDING_MODE", "max_length")
+        padded = inference.predict_fn({"texts": self.TEXTS}, artifacts)
+
+        assert [r["text"] for r in bucketed] == self.TEXTS
+        for fast, slow in zip(bucketed, padded):
+            assert fast["predicted_label"] == slow["predicted_label"]
+            for label, prob in fast["probabilities"].items():
+                assert prob == pytest.approx(slow["probabilities"][label], abs=1e-3)
+
+    @pytest.mark.parametrize("precision", ["int8", "bf16"])
+    def test_reduced_precision_tracks_fp32(self, tiny_model_dir, precision):
+        from src.serving import inference
+
+        reference = inference.predict_fn({"texts": self.TEXTS}, inference.model_fn(tiny_model_dir, precision="fp32"))
+        artifacts = inference.model_fn(tiny_model_dir, precision=precision)
+        reduced = inference.predict_fn({"texts": self.TEXTS}, artifacts)
+
+        assert artifacts["precision"] in {precision, "fp32"}
+        for fast, slow in zip(reduced, reference):
+            for label, prob in fast["probabilities"].items():
+                assert prob == pytest.approx(slow["probabilities"][label], abs=0.05)
+
+    def test_unknown_precision_raises(self, tiny_model_dir):
+        from src.serving import inference
+
+        with pytest.raises(ValueError):
+            inference.model_fn(tiny_model_dir, precision="fp8")
+
+    def test_onnx_backend_matches_pytorch(self, tiny_model_dir, tmp_path):
+        pytest.importorskip("onnx")
+        pytest.importorskip("onnxruntime")
+        import shutil
+
+        from src.serving import inference
+        from src.serving.onnx_backend import export_onnx
+
+        model_dir = tmp_path / "model"
+        shutil.copytree(tiny_model_dir, model_dir)
+        export_onnx(str(model_dir))
+
+        reference = inference.predict_fn({"texts": self.TEXTS}, inference.model_fn(str(model_dir), backend="pytorch"))
+        artifacts = inference.model_fn(str(model_dir), backend="onnx")
+        exported = inference.predict_fn({"texts": self.TEXTS}, artifacts)
+
+        assert artifacts["backend"] == "onnx"
+        for ort_result, torch_result in zip(exported, reference):
+            assert ort_result["predicted_label"] == torch_result["predicted_label"]
+            for label, prob in ort_result["probabilities"].items():
+                assert prob == pytest.approx(torch_result["probabilities"][label], abs=1e-3)
+
+    def test_onnx_backend_requires_exported_graph(self, tiny_model_dir):
+        from src.serving import inference
+
+        with pytest.raises(FileNotFoundError):
+            inference.model_fn(tiny_model_dir, backend="onnx")
+
+    def test_columnar_output_matches_rows(self, tiny_model_dir):
+        from src.serving import inference
+
+        artifacts = inference.model_fn(tiny_model_dir)
+        columns = inference.predict_columnar({"texts": self.TEXTS}, artifacts)
+        rows = inference.predict_fn({"texts": self.TEXTS}, artifacts)
+
+        assert columns["probabilities"].shape == (len(self.TEXTS), 4)
+        assert columns["labels"].tolist() == [row["predicted_label"] for row in rows]
+        assert columns["classes"] == [row["predicted_class"] for row in rows]
+        assert all(isinstance(row["confidence"], float) for row in rows)
+        assert columns["confidences"].tolist() == pytest.approx([row["confidence"] for row in rows], abs=1e-4)
+
+    def test_rows_are_rounded_to_four_decimals(self, tiny_model_dir):
+        from src.serving import inference
+
+        artifacts = inference.model_fn(tiny_model_dir)
+        columns = inference.predict_columnar({"texts": self.TEXTS}, artifacts)
+        rows = inference.predict_fn({"texts": self.TEXTS}, artifacts)
+
+        for row, confidence, probs in zip(rows, columns["confidences"], columns["probabilities"]):
+            assert row["confidence"] == round(confidence.item(), 4)
+            assert list(row["probabilities"].values()) == [round(p.item(), 4) for p in probs]
+            assert all(len(repr(p).split(".")[1]) <= 4 for p in row["probabilities"].values())
+
+    def test_postprocess_is_observed_once_per_batch(self, tiny_model_dir):
+        from src.serving import inference
+
+        artifacts = inference.model_fn(tiny_model_dir)
+        before = sum(inference._POSTPROCESS.counts)
+
+        inference.predict_fn({"texts": self.TEXTS}, artifacts)
+        assert sum(inference._POSTPROCESS.counts) == before + 1
+        inference.predict_columnar({"texts": self.TEXTS}, artifacts)
+        assert sum(inference._POSTPROCESS.counts) == before + 2
+
+
+class TestWarmup:
+    def test_warmup_covers_every_bucket_and_batch_size(self, tiny_model_dir, monkeypatch):
+        from src.serving import inference
+        from src.serving.inference import model_fn, warmup
+
+        artifacts = model_fn(tiny_model_dir)
+        seen = []
+        original = inference._forward_probs
+
+        def recording(texts, model_artifacts):
+            encodings = model_artifacts["tokenizer"](texts, truncation=True, max_length=inference.MAX_SEQ_LENGTH)
+            seen.append((len(texts), len(encodings["input_ids"][0])))
+            return original(texts, model_artifacts)
+
+        monkeypatch.setattr(inference, "_forward_probs", recording)
+        elapsed = warmup(artifacts, batch_sizes=(1, 4), seq_lengths=(16, 64))
+
+        assert elapsed >= 0
+        assert seen == [(1, 16), (4, 16), (1, 64), (4, 64)]
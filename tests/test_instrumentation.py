@@ -0,0 +1,50 @@
+"""Metric primitive and Prometheus rendering tests."""
+
+import pytest
+
+from src.utils.instrumentation import Registry
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    registry = Registry()
+    hist = registry.histogram("demo_seconds", "Demo latency.", labelnames=("stage",), buckets=(0.1, 1.0))
+    child = hist.labels("forward")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        child.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert lines[:2] == ["# HELP demo_seconds Demo latency.", "# TYPE demo_seconds histogram"]
+    assert 'demo_seconds_bucket{stage="forward",le="0.1"} 2' in lines
+    assert 'demo_seconds_bucket{stage="forward",le="1"} 3' in lines
+    assert 'demo_seconds_bucket{stage="forward",le="+Inf"} 4' in lines
+    assert 'demo_seconds_sum{stage="forward"} 3.65' in lines
+    assert 'demo_seconds_count{stage="forward"} 4' in lines
+
+
+def test_counter_gauge_and_timer():
+    registry = Registry()
+    counter = registry.counter("demo_total", "Things counted.")
+    gauge = registry.gauge("demo_mode", "Active mode.", labelnames=("mode",))
+    hist = registry.histogram("demo_block_seconds", "Block time.")
+
+    counter.inc()
+    counter.inc(2)
+    gauge.labels("real").set(1)
+    with hist.time():
+        pass
+
+    body = registry.render()
+    assert "demo_total 3" in body
+    assert 'demo_mode{mode="real"} 1' in body
+    assert "demo_block_seconds_count 1" in body
+
+
+def test_registry_rejects_duplicates_and_label_mismatch():
+    registry = Registry()
+    hist = registry.histogram("demo_seconds", "Demo.", labelnames=("stage",))
+
+    with pytest.raises(ValueError):
+        registry.counter("demo_seconds", "Again.")
+    with pytest.raises(ValueError):
+        hist.labels("a", "b")
@@ -0,0 +1,124 @@
+"""Tests for memory-mapped safetensors loading."""
+
+import json
+import shutil
+import sys
+import threading
+
+import pytest
+
+from src.serving.mmap_weights import (
+    SAFETENSORS_FILENAME,
+    convert_to_safetensors,
+    load_mmap_model,
+    read_header,
+    safetensors_files,
+)
+
+
+def _logits(model, torch):
+    input_ids = torch.tensor([[2, 5, 6, 7, 3], [2, 9, 3, 0, 0]])
+    attention_mask = (input_ids != 0).long()
+    with torch.inference_mode():
+        return model(input_ids=input_ids, attention_mask=attention_mask).logits.float()
+
+
+def test_mmap_model_matches_from_pretrained(tiny_model_dir):
+    torch = pytest.importorskip("torch")
+    from transformers import AutoModelForSequenceClassification
+
+    reference = AutoModelForSequenceClassification.from_pretrained(tiny_model_dir).eval()
+    mapped = load_mmap_model(tiny_model_dir)
+
+    assert not mapped.training
+    torch.testing.assert_close(_logits(mapped, torch), _logits(reference, torch))
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc/self/smaps")
+def test_parameters_are_backed_by_the_file_mapping(tiny_model_dir):
+    torch = pytest.importorskip("torch")
+
+    model = load_mmap_model(tiny_model_dir)
+    _logits(model, torch)
+
+    weights = str(safetensors_files(tiny_model_dir)[0])
+    with open("/proc/self/smaps") as f:
+        assert weights in f.read()
+    header, data_start = read_header(safetensors_files(tiny_model_dir)[0])
+    assert data_start > 8
+    assert "distilbert.embeddings.word_embeddings.weight" in header
+
+
+def test_convert_bin_checkpoint_to_bf16_safetensors(tiny_model_dir, tmp_path):
+    torch = pytest.importorskip("torch")
+    from transformers import AutoModelForSequenceClassification
+
+    legacy = tmp_path / "legacy"
+    shutil.copytree(tiny_model_dir, legacy)
+    model = AutoModelForSequenceClassification.from_pretrained(tiny_model_dir)
+    torch.save(model.state_dict(), legacy / "pytorch_model.bin")
+    (legacy / SAFETENSORS_FILENAME).unlink()
+
+    output = tmp_path / "converted"
+    path = convert_to_safetensors(str(legacy), str(output), dtype="bf16")
+
+    assert path == output / SAFETENSORS_FILENAME
+    assert (output / "tokenizer.json").exists()
+    assert not (output / "pytorch_model.bin").exists()
+    header, _ = read_header(path)
+    assert {info["dtype"] for info in header.values()} == {"BF16"}
+
+    mapped = load_mmap_model(str(output))
+    assert next(mapped.parameters()).dtype == torch.bfloat16
+    torch.testing.assert_close(_logits(mapped, torch), _logits(model.eval(), torch), atol=0.05, rtol=0.05)
+
+
+def test_missing_weights_are_rejected(tiny_model_dir, tmp_path):
+    pytest.importorskip("torch")
+    from safetensors.torch import load_file, save_file
+
+    model_dir = tmp_path / "partial"
+    shutil.copytree(tiny_model_dir, model_dir)
+    weights = load_file(str(model_dir / SAFETENSORS_FILENAME))
+    weights.pop("classifier.weight")
+    save_file(weights, str(model_dir / SAFETENSORS_FILENAME))
+
+    with pytest.raises(ValueError, match="classifier.weight"):
+        load_mmap_model(str(model_dir))
+
+
+def test_meta_parameters_stay_in_the_loading_thread():
+    torch = pytest.importorskip("torch")
+    from src.serving.mmap_weights import _parameters_on_meta
+
+    original = torch.nn.Module.register_parameter
+    entered, built = threading.Event(), threading.Event()
+    inside = {}
+
+    def load():
+        with _parameters_on_meta():
+            inside["loader"] = torch.nn.Linear(2, 2)
+            entered.set()
+            built.wait(5)
+
+    loader = threading.Thread(target=load)
+    loader.start()
+    entered.wait(5)
+    elsewhere = torch.nn.Linear(2, 2)
+    built.set()
+    loader.join(5)
+
+    assert inside["loader"].weight.is_meta
+    assert not elsewhere.weight.is_meta
+    assert torch.nn.Module.register_parameter is original
+
+
+def test_index_file_lists_every_shard(tmp_path):
+    (tmp_path / "model.safetensors.index.json").write_text(
+        json.dumps({"weight_map": {"a": "model-00002-of-00002.safetensors", "b": "model-00001-of-00002.safetensors"}})
+    )
+    assert [path.name for path in safetensors_files(str(tmp_path))] == [
+        "model-00001-of-00002.safetensors",
+        "model-00002-of-00002.safetensors",
+    ]
+    assert safetensors_files(str(tmp_path / "missing")) == []
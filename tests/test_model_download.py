@@ -0,0 +1,116 @@
+"""S3 model download tests against a moto S3 stand-in."""
+
+import hashlib
+import io
+import os
+
+import pytest
+
+from src.serving.model_download import (
+    MB,
+    RemoteArtifact,
+    etag_matches_file,
+    sync_model_from_s3,
+)
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+TransferConfig = pytest.importorskip("boto3.s3.transfer").TransferConfig
+
+BUCKET = "models"
+PREFIX = "public/models/latest"
+
+
+@pytest.fixture
+def s3():
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def _put(s3, rel, body):
+    s3.put_object(Bucket=BUCKET, Key=f"{PREFIX}/{rel}", Body=body)
+
+
+def test_sync_downloads_verifies_and_reuses_cache(s3, tmp_path):
+    _put(s3, "config.json", b'{"num_labels": 4}')
+    _put(s3, "tokenizer/vocab.txt", b"[PAD]\n[UNK]\n")
+    s3.upload_fileobj(
+        io.BytesIO(bytes(range(256)) * (24 * 1024)),
+        BUCKET,
+        f"{PREFIX}/model.safetensors",
+        Config=TransferConfig(multipart_threshold=5 * MB, multipart_chunksize=5 * MB),
+    )
+    s3.put_object(Bucket=BUCKET, Key=f"{PREFIX}-other/config.json", Body=b"{}")
+    model_dir = tmp_path / "latest"
+    cache_dir = tmp_path / "cache"
+
+    first = sync_model_from_s3(
+        BUCKET, PREFIX, str(model_dir), str(cache_dir), s3=s3, multipart_threshold=5 * MB, multipart_chunksize=5 * MB
+    )
+    etag = s3.head_object(Bucket=BUCKET, Key=f"{PREFIX}/model.safetensors")["ETag"]
+    assert etag.endswith('-2"')
+    assert first["files"] == 3 and first["downloaded"] == 3 and first["cached"] == 0
+    assert (model_dir / "config.json").read_bytes() == b'{"num_labels": 4}'
+    assert (model_dir / "tokenizer" / "vocab.txt").read_bytes() == b"[PAD]\n[UNK]\n"
+    assert (model_dir / "model.safetensors").stat().st_size == 6 * MB
+
+    _put(s3, "config.json", b'{"num_labels": 5}')
+    second = sync_model_from_s3(BUCKET, PREFIX, str(model_dir), str(cache_dir), s3=s3)
+    assert second["downloaded"] == 1 and second["cached"] == 2
+    assert (model_dir / "config.json").read_bytes() == b'{"num_labels": 5}'
+    assert model_dir.is_symlink()
+    versions = sorted(p.name for p in tmp_path.iterdir() if p.name.startswith("."))
+    assert len(versions) == 2 and all(name.startswith(".latest.v-") for name in versions)
+
+
+def test_sync_keeps_local_files_but_drops_removed_artifacts(s3, tmp_path):
+    model_dir = tmp_path / "latest"
+    model_dir.mkdir()
+    (model_dir / "evaluation_results.json").write_text('{"accuracy": 0.9}')
+    (model_dir / "config.json").write_text("{}")
+    _put(s3, "config.json", b'{"num_labels": 4}')
+    _put(s3, "old_weights.bin", b"old")
+
+    sync_model_from_s3(BUCKET, PREFIX, str(model_dir), str(tmp_path / "cache"), s3=s3)
+    assert (model_dir / "evaluation_results.json").read_text() == '{"accuracy": 0.9}'
+    assert (model_dir / "config.json").read_bytes() == b'{"num_labels": 4}'
+    assert (model_dir / "old_weights.bin").exists()
+
+    s3.delete_object(Bucket=BUCKET, Key=f"{PREFIX}/old_weights.bin")
+    sync_model_from_s3(BUCKET, PREFIX, str(model_dir), str(tmp_path / "cache"), s3=s3)
+    assert (model_dir / "evaluation_results.json").read_text() == '{"accuracy": 0.9}'
+    assert not (model_dir / "old_weights.bin").exists()
+
+
+def test_swap_keeps_current_and_previous_versions_only(tmp_path):
+    from src.serving.model_download import _swap_into_place
+
+    model_dir = tmp_path / "latest"
+    model_dir.mkdir()
+    (model_dir / "config.json").write_text("0")
+    targets = []
+    for idx in range(1, 4):
+        staging = tmp_path / f".latest.staging-{idx}"
+        staging.mkdir()
+        (staging / "config.json").write_text(str(idx))
+        _swap_into_place(staging, model_dir)
+        targets.append(os.readlink(model_dir))
+
+        assert (model_dir / "config.json").read_text() == str(idx)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(["latest", *targets[-2:]])
+
+
+def test_etag_verification_covers_single_and_multipart(tmp_path):
+    path = tmp_path / "blob"
+    data = bytes(range(256)) * 4096 * 3
+    path.write_bytes(data)
+    part = len(data) // 2
+    multipart = hashlib.md5(hashlib.md5(data[:part]).digest() + hashlib.md5(data[part:]).digest()).hexdigest()
+
+    assert etag_matches_file(path, RemoteArtifact("k", "blob", len(data), hashlib.md5(data).hexdigest()), [])
+    assert etag_matches_file(path, RemoteArtifact("k", "blob", len(data), f"{multipart}-2"), [MB, part])
+    assert not etag_matches_file(path, RemoteArtifact("k", "blob", len(data), f"{multipart}-2"), [MB])
+    assert not etag_matches_file(path, RemoteArtifact("k", "blob", len(data) + 1, hashlib.md5(data).hexdigest()), [])
@@ -0,0 +1,147 @@
+"""Hot-swap, draining and routing tests for the model registry."""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.serving.batching import MicroBatcher
+from src.serving.executor import InferenceExecutor
+from src.serving.model_registry import CANDIDATE, PRIMARY, ModelRegistry, directory_signature
+
+
+def _registry(executor, gate=None, warmed=None, released=None):
+    def load(model_dir):
+        return {"name": model_dir, "backend": "fake", "precision": "fp32"}
+
+    def warm(artifacts):
+        if warmed is not None:
+            warmed.append(artifacts["name"])
+
+    def make_batcher(artifacts):
+        def predict(texts):
+            if gate is not None and artifacts["name"] == "v1":
+                gate.wait(5)
+            return [{"model": artifacts["name"], "text": text} for text in texts]
+
+        return MicroBatcher(predict, max_batch_size=8, max_wait_ms=1, executor=executor)
+
+    release = released.append if released is not None else None
+    return ModelRegistry(load, warm, make_batcher, release_artifacts=release)
+
+
+def test_swap_lets_in_flight_batches_finish_on_the_old_version():
+    executor = InferenceExecutor(max_workers=1, max_queue_size=8)
+    gate = threading.Event()
+    warmed = []
+
+    async def scenario():
+        registry = _registry(executor, gate, warmed)
+        v1 = await registry.load(PRIMARY, "v1")
+        in_flight = asyncio.ensure_future(v1.batcher.submit(["old"]))
+        await asyncio.sleep(0.05)
+
+        swap = asyncio.ensure_future(registry.load(PRIMARY, "v2"))
+        while registry.resolve().model_dir != "v2":
+            await asyncio.sleep(0.01)
+        assert not swap.done()
+
+        fresh = asyncio.ensure_future(registry.resolve().batcher.submit(["new"]))
+        gate.set()
+        old, fresh = await asyncio.gather(in_flight, fresh)
+        await swap
+        running = v1.batcher.running
+        await registry.close()
+        return old, fresh, running
+
+    try:
+        old, fresh, v1_running = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert old == [{"model": "v1", "text": "old"}]
+    assert fresh == [{"model": "v2", "text": "new"}]
+    assert not v1_running
+    assert warmed == ["v1", "v2"]
+
+
+def test_candidate_routing_promote_and_unload():
+    async def scenario():
+        registry = _registry(None)
+        await registry.load(PRIMARY, "stable")
+        assert registry.resolve("candidate").model_dir == "stable"
+
+        await registry.load(CANDIDATE, "next")
+        routed = (registry.resolve(None).model_dir, registry.resolve("Candidate").model_dir)
+
+        promoted = await registry.promote()
+        after_promote = (promoted.slot, registry.resolve().model_dir, registry.get(CANDIDATE))
+        with pytest.raises(LookupError):
+            await registry.promote()
+
+        await registry.load(CANDIDATE, "other")
+        await registry.unload(CANDIDATE)
+        await registry.close()
+        return routed, after_promote, registry.describe()
+
+    routed, after_promote, remaining = asyncio.run(scenario())
+
+    assert routed == ("stable", "next")
+    assert after_promote == (PRIMARY, "next", None)
+    assert remaining == {}
+
+
+def test_retire_waits_for_callers_holding_the_old_version():
+    released = []
+
+    async def scenario():
+        registry = _registry(None, released=released)
+        await registry.load(PRIMARY, "v1")
+        with registry.resolve().hold():
+            swap = asyncio.ensure_future(registry.load(PRIMARY, "v2"))
+            while registry.resolve().model_dir != "v2":
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            released_while_held = list(released)
+        await swap
+        names = [artifacts["name"] for artifacts in released]
+        await registry.close()
+        return released_while_held, names
+
+    released_while_held, after = asyncio.run(scenario())
+
+    assert released_while_held == []
+    assert after == ["v1"]
+
+
+def test_retired_versions_release_their_artifacts():
+    executor = InferenceExecutor(max_workers=1, max_queue_size=8)
+    released = []
+
+    async def scenario():
+        registry = _registry(executor, released=released)
+        await registry.load(PRIMARY, "v1")
+        await registry.load(PRIMARY, "v2")
+        await registry.load(CANDIDATE, "v3")
+        await registry.unload(CANDIDATE)
+        names = [artifacts["name"] for artifacts in released]
+        await registry.close()
+        return names
+
+    try:
+        before_close = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert before_close == ["v1", "v3"]
+    assert [artifacts["name"] for artifacts in released] == ["v1", "v3", "v2"]
+
+
+def test_directory_signature_changes_with_files(tmp_path):
+    assert directory_signature(tmp_path / "missing") == ()
+    (tmp_path / "config.json").write_text("{}", encoding="utf-8")
+    before = directory_signature(tmp_path)
+    (tmp_path / "model.safetensors").write_bytes(b"\0" * 8)
+
+    assert [name for name, _, _ in before] == ["config.json"]
+    assert directory_signature(tmp_path) != before
@@ -7,7 +7,7 @@ import tempfile
 import pandas as pd
 import pytest
 
-from src.data.preprocessing import clean_text, load_jsonl, create_splits
+from src.data.preprocessing import clean_text, load_jsonl, create_splits, tokenize_dataset_bucketed
 
 
 class TestCleanText:
@@ -66,3 +66,43 @@ class TestCreateSplits:
         assert set(train_df["label"].unique()) == {0, 1, 2, 3}
         assert set(val_df["label"].unique()) == {0, 1, 2, 3}
         assert set(test_df["label"].unique()) == {0, 1, 2, 3}
+
+
+
+class TestTokenizeDatasetBucketed:
+    TEXTS = [
+        "the stock market",
+        "nasa launch",
+        "the team win in the government stock market and the nasa launch of the team",
+        "a",
+        "government",
+    ]
+
+    @pytest.fixture
+    def tokenizer(self, tiny_model_dir):
+        from transformers import AutoTokenizer
+
+        return AutoTokenizer.from_pretrained(tiny_model_dir)
+
+    def test_indices_restore_original_order(self, tokenizer):
+        buckets = tokenize_dataset_bucketed(self.TEXTS, tokenizer, max_length=32, boundaries=[4, 8])
+        expected = tokenizer(self.TEXTS, truncation=True, max_length=32)["input_ids"]
+
+        restored = [None] * len(self.TEXTS)
+        for bucket in buckets:
+            for idx, ids, mask in zip(bucket["indices"].tolist(), bucket["input_ids"].tolist(),
+                                      bucket["attention_mask"].tolist()):
+                restored[idx] = [token for token, keep in zip(ids, mask) if keep]
+
+        assert restored == expected
+
+    def test_each_bucket_is_padded_to_its_longest_row(self, tokenizer):
+        buckets = tokenize_dataset_bucketed(self.TEXTS, tokenizer, max_length=16, boundaries=[4, 8])
+        lengths = [len(ids) for ids in tokenizer(self.TEXTS, truncation=True, max_length=16)["input_ids"]]
+
+        widths = [bucket["input_ids"].shape[1] for bucket in buckets]
+        assert widths == [max(lengths[idx] for idx in bucket["indices"].tolist()) for bucket in buckets]
+        assert widths == sorted(widths) and widths[-1] == 16
+        assert all(bucket["attention_mask"].shape == bucket["input_ids"].shape for bucket in buckets)
+        assert all(bucket["input_ids"][bucket["attention_mask"] == 0].eq(tokenizer.pad_token_id).all()
+                   for bucket in buckets)
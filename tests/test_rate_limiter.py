@@ -0,0 +1,188 @@
+"""Tests for the token-bucket rate limiter."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.utils.rate_limiter import MemoryStore, RateLimiter, RedisStore, SQLiteStore, create_store
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_allows_burst_up_to_limit_then_refills():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock)
+    limiter.set_limit("predict", requests_per_window=3, window_seconds=60)
+
+    assert [limiter.hit("predict", "1.2.3.4")[0] for _ in range(4)] == [True, True, True, False]
+    clock.now = 20
+    assert limiter.hit("predict", "1.2.3.4") == (True, 0)
+    assert limiter.hit("predict", "5.6.7.8") == (True, 2)
+
+
+def test_idle_keys_are_evicted():
+    clock = FakeClock()
+    limiter = RateLimiter(clock=clock, sweep_interval=30)
+    limiter.set_limit("global", requests_per_window=10, window_seconds=60)
+
+    for idx in range(1000):
+        limiter.hit("global", f"10.0.{idx // 256}.{idx % 256}")
+    assert limiter.size("global") == 1000
+
+    clock.now = 61
+    limiter.hit("global", "192.168.0.1")
+    assert limiter.size("global") == 1
+
+
+def test_unknown_rule_is_unlimited_and_rules_share_one_table():
+    limiter = RateLimiter()
+    limiter.set_limit("global", requests_per_window=1, window_seconds=60)
+    limiter.set_limit("predict", requests_per_window=1, window_seconds=60)
+
+    assert limiter.hit("other", "ip") == (True, 0)
+    assert limiter.hit("global", "ip")[0]
+    assert limiter.hit("predict", "ip")[0]
+    assert set(limiter.rules) == {"global", "predict"}
+
+
+def test_rate_limit_check_raises_429():
+    limiter = RateLimiter()
+    limiter.set_limit("predict", requests_per_window=1, window_seconds=60)
+
+    async def scenario():
+        await limiter.rate_limit_check("predict", "ip")
+        with pytest.raises(HTTPException) as exc_info:
+            await limiter.rate_limit_check("predict", "ip")
+        return exc_info.value
+
+    assert asyncio.run(scenario()).status_code == 429
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "ratelimit.sqlite")
+    workers = [RateLimiter(store=SQLiteStore(path), clock=clock) for _ in range(2)]
+    for limiter in workers:
+        limiter.set_limit("predict", requests_per_window=3, window_seconds=60)
+
+    results = [workers[idx % 2].hit("predict", "1.2.3.4")[0] for idx in range(4)]
+    assert results == [True, True, True, False]
+
+    clock.now = 20
+    assert workers[1].hit("predict", "1.2.3.4") == (True, 0)
+
+    clock.now = 200
+    assert workers[0].evict_idle() == 1
+    assert workers[1].size("predict") == 0
+
+
+def test_redis_store_is_shared_between_workers():
+    fakeredis = pytest.importorskip("fakeredis")
+
+    server = fakeredis.FakeServer()
+    clock = FakeClock()
+    clock.now = 120.0
+    workers = [
+        RateLimiter(store=RedisStore(client=fakeredis.FakeRedis(server=server)), clock=clock) for _ in range(2)
+    ]
+    for limiter in workers:
+        limiter.set_limit("predict", requests_per_window=3, window_seconds=60)
+
+    results = [workers[idx % 2].hit("predict", "1.2.3.4")[0] for idx in range(4)]
+    assert results == [True, True, True, False]
+    assert workers[0].hit("predict", "5.6.7.8")[0]
+
+
+def test_blocking_store_hits_run_off_the_event_loop():
+    import threading
+    import time
+
+    class SlowStore(MemoryStore):
+        blocking = True
+
+        def take(self, *args):
+            self.threads.add(threading.get_ident())
+            time.sleep(0.2)
+            return super().take(*args)
+
+    store = SlowStore()
+    store.threads = set()
+    limiter = RateLimiter(store=store)
+    limiter.set_limit("predict", requests_per_window=10, window_seconds=60)
+
+    async def scenario():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        results = await asyncio.gather(*(limiter.hit_async("predict", "ip") for _ in range(3)))
+        ticker.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(scenario())
+    assert [allowed for allowed, _ in results] == [True, True, True]
+    assert ticks >= 10
+    assert threading.get_ident() not in store.threads
+
+
+def test_memory_store_hits_stay_inline():
+    limiter = RateLimiter()
+    limiter.set_limit("predict", requests_per_window=1, window_seconds=60)
+
+    async def scenario():
+        return [await limiter.hit_async("predict", "ip") for _ in range(2)]
+
+    assert asyncio.run(scenario()) == [(True, 0), (False, 0)]
+
+
+def test_create_store_falls_back_to_memory():
+    assert isinstance(create_store("memory"), MemoryStore)
+    assert isinstance(create_store("redis", redis_url="redis://127.0.0.1:1/0"), MemoryStore)
+    assert isinstance(create_store("unknown"), MemoryStore)
+
+
+def test_middleware_short_circuits_with_429_and_adds_headers():
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+    from fastapi.testclient import TestClient
+
+    from src.utils.rate_limiter import RateLimiterMiddleware
+
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a", b"b"]), media_type="text/plain")
+
+    limiter = RateLimiter()
+    limiter.set_limit("global", requests_per_window=2, window_seconds=60)
+    app.add_middleware(RateLimiterMiddleware, limiter=limiter, rule="global")
+    client = TestClient(app)
+
+    first = client.get("/ping")
+    streamed = client.get("/stream")
+    rejected = client.get("/ping")
+
+    assert first.status_code == 200
+    assert first.headers["X-RateLimit-Limit"] == "2"
+    assert first.headers["X-RateLimit-Remaining"] == "1"
+    assert streamed.text == "ab"
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "30"
+    assert rejected.json() == {"detail": "Rate limit exceeded: 2 requests per minute"}
@@ -0,0 +1,160 @@
+"""Tests for serving profiles and the autotuner."""
+
+import shutil
+
+import pytest
+
+from src.serving.autotune import bucket_candidates, synthetic_texts, tune
+from src.serving.serving_profile import (
+    ServingProfile,
+    default_profile_path,
+    load_profile,
+    machine_fingerprint,
+    save_profile,
+)
+
+
+def _profile(**overrides) -> ServingProfile:
+    values = {"max_batch_size": 16, "max_batch_wait_ms": 2.0, "seq_length_buckets": [32, 64, 128], "num_threads": 2}
+    values.update(overrides)
+    return ServingProfile(**values)
+
+
+def test_profile_round_trip(tmp_path):
+    path = save_profile(tmp_path / "serving_profile.json", _profile())
+
+    loaded = load_profile(path)
+
+    assert loaded == _profile(machine=loaded.machine, created_at=loaded.created_at)
+    assert loaded.machine["key"] == machine_fingerprint()["key"]
+
+
+def test_other_machines_are_kept_and_ignored(tmp_path):
+    path = tmp_path / "serving_profile.json"
+    other = _profile(max_batch_size=64, machine={"key": "arm64/other/64cpu"})
+    save_profile(path, other)
+    save_profile(path, _profile())
+
+    assert load_profile(path).max_batch_size == 16
+    assert load_profile(path, machine_key="arm64/other/64cpu").max_batch_size == 64
+    assert load_profile(path, machine_key="x86_64/unknown/2cpu") is None
+
+
+def test_missing_or_corrupt_profile_is_ignored(tmp_path):
+    path = tmp_path / "serving_profile.json"
+    assert load_profile(path) is None
+
+    path.write_text("{not json", encoding="utf-8")
+    assert load_profile(path) is None
+
+
+def test_bucket_candidates_cover_max_length():
+    lengths = [10, 12, 20, 25, 31, 40, 47, 60, 90, 120]
+
+    candidates = bucket_candidates(lengths, max_length=128)
+
+    assert [128] in candidates
+    for buckets in candidates:
+        assert buckets == sorted(set(buckets))
+        assert buckets[-1] == 128
+        assert all(boundary % 8 == 0 for boundary in buckets[:-1])
+
+
+def test_tune_returns_profile_from_measured_trials(tiny_model_dir):
+    torch = pytest.importorskip("torch")
+    from src.serving.inference import model_fn
+
+    threads_before = torch.get_num_threads()
+    artifacts = model_fn(tiny_model_dir, precision="fp32", backend="pytorch")
+
+    profile = tune(
+        artifacts,
+        synthetic_texts(40, mean_words=8),
+        thread_options=[1],
+        batch_sizes=(1, 4),
+        wait_options_ms=(0, 2),
+        p99_budget_ms=10_000,
+        duration_s=0.05,
+        min_requests=10,
+    )
+
+    assert profile.max_batch_size in (1, 4)
+    assert profile.max_batch_wait_ms in (0, 2)
+    assert profile.num_threads == 1
+    assert profile.backend == "pytorch"
+    assert profile.measured["trials"]
+    assert torch.get_num_threads() == threads_before
+
+
+@pytest.fixture
+def profiled_model_dir(tmp_path, tiny_model_dir, monkeypatch):
+    from src.serving import api, inference
+
+    model_dir = tmp_path / "model"
+    shutil.copytree(tiny_model_dir, model_dir)
+    save_profile(default_profile_path(model_dir), _profile(num_threads=None))
+
+    for name in ("MAX_BATCH_SIZE", "MAX_BATCH_WAIT_MS", "WARMUP_BATCH_SIZES", "SEQ_LENGTH_BUCKETS"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(api, "MODEL_DIR", str(model_dir))
+    monkeypatch.setattr(api, "SERVING_PROFILE", "auto")
+    monkeypatch.setattr(api, "MAX_BATCH_SIZE", 32)
+    monkeypatch.setattr(api, "MAX_BATCH_WAIT_MS", 5.0)
+    monkeypatch.setattr(api, "WARMUP_BATCH_SIZES", [1, 32])
+    monkeypatch.setattr(inference, "INFERENCE_BACKEND", "pytorch")
+    monkeypatch.setattr(inference, "INFERENCE_PRECISION", "fp32")
+    monkeypatch.setattr(inference, "SEQ_LENGTH_BUCKETS", list(inference.SEQ_LENGTH_BUCKETS))
+    return model_dir
+
+
+def test_api_applies_profile_at_startup(profiled_model_dir):
+    from src.serving import api, inference
+
+    assert api._apply_serving_profile() is not None
+
+    assert api.MAX_BATCH_SIZE == 16
+    assert api.MAX_BATCH_WAIT_MS == 2.0
+    assert api.WARMUP_BATCH_SIZES == [1, 16]
+    assert inference.SEQ_LENGTH_BUCKETS[:3] == [32, 64, 128]
+
+
+def test_explicit_env_overrides_profile(profiled_model_dir, monkeypatch):
+    from src.serving import api
+
+    monkeypatch.setenv("MAX_BATCH_SIZE", "32")
+
+    api._apply_serving_profile()
+
+    assert api.MAX_BATCH_SIZE == 32
+    assert api.MAX_BATCH_WAIT_MS == 2.0
+
+
+def test_profile_for_another_backend_is_ignored(profiled_model_dir, monkeypatch):
+    from src.serving import api, inference
+
+    monkeypatch.setattr(inference, "INFERENCE_BACKEND", "onnx")
+
+    assert api._apply_serving_profile() is None
+    assert api.MAX_BATCH_SIZE == 32
+
+
+def test_profile_for_another_precision_is_ignored(profiled_model_dir, monkeypatch):
+    from src.serving import api, inference
+
+    monkeypatch.setattr(inference, "INFERENCE_PRECISION", "int8")
+
+    assert api._apply_serving_profile() is None
+    assert api.MAX_BATCH_SIZE == 32
+
+
+def test_profile_lives_outside_the_watched_model_dir(tmp_path, tiny_model_dir):
+    from src.serving.model_registry import directory_signature
+
+    model_dir = tmp_path / "latest"
+    shutil.copytree(tiny_model_dir, model_dir)
+    before = directory_signature(model_dir)
+
+    path = save_profile(default_profile_path(str(model_dir)), _profile())
+
+    assert path == tmp_path / "latest.serving_profile.json"
+    assert directory_signature(model_dir) == before
@@ -0,0 +1,66 @@
+"""Cold-start budget regression checks (run in fresh interpreters)."""
+
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from src.utils.startup_profile import (
+    PROJECT_ROOT,
+    STARTUP_BUDGETS,
+    check_budget,
+    parse_importtime,
+    profile_statement,
+)
+
+
+def test_parse_importtime_reads_depth_and_times():
+    stderr = textwrap.dedent(
+        """\
+        import time: self [us] | cumulative | imported package
+        import time:       120 |        450 |   json.decoder
+        import time:       330 |        780 | json
+        unrelated warning line
+        """
+    )
+    records = parse_importtime(stderr)
+
+    assert [(r.module, r.self_us, r.cumulative_us, r.depth) for r in records] == [
+        ("json.decoder", 120, 450, 1),
+        ("json", 330, 780, 0),
+    ]
+
+
+def test_profile_raises_when_the_child_crashes():
+    with pytest.raises(RuntimeError, match=r"exit code 1[\s\S]*boom at import"):
+        profile_statement("raise ImportError('boom at import')")
+
+
+@pytest.mark.parametrize("name", sorted(STARTUP_BUDGETS))
+def test_startup_stays_within_budget(name):
+    result = profile_statement(STARTUP_BUDGETS[name]["statement"])
+
+    assert check_budget(name, result) == []
+
+
+def test_onnx_backend_loads_without_torch(tiny_model_dir, tmp_path):
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    import shutil
+
+    from src.serving.onnx_backend import export_onnx
+
+    model_dir = tmp_path / "model"
+    shutil.copytree(tiny_model_dir, model_dir)
+    export_onnx(str(model_dir))
+
+    code = (
+        "import sys\n"
+        "from src.serving.inference import model_fn, predict_fn\n"
+        f"artifacts = model_fn({str(model_dir)!r}, backend='onnx')\n"
+        "predict_fn({'texts': ['stock market']}, artifacts)\n"
+        "print('torch' in sys.modules)\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=str(PROJECT_ROOT), capture_output=True, text=True, check=True)
+    assert proc.stdout.strip().splitlines()[-1] == "False"
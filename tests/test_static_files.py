@@ -0,0 +1,73 @@
+"""Dashboard bundle indexing, compression and cache header tests."""
+
+import gzip
+
+from src.serving.static_files import IMMUTABLE_CACHE_CONTROL, DashboardBundle, accepted_encodings
+
+
+def _make_dist(tmp_path):
+    dist = tmp_path / "dist"
+    (dist / "assets").mkdir(parents=True)
+    (dist / "index.html").write_text("<html><body>dashboard</body></html>", encoding="utf-8")
+    (dist / "assets" / "index-abc123.js").write_text("console.log('x');\n" * 200, encoding="utf-8")
+    return dist
+
+
+def test_hashed_assets_are_immutable_and_gzip_is_negotiated(tmp_path):
+    bundle = DashboardBundle(_make_dist(tmp_path))
+    asset = bundle.lookup("assets/index-abc123.js")
+
+    plain = bundle.respond(asset, {})
+    assert plain.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert "content-encoding" not in plain.headers
+
+    compressed = bundle.respond(asset, {"accept-encoding": "gzip, deflate"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert gzip.decompress(compressed.body) == plain.body
+    assert compressed.headers["etag"] != plain.headers["etag"]
+
+    revalidated = bundle.respond(asset, {"accept-encoding": "gzip", "if-none-match": compressed.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+def test_client_routes_fall_back_to_index_but_missing_assets_404(tmp_path):
+    bundle = DashboardBundle(_make_dist(tmp_path))
+
+    assert bundle.lookup("settings/profile") is bundle.index
+    assert bundle.lookup("") is bundle.index
+    assert bundle.lookup("assets/missing.js") is None
+    assert bundle.respond(bundle.index, {}).headers["cache-control"] == "no-cache"
+    assert DashboardBundle(tmp_path / "absent").index is None
+
+
+def test_accepted_encodings_ignores_zero_quality():
+    assert accepted_encodings("br;q=0, gzip;q=0.5, identity") == {"gzip", "identity"}
+    assert accepted_encodings(None) == set()
+
+
+def test_api_startup_indexes_dashboard_off_the_event_loop(monkeypatch, tmp_path):
+    import threading
+    import time
+
+    from fastapi.testclient import TestClient
+
+    from src.serving import api
+
+    dist = _make_dist(tmp_path)
+    release = threading.Event()
+
+    class SlowBundle(DashboardBundle):
+        def __init__(self, dist_dir):
+            release.wait(10)
+            super().__init__(dist_dir)
+
+    monkeypatch.setattr(api, "DashboardBundle", SlowBundle)
+    monkeypatch.setattr(api, "DASHBOARD_DIST_DIR", dist)
+    monkeypatch.setattr(api, "_dashboard_state", {"bundle": None})
+
+    started = time.monotonic()
+    with TestClient(api.app) as client:
+        assert client.get("/health").status_code == 200
+        assert time.monotonic() - started < 5
+        release.set()
+        assert client.get("/").status_code == 200
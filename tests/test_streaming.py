@@ -0,0 +1,75 @@
+"""Tests for NDJSON prediction streaming."""
+
+import asyncio
+import json
+
+from src.serving.executor import QueueFullError
+from src.serving.streaming import stream_predictions
+
+
+async def _items(texts, gate=None, after=0):
+    for index, text in enumerate(texts):
+        if gate is not None and index == after:
+            await gate.wait()
+        yield index, text
+
+
+async def _predict(texts):
+    return [{"label": text.upper()} for text in texts]
+
+
+async def _collect(lines):
+    return [json.loads(line) async for line in lines]
+
+
+def test_partial_batch_is_flushed_while_upload_is_still_running():
+    async def scenario():
+        gate = asyncio.Event()
+        results = []
+
+        async def consume():
+            async for line in stream_predictions(
+                _items(["a", "b", "c"], gate, after=2), _predict, batch_size=32, max_wait_s=0.01
+            ):
+                results.append(json.loads(line))
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.2)
+        early = list(results)
+        gate.set()
+        await task
+        return early, results
+
+    early, results = asyncio.run(scenario())
+    assert early == [{"index": 0, "label": "A"}, {"index": 1, "label": "B"}]
+    assert [r["index"] for r in results] == [0, 1, 2]
+
+
+def test_queue_full_is_retried_after_its_retry_after():
+    calls = []
+
+    async def busy_then_free(texts):
+        calls.append(texts)
+        if len(calls) < 3:
+            raise QueueFullError("full", retry_after=0.01)
+        return await _predict(texts)
+
+    results = asyncio.run(_collect(stream_predictions(_items(["a", "b"]), busy_then_free, batch_size=2)))
+
+    assert len(calls) == 3
+    assert results == [{"index": 0, "label": "A"}, {"index": 1, "label": "B"}]
+
+
+def test_persistently_full_queue_fails_items_but_not_the_stream():
+    async def full_once(texts):
+        if texts == ["a", "b"]:
+            raise QueueFullError("full", retry_after=0.05)
+        return await _predict(texts)
+
+    results = asyncio.run(
+        _collect(stream_predictions(_items(["a", "b", "c"]), full_once, batch_size=2, max_retry_s=0.1))
+    )
+
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert "queue is full" in results[0]["error"] and "queue is full" in results[1]["error"]
+    assert results[2] == {"index": 2, "label": "C"}
@@ -0,0 +1,163 @@
+"""Tests for the multi-process inference worker pool."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from src.serving.worker_pool import SharedSlab, WorkerCrashedError, WorkerPool, cpu_sets
+
+
+TEXTS = [
+    "the stock market rallied",
+    "team win",
+    "nasa launch",
+    "government",
+    "a b c d e f g h i j k l m n o p",
+]
+
+
+def _pool(model_dir, **kwargs):
+    # fork keeps test startup fast; the service default is spawn.
+    kwargs.setdefault("start_method", "fork")
+    kwargs.setdefault("max_rows", 4)
+    kwargs.setdefault("max_cols", 32)
+    return WorkerPool(model_dir, **kwargs).start()
+
+
+def _wait_for(condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_cpu_sets_split_available_cores():
+    sets = cpu_sets(2, threads_per_worker=1)
+    assert len(sets) == 2
+    assert all(len(cpus) == 1 for cpus in sets)
+
+
+def test_shared_slab_round_trip():
+    owner = SharedSlab.create(max_rows=4, max_cols=8, num_labels=3)
+    try:
+        peer = SharedSlab.attach(owner.name, 4, 8, 3)
+        input_ids, attention_mask = owner.inputs(2, 5)
+        input_ids[...] = np.arange(10).reshape(2, 5)
+        attention_mask[...] = 1
+        peer.logits(2)[...] = [[1, 2, 3], [4, 5, 6]]
+
+        peer_ids, peer_mask = peer.inputs(2, 5)
+        assert peer_ids.tolist() == input_ids.tolist()
+        assert peer_mask.sum() == 10
+        assert owner.logits(2).tolist() == [[1, 2, 3], [4, 5, 6]]
+        del input_ids, attention_mask, peer_ids, peer_mask
+        peer.close()
+        with pytest.raises(ValueError):
+            owner.inputs(5, 8)
+    finally:
+        owner.close()
+
+
+def test_pool_matches_in_process_predictions(tiny_model_dir):
+    from src.serving import inference
+
+    reference = inference.predict_fn({"texts": TEXTS}, inference.model_fn(tiny_model_dir))
+    pool = _pool(tiny_model_dir, min_workers=1, max_workers=1)
+    try:
+        artifacts = {
+            "model": pool,
+            "tokenizer": inference.load_tokenizer(tiny_model_dir),
+            "precision": pool.applied_precision,
+            "backend": "workers",
+        }
+        pooled = inference.predict_fn({"texts": TEXTS}, artifacts)
+    finally:
+        pool.close()
+
+    assert [row["predicted_label"] for row in pooled] == [row["predicted_label"] for row in reference]
+    for got, expected in zip(pooled, reference):
+        for label, prob in expected["probabilities"].items():
+            assert got["probabilities"][label] == pytest.approx(prob, abs=1e-4)
+
+
+def test_pool_grows_under_load_and_retires_idle_workers(tiny_model_dir):
+    pool = _pool(tiny_model_dir, min_workers=1, max_workers=2, idle_timeout_s=0.3)
+    input_ids = np.full((4, 32), 5, dtype=np.int64)
+    attention_mask = np.ones_like(input_ids)
+    stop = threading.Event()
+
+    def hammer():
+        while not stop.is_set():
+            pool(input_ids, attention_mask)
+
+    threads = [threading.Thread(target=hammer) for _ in range(4)]
+    try:
+        for thread in threads:
+            thread.start()
+        assert _wait_for(lambda: pool.size == 2)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        assert _wait_for(lambda: pool.size == 1)
+    finally:
+        stop.set()
+        pool.close()
+    assert pool.size == 0
+
+
+def test_crashed_worker_is_replaced(tiny_model_dir):
+    pool = _pool(tiny_model_dir, min_workers=1, max_workers=1, idle_timeout_s=0.2)
+    input_ids = np.full((2, 8), 5, dtype=np.int64)
+    try:
+        pool._workers[0].process.kill()
+        pool._workers[0].process.join()
+        with pytest.raises(WorkerCrashedError):
+            pool(input_ids, np.ones_like(input_ids))
+        assert _wait_for(lambda: pool.size == 1)
+        assert pool(input_ids, np.ones_like(input_ids)).shape == (2, 4)
+    finally:
+        pool.close()
+
+
+def test_batches_larger_than_a_slab_are_split(tiny_model_dir):
+    pool = _pool(tiny_model_dir, min_workers=1, max_workers=1)
+    input_ids = np.full((10, 8), 5, dtype=np.int64)
+    try:
+        logits = pool(input_ids, np.ones_like(input_ids))
+        single = pool(input_ids[:1], np.ones_like(input_ids[:1]))
+    finally:
+        pool.close()
+    assert logits.shape == (10, 4)
+    np.testing.assert_allclose(logits, np.repeat(single, 10, axis=0), atol=1e-5)
+
+
+def test_worker_starts_resume_after_backoff(tiny_model_dir):
+    pool = _pool(tiny_model_dir, min_workers=1, max_workers=1, idle_timeout_s=0.1, start_backoff_s=0.5)
+    start_worker = pool._start_worker
+    attempts = []
+
+    def flaky_start(slot):
+        attempts.append(time.monotonic())
+        if len(attempts) <= 3:
+            raise MemoryError("out of memory")
+        return start_worker(slot)
+
+    pool._start_worker = flaky_start
+    input_ids = np.full((2, 8), 5, dtype=np.int64)
+    try:
+        pool._workers[0].process.kill()
+        pool._workers[0].process.join()
+        with pytest.raises(WorkerCrashedError):
+            pool(input_ids, np.ones_like(input_ids))
+
+        assert _wait_for(lambda: len(attempts) >= 3)
+        assert _wait_for(lambda: pool.size == 1)
+        assert attempts[3] - attempts[2] >= 0.5
+        assert pool._start_failures == 0
+        assert pool(input_ids, np.ones_like(input_ids)).shape == (2, 4)
+    finally:
+        pool.close()